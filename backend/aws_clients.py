@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+
+import boto3
+from botocore.config import Config
+
+# Connection pool per client; sized for the thread pools in batch_ops/garden_cleanup
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '16'))
+
+# Tight timeouts (seconds): Lambda calls AWS in-region, so slow means stuck
+AWS_CONNECT_TIMEOUT = float(os.environ.get('AWS_CONNECT_TIMEOUT', '2'))
+AWS_READ_TIMEOUT = float(os.environ.get('AWS_READ_TIMEOUT', '5'))
+
+# Attempts (including the first) under adaptive retry mode
+AWS_MAX_ATTEMPTS = int(os.environ.get('AWS_MAX_ATTEMPTS', '4'))
+
+CLIENT_CONFIG = Config(
+    max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+    tcp_keepalive=True,
+    connect_timeout=AWS_CONNECT_TIMEOUT,
+    read_timeout=AWS_READ_TIMEOUT,
+    retries={"mode": "adaptive", "max_attempts": AWS_MAX_ATTEMPTS}
+)
+
+_session = None
+_instances = {}
+_lock = threading.RLock()
+
+# Milliseconds spent creating each client/resource in this container
+init_timings = {}
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        _session = boto3.session.Session()
+    return _session
+
+
+def _create(key, factory):
+    """Create and memoize an AWS object, recording how long creation took."""
+    instance = _instances.get(key)
+    if instance is not None:
+        return instance
+
+    with _lock:
+        instance = _instances.get(key)
+        if instance is None:
+            started = time.perf_counter()
+            instance = factory(_get_session())
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            init_timings[key] = elapsed_ms
+            print(f"AWS {key} initialised in {elapsed_ms} ms")
+            _instances[key] = instance
+    return instance
+
+
+def client(service_name):
+    """Return the shared low-level client for `service_name`, creating it on first use."""
+    return _create(f"client:{service_name}", lambda session: session.client(service_name, config=CLIENT_CONFIG))
+
+
+def endpoint_client(service_name, endpoint_url):
+    """Shared client for a service only reachable at a per-deployment endpoint (e.g. apigatewaymanagementapi)."""
+    return _create(
+        f"client:{service_name}:{endpoint_url}",
+        lambda session: session.client(service_name, endpoint_url=endpoint_url, config=CLIENT_CONFIG)
+    )
+
+
+def resource(service_name):
+    """Return the shared resource for `service_name`, creating it on first use."""
+    return _create(f"resource:{service_name}", lambda session: session.resource(service_name, config=CLIENT_CONFIG))
+
+
+def table(table_name):
+    """Return the shared DynamoDB Table resource for `table_name`."""
+    return _create(f"table:{table_name}", lambda session: resource('dynamodb').Table(table_name))
+
+
+def credentials():
+    """Credentials of the shared session, for code that signs requests itself."""
+    return _get_session().get_credentials()
+
+
+class LazyAwsObject:
+    """
+    Module-level stand-in that builds the real client on first attribute access,
+    so importing a handler never pays for clients the invocation doesn't use.
+    """
+
+    def __init__(self, factory, *args):
+        self._factory = factory
+        self._args = args
+
+    def __getattr__(self, name):
+        return getattr(self._factory(*self._args), name)
+
+
+def lazy_client(service_name):
+    return LazyAwsObject(client, service_name)
+
+
+def lazy_resource(service_name):
+    return LazyAwsObject(resource, service_name)
+
+
+def lazy_table(table_name):
+    return LazyAwsObject(table, table_name)
@@ -0,0 +1,68 @@
+import json
+import aws_clients
+import os
+from botocore.exceptions import ClientError
+from batch_ops import batch_get_items
+from fieldsets import parse_fields, projection_kwargs
+from image_urls import sign_garden
+from simple_auth import require_auth, respond
+
+dynamodb = aws_clients.lazy_resource('dynamodb')
+table_name = os.environ['GARDENS_TABLE']
+
+# Upper bound on IDs accepted in one request
+MAX_BATCH_GET_IDS = 300
+
+@require_auth
+def handler(event, context):
+    try:
+        # Get authenticated user ID from the decorator
+        user_id = event['user_id']
+
+        body = json.loads(event.get("body") or "{}")
+        garden_ids = body.get("gardenIds")
+
+        if not isinstance(garden_ids, list) or not garden_ids:
+            return respond(400, {"message": "gardenIds must be a non-empty list"})
+        if len(garden_ids) > MAX_BATCH_GET_IDS:
+            return respond(400, {"message": f"At most {MAX_BATCH_GET_IDS} gardenIds per request"})
+        if not all(isinstance(garden_id, str) and garden_id for garden_id in garden_ids):
+            return respond(400, {"message": "gardenIds must be non-empty strings"})
+
+        # Optional "fields" (same presets as ?fields= on GET /gardens)
+        fields = parse_fields(body.get("fields"))
+
+        # BatchGetItem rejects duplicate keys within a request
+        unique_ids = list(dict.fromkeys(garden_ids))
+        keys = [{'userId': user_id, 'gardenId': garden_id} for garden_id in unique_ids]
+
+        items, unprocessed = batch_get_items(dynamodb, table_name, keys, projection_kwargs(fields))
+        if unprocessed:
+            print(f"BatchGetItem left {len(unprocessed)} keys unprocessed for user {user_id}")
+            return respond(503, {"message": "Database is busy, please retry"})
+
+        # Return results in request order with explicit not-found markers
+        gardens_by_id = {item['gardenId']: item for item in items}
+        results = []
+        for garden_id in garden_ids:
+            garden = gardens_by_id.get(garden_id)
+            if garden is None:
+                results.append({"gardenId": garden_id, "found": False})
+            else:
+                results.append({"gardenId": garden_id, "found": True, "garden": sign_garden(garden)})
+
+        return respond(200, {
+            "results": results,
+            "count": sum(1 for result in results if result["found"])
+        })
+
+    except json.JSONDecodeError:
+        return respond(400, {"message": "Invalid JSON body"})
+    except ValueError as e:
+        return respond(400, {"message": str(e)})
+    except ClientError as e:
+        print(f"DynamoDB error: {e}")
+        return respond(500, {"message": "Database error occurred"})
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return respond(500, {"message": "Internal server error"})
@@ -0,0 +1,130 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from boto3.dynamodb.types import TypeSerializer
+from botocore.exceptions import ClientError
+
+# DynamoDB per-call limits
+BATCH_GET_MAX_KEYS = 100
+BATCH_WRITE_MAX_ITEMS = 25
+
+# Retry budget for UnprocessedKeys / UnprocessedItems
+BATCH_MAX_ATTEMPTS = 6
+BATCH_BACKOFF_BASE = 0.05  # seconds
+BATCH_BACKOFF_CAP = 2.0  # seconds
+
+# Concurrent BatchWriteItem calls per invocation
+BATCH_WRITE_WORKERS = 4
+
+# Concurrent PutItem calls per invocation for conditional puts, which
+# BatchWriteItem can't make (one item per call, so more in flight)
+CONDITIONAL_PUT_WORKERS = 16
+
+serializer = TypeSerializer()
+
+
+def chunked(items, size):
+    """Yield successive lists of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def backoff_delay(attempt, base=BATCH_BACKOFF_BASE, cap=BATCH_BACKOFF_CAP):
+    """Full-jitter exponential backoff delay for the given retry attempt (1-based)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def batch_get_items(dynamodb, table_name, keys, projection=None):
+    """
+    Fetch `keys` with BatchGetItem in chunks of 100, retrying UnprocessedKeys
+    with jittered backoff. `projection` is extra per-table request kwargs
+    (e.g. from fieldsets.projection_kwargs).
+    Returns (items, unprocessed_keys); items come back in no particular order.
+    """
+    items = []
+    unprocessed = []
+
+    for chunk in chunked(keys, BATCH_GET_MAX_KEYS):
+        request = {table_name: dict(projection or {}, Keys=chunk)}
+
+        for attempt in range(1, BATCH_MAX_ATTEMPTS + 1):
+            response = dynamodb.batch_get_item(RequestItems=request)
+            items.extend(response.get('Responses', {}).get(table_name, []))
+
+            request = response.get('UnprocessedKeys') or {}
+            if not request:
+                break
+            if attempt < BATCH_MAX_ATTEMPTS:
+                time.sleep(backoff_delay(attempt))
+
+        if request:
+            unprocessed.extend(request.get(table_name, {}).get('Keys', []))
+
+    return items, unprocessed
+
+
+def _write_chunk(dynamodb, table_name, requests):
+    """Write one chunk of at most 25 requests. Returns the requests that never succeeded."""
+    request = {table_name: requests}
+
+    for attempt in range(1, BATCH_MAX_ATTEMPTS + 1):
+        try:
+            response = dynamodb.batch_write_item(RequestItems=request)
+        except ClientError as e:
+            print(f"BatchWriteItem error: {e}")
+            return request[table_name]
+
+        request = response.get('UnprocessedItems') or {}
+        if not request:
+            return []
+        if attempt < BATCH_MAX_ATTEMPTS:
+            time.sleep(backoff_delay(attempt))
+
+    return request.get(table_name, [])
+
+
+def batch_write_requests(dynamodb, table_name, requests, max_workers=BATCH_WRITE_WORKERS):
+    """
+    Apply PutRequest/DeleteRequest entries with BatchWriteItem in chunks of 25
+    across a small thread pool, retrying UnprocessedItems with jittered backoff.
+    Returns the list of requests that could not be written.
+    """
+    chunks = list(chunked(requests, BATCH_WRITE_MAX_ITEMS))
+    if not chunks:
+        return []
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        for chunk_failed in executor.map(lambda chunk: _write_chunk(dynamodb, table_name, chunk), chunks):
+            failed.extend(chunk_failed)
+    return failed
+
+
+def _conditional_put(client, table_name, item, condition):
+    try:
+        client.put_item(
+            TableName=table_name,
+            Item={key: serializer.serialize(value) for key, value in item.items()},
+            ConditionExpression=condition
+        )
+        return "written"
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return "conflict"
+        print(f"PutItem error: {e}")
+        return "failed"
+
+
+def conditional_put_items(dynamodb, table_name, items, condition, max_workers=CONDITIONAL_PUT_WORKERS):
+    """
+    Put each of `items` with its own PutItem guarded by `condition` (e.g.
+    "attribute_not_exists(gardenId)"), across a thread pool; botocore
+    retries throttling. Returns one status per item, in order: "written",
+    "conflict" (the condition failed, nothing written) or "failed".
+    """
+    if not items:
+        return []
+    client = dynamodb.meta.client
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(lambda item: _conditional_put(client, table_name, item, condition), items))
@@ -0,0 +1,69 @@
+"""
+Benchmark: CPU cost vs bytes saved when compressing garden list responses
+at different gzip levels and brotli qualities.
+
+Run from the backend directory:
+    python benchmarks/bench_response_compression.py [--gardens 200,1000]
+"""
+import argparse
+import gzip
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import compression
+import responses
+from bench_response_encoders import make_gardens
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROUNDS = 20
+
+GZIP_LEVELS = (1, 3, 5, 6, 9)
+BROTLI_QUALITIES = (1, 3, 4, 5, 7, 9, 11)
+
+
+def candidates():
+    for level in GZIP_LEVELS:
+        yield f"gzip-{level}", lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0)
+    if brotli is not None:
+        for quality in BROTLI_QUALITIES:
+            yield f"br-{quality}", lambda data, quality=quality: brotli.compress(data, quality=quality, mode=brotli.MODE_TEXT)
+
+
+def measure(count):
+    body = {"gardens": make_gardens(count), "count": count, "nextCursor": None}
+    raw = responses.encode_body(body).encode('utf-8')
+
+    print(f"\n{count} gardens: {len(raw):,d} bytes of JSON, best of {ROUNDS} rounds")
+    print(f"  {'coding':8s} {'ms':>8s} {'bytes':>10s} {'ratio':>7s} {'KB saved/ms':>12s}")
+    for name, compress in candidates():
+        compressed = compress(raw)
+        best = min(timeit.repeat(lambda: compress(raw), number=1, repeat=ROUNDS))
+        saved_kb = (len(raw) - len(compressed)) / 1024
+        # API Gateway decodes the base64 body, so clients download the compressed size
+        print(f"  {name:8s} {best * 1000:8.2f} {len(compressed):>10,d} {len(raw) / len(compressed):7.1f} "
+              f"{saved_kb / (best * 1000):12.1f}")
+
+    configured = f"gzip-{compression.GZIP_LEVEL}" + (f", br-{compression.BROTLI_QUALITY}" if brotli else '')
+    print(f"  configured: {configured}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--gardens', default='50,200,1000', help='comma-separated list sizes')
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("(brotli not installed; only gzip was measured)")
+    for count in args.gardens.split(','):
+        measure(int(count))
+
+
+if __name__ == '__main__':
+    main()
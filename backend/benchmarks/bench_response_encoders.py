@@ -0,0 +1,57 @@
+"""
+Micro-benchmark: response encoders on a 1,000-garden list.
+
+Run from the backend directory:
+    python benchmarks/bench_response_encoders.py
+"""
+import os
+import sys
+import timeit
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import responses
+
+GARDEN_COUNT = 1000
+ROUNDS = 50
+
+
+def make_gardens(count):
+    """Garden items shaped like DynamoDB query results (numbers as Decimal)."""
+    now = datetime.utcnow().isoformat()
+    return [
+        {
+            "userId": "3f9a1c2e-0000-4000-8000-000000000000",
+            "gardenId": str(uuid.uuid4()),
+            "name": f"Garden {index}",
+            "location": f"{index} Orchard Lane, Springfield",
+            "description": "Raised beds with tomatoes, basil and a small herb spiral. " * 3,
+            "imageUrl": f"https://florify-garden-images.s3.eu-north-1.amazonaws.com/gardens/{index}/image.jpg",
+            "status": "active",
+            "plantCount": Decimal(index % 40),
+            "userEmail": "gardener@example.com",
+            "createdAt": now,
+            "updatedAt": now
+        }
+        for index in range(count)
+    ]
+
+
+def main():
+    body = {"gardens": make_gardens(GARDEN_COUNT), "count": GARDEN_COUNT}
+
+    print(f"Encoding {GARDEN_COUNT} gardens, best of {ROUNDS} rounds")
+    for name, encoder in sorted(responses.ENCODERS.items()):
+        encoded = encoder(body)
+        best = min(timeit.repeat(lambda: encoder(body), number=1, repeat=ROUNDS))
+        print(f"  {name:8s} {best * 1000:8.2f} ms  {len(encoded):>9,d} bytes")
+
+    if 'orjson' not in responses.ENCODERS:
+        print("  (orjson not installed; only the stdlib encoder was measured)")
+
+
+if __name__ == '__main__':
+    main()
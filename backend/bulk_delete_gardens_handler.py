@@ -0,0 +1,150 @@
+import json
+import aws_clients
+import os
+import time
+from botocore.exceptions import ClientError
+from batch_ops import batch_get_items, chunked
+from fieldsets import projection_kwargs
+from garden_cache import garden_cache
+from garden_summary import apply_summary_delta, plant_count
+from garden_cleanup import delete_garden_items, delete_image_prefixes
+from pagination import decode_cursor, encode_cursor, query_page
+from simple_auth import require_auth, respond
+
+dynamodb = aws_clients.lazy_resource('dynamodb')
+s3_client = aws_clients.lazy_client('s3')
+table_name = os.environ['GARDENS_TABLE']
+table = aws_clients.lazy_table(table_name)
+s3_bucket = os.environ.get('S3_BUCKET_NAME', 'florify-garden-images')
+
+# Upper bound on explicit IDs accepted in one request
+MAX_BULK_DELETE_IDS = 1000
+
+# Gardens processed per round (one BatchGetItem / query page)
+DELETE_ROUND_SIZE = 100
+
+# Time one request may spend deleting (ms). API Gateway REST integrations
+# give up after 29 s, well before the function's own timeout, and the
+# client must receive the 202 "resume" body before then.
+REQUEST_BUDGET_MS = 25000
+
+# Stop starting new rounds when less than this much of the budget remains
+RESUME_MARGIN_MS = 5000
+
+def _deadline(context):
+    """Monotonic time by which the response must be on its way."""
+    budget_ms = REQUEST_BUDGET_MS
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        budget_ms = min(budget_ms, context.get_remaining_time_in_millis())
+    return time.monotonic() + budget_ms / 1000
+
+def _time_left_ms(deadline):
+    return (deadline - time.monotonic()) * 1000
+
+def _delete_round(user_id, plant_counts, progress):
+    """
+    Delete images first, then items, so a retried round never leaks S3 objects.
+    `plant_counts` maps each gardenId to its plantCount for the summary delta.
+    """
+    garden_ids = list(plant_counts)
+    objects_deleted, s3_failed = delete_image_prefixes(s3_client, s3_bucket, user_id, garden_ids)
+    s3_failed_ids = set(s3_failed)
+    to_delete = [garden_id for garden_id in garden_ids if garden_id not in s3_failed_ids]
+    item_failed = delete_garden_items(dynamodb, table_name, user_id, to_delete)
+    if len(item_failed) < len(to_delete):
+        garden_cache.invalidate_user(user_id)
+        # BatchWriteItem can't join a transaction; the repair job fixes any drift
+        deleted_ids = set(to_delete) - set(item_failed)
+        apply_summary_delta(user_id, -len(deleted_ids), -sum(plant_counts[garden_id] for garden_id in deleted_ids))
+
+    progress["deleted"] += len(to_delete) - len(item_failed)
+    progress["objectsDeleted"] += objects_deleted
+    progress["failed"].extend(s3_failed + item_failed)
+    print(f"Bulk delete progress ({user_id}): {progress['deleted']} gardens, {progress['objectsDeleted']} objects")
+
+def _delete_by_ids(user_id, garden_ids, deadline, progress):
+    """Returns the IDs not yet processed when time ran out (empty when finished)."""
+    ids_projection = projection_kwargs(('gardenId', 'plantCount'))
+    chunks = list(chunked(garden_ids, DELETE_ROUND_SIZE))
+
+    for index, chunk in enumerate(chunks):
+        if _time_left_ms(deadline) < RESUME_MARGIN_MS:
+            return [garden_id for remaining in chunks[index:] for garden_id in remaining]
+
+        # Only touch gardens this user owns
+        keys = [{'userId': user_id, 'gardenId': garden_id} for garden_id in chunk]
+        items, unprocessed = batch_get_items(dynamodb, table_name, keys, ids_projection)
+        owned = {item['gardenId']: plant_count(item) for item in items}
+        unresolved = {key['gardenId'] for key in unprocessed}
+
+        progress["notFound"].extend(
+            garden_id for garden_id in chunk if garden_id not in owned and garden_id not in unresolved
+        )
+        progress["failed"].extend(unresolved)
+        _delete_round(user_id, {garden_id: owned[garden_id] for garden_id in chunk if garden_id in owned}, progress)
+
+    return []
+
+def _delete_all(user_id, cursor, deadline, progress):
+    """Returns (finished, resume_cursor); the cursor is None to restart from the first garden."""
+    query_kwargs = {
+        "KeyConditionExpression": 'userId = :userId',
+        "ExpressionAttributeValues": {
+            ':userId': user_id
+        }
+    }
+    query_kwargs.update(projection_kwargs(('gardenId', 'plantCount')))
+    start_key = decode_cursor(cursor, user_id) if cursor else None
+
+    while True:
+        if _time_left_ms(deadline) < RESUME_MARGIN_MS:
+            # Keys up to start_key are already processed; resume right after them
+            return False, encode_cursor(start_key, user_id)
+
+        items, start_key = query_page(table, query_kwargs, DELETE_ROUND_SIZE, start_key)
+        _delete_round(user_id, {item['gardenId']: plant_count(item) for item in items}, progress)
+
+        if not start_key:
+            return True, None
+
+@require_auth
+def handler(event, context):
+    try:
+        # Get authenticated user ID from the decorator
+        user_id = event['user_id']
+
+        body = json.loads(event.get("body") or "{}")
+        delete_all = body.get("all") is True
+        garden_ids = body.get("gardenIds")
+
+        if not delete_all:
+            if not isinstance(garden_ids, list) or not garden_ids:
+                return respond(400, {"message": "Provide gardenIds or \"all\": true"})
+            if len(garden_ids) > MAX_BULK_DELETE_IDS:
+                return respond(400, {"message": f"At most {MAX_BULK_DELETE_IDS} gardenIds per request"})
+            if not all(isinstance(garden_id, str) and garden_id for garden_id in garden_ids):
+                return respond(400, {"message": "gardenIds must be non-empty strings"})
+
+        progress = {"deleted": 0, "objectsDeleted": 0, "notFound": [], "failed": []}
+        deadline = _deadline(context)
+
+        if delete_all:
+            finished, resume_cursor = _delete_all(user_id, body.get("cursor"), deadline, progress)
+            resume = None if finished else {"all": True, "cursor": resume_cursor}
+        else:
+            remaining = _delete_by_ids(user_id, list(dict.fromkeys(garden_ids)), deadline, progress)
+            resume = {"gardenIds": remaining} if remaining else None
+
+        # 202 + "resume" body when the request ran short on time; POST it back to continue
+        return respond(202 if resume else 200, dict(progress, complete=resume is None, resume=resume))
+
+    except json.JSONDecodeError:
+        return respond(400, {"message": "Invalid JSON body"})
+    except ValueError as e:
+        return respond(400, {"message": str(e)})
+    except ClientError as e:
+        print(f"AWS error: {e}")
+        return respond(500, {"message": "Database error occurred"})
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return respond(500, {"message": "Internal server error"})
@@ -0,0 +1,128 @@
+import json
+import base64
+import aws_clients
+import os
+from datetime import datetime
+from batch_ops import conditional_put_items
+from garden_cache import garden_cache
+from garden_summary import apply_summary_delta, plant_count
+from garden_records import build_garden_item
+from responses import get_header
+from simple_auth import require_auth, respond
+
+dynamodb = aws_clients.lazy_resource('dynamodb')
+table_name = os.environ['GARDENS_TABLE']
+
+# Upper bound on records accepted in one request
+MAX_BULK_RECORDS = 1000
+
+def iter_records(body, content_type):
+    """
+    Yield (index, record_or_None, error_or_None) from a JSON array,
+    a {"gardens": [...]} object, or NDJSON (one JSON object per line).
+    """
+    stripped = body.lstrip()
+    is_ndjson = 'ndjson' in (content_type or '') or 'jsonl' in (content_type or '')
+
+    if not is_ndjson and stripped[:1] in ('[', '{'):
+        try:
+            parsed = json.loads(body)
+        except json.JSONDecodeError:
+            # A body starting with '{' may still be NDJSON without the content type
+            if stripped[:1] == '[':
+                raise
+            parsed = None
+
+        if parsed is not None:
+            if isinstance(parsed, dict):
+                parsed = parsed.get('gardens')
+            if not isinstance(parsed, list):
+                raise ValueError("Body must be a JSON array of gardens")
+            for index, record in enumerate(parsed):
+                yield index, record, None
+            return
+
+    index = 0
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            yield index, json.loads(line), None
+        except json.JSONDecodeError:
+            yield index, None, "Invalid JSON"
+        index += 1
+
+@require_auth
+def handler(event, context):
+    try:
+        # Get authenticated user ID from the decorator
+        user_id = event['user_id']
+
+        body = event.get("body") or ""
+        if event.get("isBase64Encoded", False):
+            body = base64.b64decode(body).decode('utf-8')
+
+        # Validate every record the same way single create does
+        now = datetime.utcnow().isoformat()
+        report = []
+        items = []
+        seen_ids = set()
+        for index, record, error in iter_records(body, get_header(event, 'content-type')):
+            if index >= MAX_BULK_RECORDS:
+                return respond(400, {"message": f"At most {MAX_BULK_RECORDS} gardens per request"})
+
+            item = None
+            if not error:
+                item, error = build_garden_item(user_id, record, now=now)
+            if not error and item["gardenId"] in seen_ids:
+                error = "Duplicate gardenId in request"
+
+            if error:
+                report.append({"index": index, "status": "invalid", "message": error})
+                continue
+
+            seen_ids.add(item["gardenId"])
+            report.append({"index": index, "gardenId": item["gardenId"], "status": "created"})
+            items.append(item)
+
+        if not report:
+            return respond(400, {"message": "No gardens provided"})
+
+        # One conditional put per record, so a garden that already exists (or
+        # is created by a concurrent request or a retry) is left alone, as
+        # single create does, and only real inserts reach the summary
+        statuses = dict(zip(
+            (item["gardenId"] for item in items),
+            conditional_put_items(dynamodb, table_name, items, "attribute_not_exists(gardenId)")
+        ))
+        written = [item for item in items if statuses[item["gardenId"]] == "written"]
+        if written:
+            garden_cache.invalidate_user(user_id)
+            # Puts can't join one transaction with the summary; the repair job fixes any drift
+            apply_summary_delta(user_id, len(written), sum(plant_count(item) for item in written))
+        for entry in report:
+            status = statuses.get(entry.get("gardenId"))
+            if status == "conflict":
+                entry["status"] = "exists"
+                entry["message"] = "A garden with this gardenId already exists"
+            elif status == "failed":
+                entry["status"] = "failed"
+                entry["message"] = "Write failed, please resubmit this record"
+
+        created = sum(1 for entry in report if entry["status"] == "created")
+        return respond(201 if created == len(report) else 207, {
+            "message": f"Imported {created} of {len(report)} gardens",
+            "created": created,
+            "exists": sum(1 for entry in report if entry["status"] == "exists"),
+            "invalid": sum(1 for entry in report if entry["status"] == "invalid"),
+            "failed": sum(1 for entry in report if entry["status"] == "failed"),
+            "results": report
+        })
+
+    except json.JSONDecodeError:
+        return respond(400, {"message": "Invalid JSON body"})
+    except ValueError as e:
+        return respond(400, {"message": str(e)})
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return respond(500, {"message": "Internal server error"})
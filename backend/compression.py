@@ -0,0 +1,130 @@
+import base64
+import gzip
+import os
+
+from responses import get_header
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this go out as-is: below ~1 KB the saved bytes don't
+# pay for the CPU, the base64 overhead or the extra header
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+
+# Levels picked with benchmarks/bench_response_compression.py: past these,
+# each extra level costs far more CPU than it saves in bytes
+GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('RESPONSE_BROTLI_QUALITY', '4'))
+
+# Set to 'off' to disable (e.g. behind a CDN that compresses already)
+RESPONSE_COMPRESSION = os.environ.get('RESPONSE_COMPRESSION', 'on')
+
+
+def _gzip(data):
+    # mtime=0 keeps the output (and anything hashed from it) deterministic
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=BROTLI_QUALITY, mode=brotli.MODE_TEXT)
+
+
+# Server preference order when the client rates codings equally
+COMPRESSORS = {}
+if brotli is not None:
+    COMPRESSORS['br'] = _brotli
+COMPRESSORS['gzip'] = _gzip
+
+
+def parse_accept_encoding(header):
+    """{coding: q} from an Accept-Encoding header ("gzip, br;q=0.8, *;q=0")."""
+    preferences = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        preferences[coding] = q
+    return preferences
+
+
+def choose_encoding(header):
+    """The best coding we support for an Accept-Encoding header, or None for identity."""
+    preferences = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in COMPRESSORS:
+        q = preferences.get(coding, preferences.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _add_vary(headers):
+    vary = headers.get('Vary')
+    if not vary:
+        headers['Vary'] = 'Accept-Encoding'
+    elif 'accept-encoding' not in vary.lower():
+        headers['Vary'] = f"{vary}, Accept-Encoding"
+
+
+def compress_response(event, response):
+    """
+    Compress a Lambda proxy response when the client accepts gzip or br and
+    the body is large enough. Works for both API Gateway event versions:
+    the compressed body is returned base64-encoded with isBase64Encoded,
+    which REST APIs decode when binaryMediaTypes covers the response (see
+    serverless.yml) and HTTP APIs always decode. Every response gets
+    `Vary: Accept-Encoding`; compressed ones get a weak ETag, since the
+    bytes differ from the identity representation.
+    """
+    if RESPONSE_COMPRESSION == 'off' or not isinstance(response, dict):
+        return response
+
+    # Headers may be the shared CORS dict: always work on a copy
+    headers = dict(response.get('headers') or {})
+    _add_vary(headers)
+    response = dict(response, headers=headers)
+
+    body = response.get('body')
+    if response.get('isBase64Encoded') or not isinstance(body, str) or 'Content-Encoding' in headers:
+        return response
+
+    raw = body.encode('utf-8')
+    if len(raw) < RESPONSE_COMPRESSION_MIN_BYTES:
+        return response
+
+    encoding = choose_encoding(get_header(event, 'Accept-Encoding'))
+    if encoding is None:
+        return response
+
+    compressed = COMPRESSORS[encoding](raw)
+    if len(compressed) >= len(raw):
+        return response
+
+    headers['Content-Encoding'] = encoding
+    etag = headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        headers['ETag'] = f"W/{etag}"
+    response['body'] = base64.b64encode(compressed).decode('ascii')
+    response['isBase64Encoded'] = True
+    return response
+
+
+def decode_request_body(event):
+    """
+    With binaryMediaTypes set, REST APIs base64-encode request bodies too;
+    turn them back into text so handlers can keep calling json.loads.
+    """
+    if event.get('isBase64Encoded') and isinstance(event.get('body'), str):
+        event['body'] = base64.b64decode(event['body']).decode('utf-8')
+        event['isBase64Encoded'] = False
+    return event
@@ -1,13 +1,14 @@
 import json
-import boto3
+import aws_clients
 import os
-import uuid
-from datetime import datetime
 from botocore.exceptions import ClientError
+from garden_cache import garden_cache
+from garden_records import build_garden_item
+from garden_summary import put_new_garden
+from image_urls import sign_garden
 from simple_auth import require_auth, respond
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['GARDENS_TABLE'])
+table = aws_clients.lazy_table(os.environ['GARDENS_TABLE'])
 
 @require_auth
 def handler(event, context):
@@ -16,34 +17,25 @@ def handler(event, context):
         user_id = event['user_id']
         
         body = json.loads(event.get("body", "{}"))
-        garden_name = body.get("name")
-        garden_location = body.get("location")
-        garden_description = body.get("description", "")
 
-        if not garden_name or not garden_location:
-            return respond(400, {"message": "Garden name and location are required"})
-
-        # Generate unique garden ID
-        garden_id = str(uuid.uuid4())
-
-        # Create garden item
-        current_time = datetime.utcnow().isoformat()
-        garden_item = {
-            "userId": user_id,
-            "gardenId": garden_id,
-            "name": garden_name,
-            "location": garden_location,
-            "description": garden_description,
-            "createdAt": current_time,
-            "updatedAt": current_time
-        }
-
-        # Save to DynamoDB
-        table.put_item(Item=garden_item)
+        # Validate and build the garden item (shared with bulk import)
+        garden_item, error = build_garden_item(user_id, body)
+        if error:
+            return respond(400, {"message": error})
+
+        # Save to DynamoDB and count it in the user's summary, atomically
+        created, stored = put_new_garden(table, garden_item)
+        if not created:
+            # Same gardenId sent again: a retried create, not a new garden
+            return respond(200, {
+                "message": "Garden already exists",
+                "garden": sign_garden(stored)
+            })
+        garden_cache.invalidate_user(user_id)
 
         return respond(201, {
             "message": "Garden created successfully",
-            "garden": garden_item
+            "garden": sign_garden(garden_item)
         })
 
     except json.JSONDecodeError:
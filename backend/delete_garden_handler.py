@@ -1,11 +1,16 @@
 import json
-import boto3
+import aws_clients
 import os
 from botocore.exceptions import ClientError
+from garden_cache import garden_cache
+from garden_cleanup import delete_image_prefixes
+from garden_summary import ConcurrentModification, delete_garden
+from image_urls import sign_garden
 from simple_auth import require_auth, respond
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['GARDENS_TABLE'])
+s3_client = aws_clients.lazy_client('s3')
+table = aws_clients.lazy_table(os.environ['GARDENS_TABLE'])
+s3_bucket = os.environ.get('S3_BUCKET_NAME', 'florify-garden-images')
 
 @require_auth
 def handler(event, context):
@@ -18,24 +23,24 @@ def handler(event, context):
         if not garden_id:
             return respond(400, {"message": "Garden ID is required"})
 
-        # Delete garden from DynamoDB
-        response = table.delete_item(
-            Key={
-                'userId': user_id,
-                'gardenId': garden_id
-            },
-            ReturnValues="ALL_OLD"
-        )
-
-        deleted_garden = response.get('Attributes')
+        # Delete garden from DynamoDB and subtract it from the user's summary
+        deleted_garden = delete_garden(table, user_id, garden_id)
         if not deleted_garden:
             return respond(404, {"message": "Garden not found"})
+        garden_cache.invalidate_user(user_id)
+
+        # Remove uploaded images so they don't outlive the garden
+        _, failed = delete_image_prefixes(s3_client, s3_bucket, user_id, [garden_id])
+        if failed:
+            print(f"Images for garden {garden_id} were not fully deleted")
 
         return respond(200, {
             "message": "Garden deleted successfully",
-            "garden": deleted_garden
+            "garden": sign_garden(deleted_garden)
         })
 
+    except ConcurrentModification:
+        return respond(409, {"message": "Garden is being modified, please retry"})
     except ClientError as e:
         print(f"DynamoDB error: {e}")
         return respond(500, {"message": "Database error occurred"})
@@ -0,0 +1,124 @@
+import base64
+import binascii
+import hashlib
+import os
+
+from responses import CORS_HEADERS, get_header, respond
+
+# Browsers may reuse a response for max-age seconds, then serve it stale
+# while revalidating with If-None-Match for up to stale-while-revalidate seconds
+GARDENS_CACHE_CONTROL = os.environ.get(
+    'GARDENS_CACHE_CONTROL', 'private, max-age=5, stale-while-revalidate=60'
+)
+
+
+def item_version(item):
+    """Version token for one garden: `version` when present, else updatedAt."""
+    version = item.get('version')
+    if version is None:
+        version = item.get('updatedAt', '')
+    return f"{item.get('gardenId', '')}:{version}"
+
+
+def _etag(parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\x00')
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def _version_token(item):
+    """`v<version>` for versioned items, `u<base64 updatedAt>` for older items."""
+    version = item.get('version')
+    if version is not None:
+        return f"v{int(version)}"
+    updated_at = str(item.get('updatedAt', ''))
+    return 'u' + base64.urlsafe_b64encode(updated_at.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def item_etag(item, variant=''):
+    """
+    Strong ETag for a single garden: the version token plus a hash of the
+    representation variant (e.g. ?fields=), so If-Match can be turned into
+    a ConditionExpression without reading the item.
+    """
+    variant_hash = hashlib.sha256(variant.encode('utf-8')).hexdigest()[:8]
+    return f'"{_version_token(item)}.{variant_hash}"'
+
+
+def parse_item_etag(etag):
+    """
+    Return ('version', int) or ('updatedAt', str) from an item ETag,
+    or None if the value is not one of ours.
+    """
+    etag = etag.strip()
+    if etag.startswith('W/'):
+        etag = etag[2:]
+    if len(etag) < 2 or etag[0] != '"' or etag[-1] != '"' or '.' not in etag:
+        return None
+
+    token = etag[1:-1].split('.', 1)[0]
+    try:
+        if token.startswith('v'):
+            return 'version', int(token[1:])
+        if token.startswith('u'):
+            padded = token[1:] + '=' * (-len(token[1:]) % 4)
+            return 'updatedAt', base64.urlsafe_b64decode(padded).decode('utf-8')
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+    return None
+
+
+def item_matches_etag(item, etag):
+    """True if `item` is still the version described by an If-Match ETag."""
+    parsed = parse_item_etag(etag)
+    if parsed is None:
+        return False
+    kind, value = parsed
+    if kind == 'version':
+        return item.get('version') is not None and int(item['version']) == value
+    return item.get('version') is None and item.get('updatedAt') == value
+
+
+def list_etag(items, variant=''):
+    """
+    Strong ETag for a garden list, aggregated from every item's version so
+    any create, update or delete in the list changes it.
+    """
+    return _etag(['list', variant, len(items)] + [item_version(item) for item in items])
+
+
+def request_variant(event, *param_names):
+    """Encode the query parameters that change the representation into an ETag variant."""
+    query_params = event.get('queryStringParameters') or {}
+    return '&'.join(f"{name}={query_params.get(name) or ''}" for name in param_names)
+
+
+def etag_matches(event, etag):
+    """True if the request's If-None-Match covers `etag` (weak comparison, RFC 7232)."""
+    header = get_header(event, 'If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def conditional_respond(event, etag, body, status=200):
+    """Return 304 when the client already has `etag`, otherwise the full response."""
+    headers = {"ETag": etag, "Cache-Control": GARDENS_CACHE_CONTROL}
+    if etag_matches(event, etag):
+        return {
+            "statusCode": 304,
+            "headers": dict(CORS_HEADERS, **headers),
+            "body": ""
+        }
+    return respond(status, body, headers)
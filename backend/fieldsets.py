@@ -0,0 +1,66 @@
+# Attributes clients may request; anything else is rejected
+ALLOWED_FIELDS = (
+    'gardenId', 'name', 'location', 'description', 'imageUrl',
+    'status', 'plantCount', 'userEmail', 'createdAt', 'updatedAt', 'version',
+    'lat', 'lon', 'imageHash', 'imageVariants', 'imagePlaceholder'
+)
+
+# Named presets usable as `?fields=card` etc.
+FIELD_PRESETS = {
+    # Everything GardenCard.jsx renders
+    'card': ('gardenId', 'name', 'location', 'imageUrl', 'imageVariants', 'imagePlaceholder',
+             'status', 'plantCount', 'createdAt'),
+    'detail': ALLOWED_FIELDS
+}
+
+# Always projected so clients can address the item and pagination keeps working
+KEY_FIELDS = ('userId', 'gardenId')
+
+# Always projected so ETags (etags.item_version) see every change
+VERSION_FIELDS = ('updatedAt', 'version')
+
+
+def parse_fields(fields_param):
+    """
+    Parse a `fields` query parameter (preset name or comma-separated list).
+    Returns a tuple of attribute names, or None to read the full item.
+    Raises ValueError for unknown presets or attributes.
+    """
+    if not fields_param:
+        return None
+
+    if fields_param in FIELD_PRESETS:
+        requested = FIELD_PRESETS[fields_param]
+    else:
+        requested = [field.strip() for field in fields_param.split(',') if field.strip()]
+        unknown = [field for field in requested if field not in ALLOWED_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    fields = list(KEY_FIELDS + VERSION_FIELDS)
+    for field in requested:
+        if field not in fields:
+            fields.append(field)
+    return tuple(fields)
+
+
+def projection_kwargs(fields, existing_names=None):
+    """
+    Build ProjectionExpression / ExpressionAttributeNames kwargs for `fields`.
+    Every attribute goes through a placeholder since `name`, `location` and
+    `status` are DynamoDB reserved words. Returns {} when `fields` is None.
+    """
+    if not fields:
+        return {}
+
+    names = dict(existing_names or {})
+    placeholders = []
+    for index, field in enumerate(fields):
+        placeholder = f"#p{index}"
+        names[placeholder] = field
+        placeholders.append(placeholder)
+
+    return {
+        "ProjectionExpression": ", ".join(placeholders),
+        "ExpressionAttributeNames": names
+    }
@@ -0,0 +1,345 @@
+import decimal
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
+
+from responses import json_default
+
+# memory (per container), redis (shared, needs REDIS_URL) or none
+GARDEN_CACHE_BACKEND = os.environ.get('GARDEN_CACHE_BACKEND', 'memory')
+
+# Seconds an entry may be served. Writes in another container can't reach an
+# in-process cache, so the memory backend's default is kept short.
+GARDEN_CACHE_TTL = int(os.environ.get(
+    'GARDEN_CACHE_TTL', '60' if GARDEN_CACHE_BACKEND == 'redis' else '5'
+))
+
+GARDEN_CACHE_MAX_ENTRIES = int(os.environ.get('GARDEN_CACHE_MAX_ENTRIES', '2048'))
+
+# redis://[:password@]host:port/db
+REDIS_URL = os.environ.get('REDIS_URL', '')
+REDIS_TIMEOUT = float(os.environ.get('REDIS_TIMEOUT', '0.2'))
+
+# Log per-route hit ratios every N lookups (0 disables)
+GARDEN_CACHE_LOG_EVERY = int(os.environ.get('GARDEN_CACHE_LOG_EVERY', '100'))
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU with per-entry TTL. Values are stored as-is and shared
+    between callers, so treat them as read-only.
+    """
+
+    def __init__(self, max_entries=GARDEN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl=None, only_if_missing=False):
+        """Store `value`; returns False if only_if_missing and a live entry exists."""
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            if only_if_missing:
+                entry = self._entries.get(key)
+                if entry is not None and (entry[0] is None or entry[0] > time.time()):
+                    return False
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RespConnection:
+    """
+    Minimal Redis protocol (RESP2) client: one persistent socket per
+    container, reconnected once on failure. Only the commands the cache
+    needs are used, so it runs against Redis, ElastiCache/Valkey or the
+    local stand-in in tools/resp_server.py without extra dependencies.
+    """
+
+    def __init__(self, url, timeout=REDIS_TIMEOUT):
+        parsed = urlparse(url)
+        if parsed.scheme not in ('redis', ''):
+            raise ValueError(f"Unsupported cache URL scheme: {parsed.scheme}")
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._reader = sock.makefile('rb')
+        if self.password:
+            self._call('AUTH', self.password)
+        if self.db:
+            self._call('SELECT', self.db)
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    @staticmethod
+    def _encode(args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Cache connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode('utf-8')
+        if kind == b'-':
+            raise RuntimeError(payload.decode('utf-8'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(payload)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise ConnectionError(f"Unexpected cache reply: {line[:20]!r}")
+
+    def _call(self, *args):
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    def execute(self, *args):
+        """Run one command, reconnecting once if the socket went away."""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._call(*args)
+                except (OSError, ConnectionError):
+                    self.close()
+                    if attempt:
+                        raise
+
+
+class RedisCacheBackend:
+    """Shared cache in Redis; values are stored as JSON."""
+
+    def __init__(self, url=REDIS_URL, timeout=REDIS_TIMEOUT):
+        self.connection = RespConnection(url, timeout)
+
+    def get(self, key):
+        raw = self.connection.execute('GET', key)
+        if raw is None:
+            return None
+        # DynamoDB numbers come back as Decimal; keep them that way
+        return json.loads(raw, parse_float=decimal.Decimal)
+
+    def set(self, key, value, ttl=None, only_if_missing=False):
+        args = ['SET', key, json.dumps(value, default=json_default, separators=(',', ':'))]
+        if ttl:
+            args += ['EX', int(ttl)]
+        if only_if_missing:
+            args.append('NX')
+        return self.connection.execute(*args) is not None
+
+    def delete(self, *keys):
+        if keys:
+            self.connection.execute('DEL', *keys)
+
+    def clear(self):
+        self.connection.execute('FLUSHDB')
+
+
+class NullCacheBackend:
+    """Disables caching while keeping the read path identical."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None, only_if_missing=False):
+        return True
+
+    def delete(self, *keys):
+        pass
+
+    def clear(self):
+        pass
+
+
+def create_backend(name=GARDEN_CACHE_BACKEND):
+    """Build the configured backend, falling back to memory if Redis isn't configured."""
+    if name == 'redis':
+        if REDIS_URL:
+            return RedisCacheBackend(REDIS_URL)
+        print("GARDEN_CACHE_BACKEND=redis but REDIS_URL is not set, using memory")
+        name = 'memory'
+    if name == 'none':
+        return NullCacheBackend()
+    if name != 'memory':
+        print(f"Garden cache backend {name} unknown, using memory")
+    return MemoryCacheBackend()
+
+
+class GardenCache:
+    """
+    Read-through cache for garden reads.
+
+    Every key includes the user's cache generation:
+        gardens:{userId}:gen             -> random generation token
+        gardens:{userId}:{gen}:list:...  -> one page or full list
+        gardens:{userId}:{gen}:item:...  -> one garden
+        gardens:{userId}:{gen}:summary:  -> the user's summary
+
+    A write replaces the generation, so all of the user's list and item
+    entries become unreachable in one operation and expire on their own.
+    A read that raced a write stores its result under the old generation,
+    where nobody will find it.
+    """
+
+    def __init__(self, backend, ttl=GARDEN_CACHE_TTL, log_every=GARDEN_CACHE_LOG_EVERY):
+        self.backend = backend
+        self.ttl = ttl
+        self.log_every = log_every
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _generation_key(user_id):
+        return f"gardens:{user_id}:gen"
+
+    def generation(self, user_id):
+        """Current generation token for a user, creating one if none exists."""
+        key = self._generation_key(user_id)
+        generation = self.backend.get(key)
+        if generation is None:
+            # Outlives the entries it guards; if it is ever evicted a fresh
+            # token is created, which also orphans the old entries
+            self.backend.set(key, uuid.uuid4().hex, self.ttl * 10, only_if_missing=True)
+            generation = self.backend.get(key)
+        return generation
+
+    def invalidate_user(self, user_id):
+        """Drop every cached list and item for a user; call after any write."""
+        try:
+            self.backend.set(self._generation_key(user_id), uuid.uuid4().hex, self.ttl * 10)
+        except Exception as e:
+            # Entries still expire after ttl; better stale for seconds than a failed write
+            print(f"Garden cache invalidation failed for {user_id}: {e}")
+            self._record('invalidate', 'errors')
+
+    def entry_key(self, user_id, generation, kind, variant):
+        return f"gardens:{user_id}:{generation}:{kind}:{variant}"
+
+    def item_key(self, user_id, generation, garden_id, variant):
+        return f"gardens:{user_id}:{generation}:item:{garden_id}:{variant}"
+
+    def read_through(self, route, user_id, kind, variant, loader, garden_id=None):
+        """
+        Return the cached value for a list (`kind='list'`), item
+        (`kind='item'`) or other per-user read such as 'summary', calling
+        loader() and caching its result on a miss.
+        None results (e.g. missing gardens) are not cached.
+        """
+        try:
+            generation = self.generation(user_id)
+            if kind == 'item':
+                key = self.item_key(user_id, generation, garden_id, variant)
+            else:
+                key = self.entry_key(user_id, generation, kind, variant)
+            value = self.backend.get(key)
+        except Exception as e:
+            # A cache outage must not take reads down with it
+            print(f"Garden cache read failed ({route}): {e}")
+            self._record(route, 'errors')
+            return loader()
+
+        if value is not None:
+            self._record(route, 'hits')
+            return value
+
+        self._record(route, 'misses')
+        value = loader()
+        if value is not None:
+            try:
+                self.backend.set(key, value, self.ttl)
+            except Exception as e:
+                print(f"Garden cache write failed ({route}): {e}")
+                self._record(route, 'errors')
+        return value
+
+    def _record(self, route, outcome):
+        with self._lock:
+            counters = self._metrics.setdefault(route, {'hits': 0, 'misses': 0, 'errors': 0})
+            counters[outcome] += 1
+            lookups = counters['hits'] + counters['misses']
+
+        if outcome != 'errors' and self.log_every and lookups % self.log_every == 0:
+            print(f"Garden cache stats ({route}): {self.stats(route)}")
+
+    def stats(self, route=None):
+        """Hit/miss/error counters and hit ratio, for one route or all of them."""
+        with self._lock:
+            routes = [route] if route else list(self._metrics)
+            result = {}
+            for name in routes:
+                counters = dict(self._metrics.get(name, {'hits': 0, 'misses': 0, 'errors': 0}))
+                lookups = counters['hits'] + counters['misses']
+                counters['hitRatio'] = round(counters['hits'] / lookups, 3) if lookups else 0.0
+                result[name] = counters
+        return result[route] if route else result
+
+
+def fields_variant(fields):
+    """Cache variant for a parse_fields() result."""
+    return ','.join(sorted(fields)) if fields else '*'
+
+
+# One cache per container, shared by every garden handler
+garden_cache = GardenCache(create_backend())
@@ -0,0 +1,179 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+from boto3.dynamodb.types import TypeDeserializer
+
+import aws_clients
+from batch_ops import batch_write_requests
+from pagination import decode_cursor, encode_cursor, query_page
+
+# Tombstones for deleted gardens, so delta sync can report deletions:
+#   userId (HASH), deletedKey = "<deletedAt>#<gardenId>" (RANGE), gardenId,
+#   deletedAt, updatedAt (of the deleted garden), expiresAt (TTL, epoch seconds)
+# A range condition on deletedKey finds every deletion since a sync token.
+tombstone_table_name = os.environ.get('GARDEN_TOMBSTONE_TABLE', 'florify-garden-tombstones-dev')
+tombstone_table = aws_clients.lazy_table(tombstone_table_name)
+gardens_table = aws_clients.lazy_table(os.environ['GARDENS_TABLE'])
+dynamodb = aws_clients.lazy_resource('dynamodb')
+deserializer = TypeDeserializer()
+
+UPDATED_AT_INDEX = 'userId-updatedAt-index'
+
+# Tombstones live this long; older sync tokens get 410 and a full reload
+TOMBSTONE_RETENTION_DAYS = int(os.environ.get('TOMBSTONE_RETENTION_DAYS', '30'))
+
+# Each new token starts this far before the sync began, so writes still in
+# flight (GSI propagation, stream lag, clock skew between containers) are
+# picked up next time. Clients see them twice and apply them idempotently.
+SYNC_OVERLAP_SECONDS = int(os.environ.get('SYNC_OVERLAP_SECONDS', '5'))
+
+# Changed gardens per response; more are fetched by following the token
+CHANGES_PAGE_SIZE = 200
+
+
+class SyncTokenExpired(Exception):
+    """The token predates the tombstone retention window."""
+
+
+def tombstone_requests(records, now=None):
+    """PutRequests for the REMOVE records of a gardens table stream batch."""
+    now = now or datetime.utcnow()
+    deleted_at = now.isoformat()
+    expires_at = int(time.time()) + TOMBSTONE_RETENTION_DAYS * 86400
+
+    pending = {}
+    for record in records:
+        if record.get('eventName') != 'REMOVE':
+            continue
+        data = record.get('dynamodb', {})
+        keys = {key: deserializer.deserialize(value) for key, value in data.get('Keys', {}).items()}
+        old_image = data.get('OldImage') or {}
+        updated_at = deserializer.deserialize(old_image['updatedAt']) if 'updatedAt' in old_image else ''
+        item = {
+            'userId': keys['userId'],
+            'deletedKey': f"{deleted_at}#{keys['gardenId']}",
+            'gardenId': keys['gardenId'],
+            'deletedAt': deleted_at,
+            'updatedAt': updated_at,
+            'expiresAt': expires_at
+        }
+        pending[(item['userId'], item['deletedKey'])] = {"PutRequest": {"Item": item}}
+    return list(pending.values())
+
+
+def handler(event, context):
+    """
+    Gardens table stream consumer: one tombstone per deleted garden, whatever
+    deleted it (single delete, bulk delete). Puts are keyed by delete time,
+    so a retried batch only adds a duplicate tombstone, which is harmless.
+    """
+    requests = tombstone_requests(event.get('Records', []))
+    if requests:
+        failed = batch_write_requests(dynamodb, tombstone_table_name, requests)
+        if failed:
+            raise RuntimeError(f"{len(failed)} tombstone writes failed")
+    print(f"Tombstones: {len(requests)} written")
+    return {"tombstones": len(requests)}
+
+
+def _token_scope(user_id):
+    return f"{user_id}|changes"
+
+
+def encode_sync_token(user_id, since, started=None, start_key=None):
+    """
+    Opaque, signed sync token. `since` is the updatedAt/deletedAt lower bound
+    (None: everything); while a sync spans several pages, `started` and
+    `start_key` carry its start time and the position in the index.
+    """
+    payload = {"since": since}
+    if started:
+        payload.update(started=started, after=start_key)
+    return encode_cursor(payload, _token_scope(user_id))
+
+
+def decode_sync_token(user_id, token):
+    """Returns (since, started, start_key). Raises ValueError or SyncTokenExpired."""
+    payload = decode_cursor(token, _token_scope(user_id))
+    if not isinstance(payload, dict) or 'since' not in payload:
+        raise ValueError("Invalid sync token")
+    since = payload['since']
+    horizon = (datetime.utcnow() - timedelta(days=TOMBSTONE_RETENTION_DAYS)).isoformat()
+    if since is not None and since < horizon:
+        raise SyncTokenExpired()
+    return since, payload.get('started'), payload.get('after')
+
+
+def _deleted_since(user_id, since):
+    items = []
+    kwargs = {
+        "KeyConditionExpression": 'userId = :userId AND deletedKey > :since',
+        "ExpressionAttributeValues": {':userId': user_id, ':since': since},
+        "ProjectionExpression": 'gardenId, deletedAt, updatedAt'
+    }
+    while True:
+        response = tombstone_table.query(**kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response['LastEvaluatedKey']
+
+
+def _reconcile(changed, deleted):
+    """
+    Pair up gardens that appear both as changed and deleted. A garden
+    re-created after its deletion is newer than its tombstone and stays; an
+    index entry not yet caught up with a delete is not, and is dropped.
+    """
+    latest_deletion = {}
+    for tombstone in deleted:
+        previous = latest_deletion.get(tombstone['gardenId'])
+        if previous is None or tombstone['deletedAt'] > previous['deletedAt']:
+            latest_deletion[tombstone['gardenId']] = tombstone
+
+    kept, recreated = [], set()
+    for garden in changed:
+        tombstone = latest_deletion.get(garden['gardenId'])
+        if tombstone is None:
+            kept.append(garden)
+        elif garden.get('updatedAt', '') > tombstone.get('updatedAt', ''):
+            kept.append(garden)
+            recreated.add(garden['gardenId'])
+
+    tombstones = [
+        {"gardenId": garden_id, "deletedAt": tombstone['deletedAt'], "updatedAt": tombstone.get('updatedAt', '')}
+        for garden_id, tombstone in latest_deletion.items() if garden_id not in recreated
+    ]
+    return kept, tombstones
+
+
+def changes_since(user_id, since=None, started=None, start_key=None, projection=None):
+    """
+    One page of a delta sync. Returns (changed, deleted, next_token, has_more):
+    gardens written after `since` (every garden when None) in updatedAt
+    order, and, on the last page, the gardens deleted since then. The token
+    of the last page starts the next sync.
+    """
+    started = started or datetime.utcnow().isoformat()
+
+    query_kwargs = {
+        "IndexName": UPDATED_AT_INDEX,
+        "KeyConditionExpression": 'userId = :userId',
+        "ExpressionAttributeValues": {':userId': user_id},
+        "ScanIndexForward": True
+    }
+    if since is not None:
+        query_kwargs["KeyConditionExpression"] += ' AND updatedAt > :since'
+        query_kwargs["ExpressionAttributeValues"][':since'] = since
+    query_kwargs.update(projection or {})
+
+    changed, last_key = query_page(gardens_table, query_kwargs, CHANGES_PAGE_SIZE, start_key)
+    if last_key:
+        return changed, [], encode_sync_token(user_id, since, started, last_key), True
+
+    deleted = _deleted_since(user_id, since) if since is not None else []
+    changed, deleted = _reconcile(changed, deleted)
+
+    next_since = (datetime.fromisoformat(started) - timedelta(seconds=SYNC_OVERLAP_SECONDS)).isoformat()
+    return changed, deleted, encode_sync_token(user_id, next_since), False
@@ -0,0 +1,46 @@
+from botocore.exceptions import ClientError
+from fieldsets import parse_fields, projection_kwargs
+from garden_changes import SyncTokenExpired, changes_since, decode_sync_token
+from image_urls import sign_gardens
+from simple_auth import require_auth, respond
+
+@require_auth
+def handler(event, context):
+    """
+    GET /gardens/changes[?since=<syncToken>][&fields=...]
+
+    Without `since`, every garden (the starting point of a local replica);
+    with it, only gardens written since that token plus `deleted` tombstones.
+    Follow `syncToken` while `hasMore` is true, then keep the last one for
+    the next refresh.
+    """
+    try:
+        # Get authenticated user ID from the decorator
+        user_id = event['user_id']
+
+        query_params = event.get('queryStringParameters') or {}
+        fields = parse_fields(query_params.get('fields'))
+
+        token = query_params.get('since')
+        since, started, start_key = decode_sync_token(user_id, token) if token else (None, None, None)
+
+        changed, deleted, sync_token, has_more = changes_since(
+            user_id, since, started, start_key, projection_kwargs(fields)
+        )
+        return respond(200, {
+            "changes": sign_gardens(changed),
+            "deleted": deleted,
+            "syncToken": sync_token,
+            "hasMore": has_more
+        })
+
+    except SyncTokenExpired:
+        return respond(410, {"message": "Sync token expired, reload all gardens"})
+    except ValueError as e:
+        return respond(400, {"message": str(e)})
+    except ClientError as e:
+        print(f"DynamoDB error: {e}")
+        return respond(500, {"message": "Database error occurred"})
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return respond(500, {"message": "Internal server error"})
@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError
+from batch_ops import batch_write_requests, chunked
+from garden_images import (
+    OWNER_METADATA_KEY, garden_prefix, is_legacy_garden_key, is_legacy_original_key, legacy_garden_prefix
+)
+
+# DeleteObjects accepts at most 1000 keys per call
+S3_DELETE_MAX_KEYS = 1000
+
+# Concurrent garden prefixes cleaned per invocation
+S3_CLEANUP_WORKERS = 8
+
+
+def _delete_keys(s3_client, bucket, keys):
+    """DeleteObjects in 1000-key batches; raises ClientError on the first failed key."""
+    for batch in chunked([{'Key': key} for key in keys], S3_DELETE_MAX_KEYS):
+        response = s3_client.delete_objects(Bucket=bucket, Delete={'Objects': batch, 'Quiet': True})
+        errors = response.get('Errors', [])
+        if errors:
+            raise ClientError(
+                {'Error': {'Code': errors[0].get('Code', 'DeleteError'), 'Message': errors[0].get('Message', '')}},
+                'DeleteObjects'
+            )
+    return len(keys)
+
+
+def _list_keys(s3_client, bucket, prefix):
+    paginator = s3_client.get_paginator('list_objects_v2')
+    return [obj['Key'] for page in paginator.paginate(Bucket=bucket, Prefix=prefix) for obj in page.get('Contents', [])]
+
+
+def _owns_legacy_images(s3_client, bucket, user_id, keys):
+    """
+    Legacy keys carry no owner, and another user may have a garden with the
+    same gardenId: only the owner metadata on the original proves ownership.
+    Originals uploaded before that metadata existed are left in place.
+    """
+    originals = [key for key in keys if is_legacy_original_key(key)]
+    if not originals:
+        return False
+    metadata = s3_client.head_object(Bucket=bucket, Key=originals[0]).get('Metadata', {})
+    return metadata.get(OWNER_METADATA_KEY) == user_id
+
+
+def delete_image_prefix(s3_client, bucket, user_id, garden_id):
+    """
+    Delete every object uploaded for one user's garden, plus its images in
+    the legacy gardens/<gardenId>/ layout when they provably belong to that
+    user. Returns the number of objects deleted; raises ClientError on
+    failure. Safe to repeat: an already-empty prefix deletes nothing.
+    """
+    deleted = _delete_keys(s3_client, bucket, _list_keys(s3_client, bucket, garden_prefix(user_id, garden_id)))
+
+    legacy_keys = [
+        key for key in _list_keys(s3_client, bucket, legacy_garden_prefix(garden_id))
+        if is_legacy_garden_key(key, garden_id)
+    ]
+    if legacy_keys and _owns_legacy_images(s3_client, bucket, user_id, legacy_keys):
+        deleted += _delete_keys(s3_client, bucket, legacy_keys)
+    return deleted
+
+
+def delete_image_prefixes(s3_client, bucket, user_id, garden_ids, max_workers=S3_CLEANUP_WORKERS):
+    """
+    Clean the S3 prefixes of many of one user's gardens in parallel.
+    Returns (objects_deleted, failed_garden_ids).
+    """
+    if not garden_ids:
+        return 0, []
+
+    def clean(garden_id):
+        try:
+            return garden_id, delete_image_prefix(s3_client, bucket, user_id, garden_id)
+        except ClientError as e:
+            print(f"Error deleting images for garden {garden_id}: {e}")
+            return garden_id, None
+
+    deleted = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(garden_ids))) as executor:
+        for garden_id, count in executor.map(clean, garden_ids):
+            if count is None:
+                failed.append(garden_id)
+            else:
+                deleted += count
+    return deleted, failed
+
+
+def delete_garden_items(dynamodb, table_name, user_id, garden_ids):
+    """
+    Delete garden items with batched writes.
+    Returns the garden IDs whose delete could not be applied.
+    """
+    requests = [
+        {"DeleteRequest": {"Key": {"userId": user_id, "gardenId": garden_id}}}
+        for garden_id in garden_ids
+    ]
+    failed = batch_write_requests(dynamodb, table_name, requests)
+    return [request["DeleteRequest"]["Key"]["gardenId"] for request in failed]
@@ -0,0 +1,100 @@
+import os
+import re
+
+# Where garden images live and how browsers reach them
+S3_BUCKET_NAME = os.environ.get('S3_BUCKET_NAME', 'florify-garden-images')
+S3_REGION = os.environ.get('S3_REGION', os.environ.get('COGNITO_REGION', 'eu-north-1'))
+
+# Public base URL for objects; override for a CDN or a local S3 stand-in
+IMAGE_PUBLIC_BASE_URL = os.environ.get(
+    'IMAGE_PUBLIC_BASE_URL', f"https://{S3_BUCKET_NAME}.s3.{S3_REGION}.amazonaws.com"
+).rstrip('/')
+
+# Object metadata (x-amz-meta-*) naming the uploading user; signed into the
+# presigned POST so the image processor knows whose garden to update
+OWNER_METADATA_KEY = 'user-id'
+
+# Original uploads: gardens/<userId>/<gardenId>/image.<ext>. Derivatives go
+# under gardens/<userId>/<gardenId>/derived/ so the processor never
+# re-triggers on its output. Clients choose gardenIds, and (userId, gardenId)
+# is the table key, so the owner is part of every key: one user's garden can
+# never share (or clean up) another user's prefix.
+_ORIGINAL_KEY = re.compile(r'^gardens/(?P<userId>[^/]+)/(?P<gardenId>[^/]+)/image\.[A-Za-z0-9]{1,8}$')
+
+# Uploads made before the owner was part of the key:
+# gardens/<gardenId>/image.<ext> and gardens/<gardenId>/derived/...
+_LEGACY_GARDEN_KEY = re.compile(r'^gardens/(?P<gardenId>[^/]+)/(image\.[A-Za-z0-9]{1,8}|derived/[^/]+)$')
+_LEGACY_ORIGINAL_KEY = re.compile(r'^gardens/[^/]+/image\.[A-Za-z0-9]{1,8}$')
+
+# Content-addressed uploads: content/sha256/<hex>/original plus its
+# derivatives, shared by every garden that references the hash
+_SHA256 = re.compile(r'^[0-9a-f]{64}$')
+
+
+def original_key(user_id, garden_id, filename):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else 'jpg'
+    if not re.match(r'^[a-z0-9]{1,8}$', extension):
+        extension = 'jpg'
+    return f"{garden_prefix(user_id, garden_id)}image.{extension}"
+
+
+def parse_original_key(key):
+    """(userId, gardenId) of an original upload key, or None for anything else (derivatives included)."""
+    match = _ORIGINAL_KEY.match(key)
+    return (match.group('userId'), match.group('gardenId')) if match else None
+
+
+def garden_prefix(user_id, garden_id):
+    """S3 prefix holding every object uploaded for one user's garden"""
+    return f"gardens/{user_id}/{garden_id}/"
+
+
+def derived_prefix(user_id, garden_id):
+    return f"{garden_prefix(user_id, garden_id)}derived/"
+
+
+def legacy_garden_prefix(garden_id):
+    return f"gardens/{garden_id}/"
+
+
+def is_legacy_garden_key(key, garden_id):
+    match = _LEGACY_GARDEN_KEY.match(key)
+    return match is not None and match.group('gardenId') == garden_id
+
+
+def is_legacy_original_key(key):
+    return bool(_LEGACY_ORIGINAL_KEY.match(key))
+
+
+def is_sha256(value):
+    return isinstance(value, str) and bool(_SHA256.match(value))
+
+
+def content_prefix(sha256):
+    return f"content/sha256/{sha256}/"
+
+
+def content_key(sha256):
+    return f"{content_prefix(sha256)}original"
+
+
+def staging_key(user_id, session_id):
+    """Multipart uploads land here until their hash is verified."""
+    return f"uploads/{user_id}/{session_id}"
+
+
+def manifest_key(prefix):
+    return f"{prefix}manifest.json"
+
+
+def variant_key(prefix, width, extension, source_tag=None):
+    """
+    Per-garden derivative keys embed the source's ETag, so each upload gets
+    fresh, immutable URLs; content-addressed prefixes are immutable already.
+    """
+    name = f"{source_tag}-w{width}" if source_tag else f"w{width}"
+    return f"{prefix}{name}.{extension}"
+
+
+def public_url(key):
+    return f"{IMAGE_PUBLIC_BASE_URL}/{key}"
@@ -0,0 +1,146 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+
+import aws_clients
+from responses import encode_body
+
+# Open WebSocket connections:
+#   connectionId (HASH), userId, connectedAt, expiresAt (TTL, epoch seconds)
+# with userId-index (userId HASH) to find every connection of one user.
+connections_table_name = os.environ.get('GARDEN_CONNECTIONS_TABLE', 'florify-garden-connections-dev')
+connections_table = aws_clients.lazy_table(connections_table_name)
+deserializer = TypeDeserializer()
+
+USER_INDEX = 'userId-index'
+
+# https://{api}.execute-api.{region}.amazonaws.com/{stage} of the WebSocket
+# API (set by serverless.yml); pushing is skipped when empty
+PUSH_ENDPOINT = os.environ.get('PUSH_ENDPOINT', '')
+
+# API Gateway closes WebSocket connections after 2 hours; rows left behind
+# by a missed $disconnect expire shortly after
+CONNECTION_TTL_SECONDS = 2 * 3600 + 600
+
+# Parallel post_to_connection calls per stream batch
+PUSH_WORKERS = 8
+
+MESSAGE_TYPE = 'gardens.changed'
+
+
+def register_connection(connection_id, user_id, now=None):
+    now = int(now or time.time())
+    connections_table.put_item(Item={
+        'connectionId': connection_id,
+        'userId': user_id,
+        'connectedAt': now,
+        'expiresAt': now + CONNECTION_TTL_SECONDS
+    })
+
+
+def forget_connection(connection_id):
+    connections_table.delete_item(Key={'connectionId': connection_id})
+
+
+def user_connections(user_id):
+    """Connection IDs currently registered for a user."""
+    connection_ids = []
+    kwargs = {
+        "IndexName": USER_INDEX,
+        "KeyConditionExpression": 'userId = :userId',
+        "ExpressionAttributeValues": {':userId': user_id}
+    }
+    while True:
+        response = connections_table.query(**kwargs)
+        connection_ids.extend(item['connectionId'] for item in response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return connection_ids
+        kwargs["ExclusiveStartKey"] = response['LastEvaluatedKey']
+
+
+def _attribute(image, name):
+    value = image.get(name)
+    return deserializer.deserialize(value) if value is not None else None
+
+
+def change_events(records):
+    """
+    {userId: [change, ...]} for a gardens table stream batch, one change per
+    garden (its latest in the batch): {"gardenId", "op": "upsert"|"delete",
+    "updatedAt", "version"}. Only what changed is sent; clients fetch the
+    gardens themselves with GET /gardens/changes.
+    """
+    changes = {}
+    for record in records:
+        data = record.get('dynamodb', {})
+        keys = data.get('Keys', {})
+        user_id = deserializer.deserialize(keys['userId'])
+        garden_id = deserializer.deserialize(keys['gardenId'])
+
+        if record.get('eventName') == 'REMOVE':
+            image, op = data.get('OldImage') or {}, 'delete'
+        else:
+            image, op = data.get('NewImage') or {}, 'upsert'
+        version = _attribute(image, 'version')
+        changes.setdefault(user_id, {})[garden_id] = {
+            "gardenId": garden_id,
+            "op": op,
+            "updatedAt": _attribute(image, 'updatedAt'),
+            "version": int(version) if version is not None else None
+        }
+    return {user_id: list(by_garden.values()) for user_id, by_garden in changes.items()}
+
+
+def management_client():
+    return aws_clients.endpoint_client('apigatewaymanagementapi', PUSH_ENDPOINT)
+
+
+def post_message(connection_id, data):
+    """Send one message; returns False when the connection is gone."""
+    try:
+        management_client().post_to_connection(ConnectionId=connection_id, Data=data)
+        return True
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'GoneException':
+            return False
+        raise
+
+
+def _deliver(connection_id, data):
+    try:
+        return connection_id, post_message(connection_id, data)
+    except Exception as e:
+        # One broken connection must not hold up the others
+        print(f"Push to {connection_id} failed: {e}")
+        return connection_id, True
+
+
+def handler(event, context):
+    """
+    Gardens table stream consumer: tells every open connection of a user
+    which of their gardens changed. Best effort: a failed post is logged,
+    not retried, since clients also resync with GET /gardens/changes when
+    they reconnect. Connections API Gateway reports gone are forgotten.
+    """
+    if not PUSH_ENDPOINT:
+        return {"pushed": 0}
+
+    deliveries = []
+    for user_id, changes in change_events(event.get('Records', [])).items():
+        data = encode_body({"type": MESSAGE_TYPE, "changes": changes}).encode('utf-8')
+        deliveries.extend((connection_id, data) for connection_id in user_connections(user_id))
+
+    gone = []
+    if deliveries:
+        with ThreadPoolExecutor(max_workers=min(PUSH_WORKERS, len(deliveries))) as executor:
+            for connection_id, delivered in executor.map(lambda delivery: _deliver(*delivery), deliveries):
+                if not delivered:
+                    gone.append(connection_id)
+    for connection_id in gone:
+        forget_connection(connection_id)
+
+    print(f"Push: {len(deliveries) - len(gone)} messages sent, {len(gone)} connections gone")
+    return {"pushed": len(deliveries) - len(gone), "gone": len(gone)}
@@ -0,0 +1,46 @@
+from botocore.exceptions import ClientError
+from garden_push import forget_connection, register_connection
+from responses import encode_body
+from token_verifier import verify_token
+
+def _status(code, message):
+    return {"statusCode": code, "body": encode_body({"message": message})}
+
+def connect(event, context):
+    """
+    $connect: browsers can't set headers on a WebSocket, so the Cognito
+    token comes as ?token=... and is verified like an Authorization header.
+    """
+    query_params = event.get('queryStringParameters') or {}
+    claims, error = verify_token(query_params.get('token'))
+    if error or not claims.get('sub'):
+        return _status(401, f"Authentication required: {error or 'No user ID found in token'}")
+
+    register_connection(event['requestContext']['connectionId'], claims['sub'])
+    return _status(200, "Connected")
+
+def disconnect(event, context):
+    forget_connection(event['requestContext']['connectionId'])
+    return _status(200, "Disconnected")
+
+def default(event, context):
+    # Clients only listen; anything they send (e.g. keep-alive pings) is acknowledged
+    return _status(200, "OK")
+
+ROUTES = {
+    '$connect': connect,
+    '$disconnect': disconnect,
+    '$default': default
+}
+
+def handler(event, context):
+    """Entry point for every route of the WebSocket push API"""
+    route_key = (event.get('requestContext') or {}).get('routeKey')
+    try:
+        return ROUTES.get(route_key, default)(event, context)
+    except ClientError as e:
+        print(f"DynamoDB error: {e}")
+        return _status(500, "Database error occurred")
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return _status(500, "Internal server error")
@@ -0,0 +1,135 @@
+import uuid
+from datetime import datetime
+
+import geo
+from garden_images import is_sha256
+from geocoding import geocode
+from image_store import content_image_fields
+
+
+def coordinate_fields(data, location):
+    """
+    Coordinates for a garden: lat/lon from the request when given, otherwise
+    geocoded from `location` with the offline gazetteer. Returns (fields,
+    error); fields is empty when the location isn't a known place.
+    """
+    if data.get("lat") is not None or data.get("lon") is not None:
+        try:
+            lat, lon = geo.validate_coordinates(data.get("lat"), data.get("lon"))
+        except ValueError as e:
+            return None, str(e)
+        source = "client"
+    else:
+        place = geocode(location)
+        if not place:
+            return {}, None
+        lat, lon = place["lat"], place["lon"]
+        source = "gazetteer"
+
+    return {
+        "lat": geo.to_decimal(lat),
+        "lon": geo.to_decimal(lon),
+        "geohash": geo.encode(lat, lon),
+        "geoSource": source
+    }, None
+
+
+def image_fields(data):
+    """
+    Image attributes for a garden that references shared uploaded content
+    by `imageHash` (see upload_sessions.py). Returns (fields, error);
+    fields is empty when no imageHash was sent.
+    """
+    image_hash = data.get("imageHash")
+    if image_hash is None:
+        return {}, None
+    if not is_sha256(image_hash):
+        return None, "imageHash must be 64 lowercase hex digits"
+    fields = content_image_fields(image_hash)
+    if fields is None:
+        return None, "imageHash does not match an uploaded image"
+    return fields, None
+
+
+# Text attributes: required ones must be non-empty strings, the rest strings.
+# Anything else would fail later (floats can't be serialized, and a number
+# as `name` breaks the S-typed userId-name-index key), failing a whole batch.
+REQUIRED_TEXT_FIELDS = ("name", "location")
+OPTIONAL_TEXT_FIELDS = ("description", "imageUrl")
+
+
+def text_field_error(data, fields, required):
+    """Error message for the first of `fields` in `data` with a bad type, or None."""
+    for field in fields:
+        value = data.get(field)
+        if value is None and not required:
+            continue
+        if not isinstance(value, str):
+            return f"{field} must be a string"
+        if required and not value.strip():
+            return f"{field} must not be empty"
+    return None
+
+
+def is_uuid(value):
+    """True for a UUID in its canonical lowercase, hyphenated form."""
+    if not isinstance(value, str):
+        return False
+    try:
+        return str(uuid.UUID(value)) == value
+    except ValueError:
+        return False
+
+
+def build_garden_item(user_id, data, user_email=None, now=None):
+    """
+    Validate a create request body and build the DynamoDB item for it.
+    Returns (item, None) or (None, error_message).
+    """
+    if not isinstance(data, dict):
+        return None, "Garden must be a JSON object"
+
+    garden_name = data.get("name")
+    garden_location = data.get("location")
+    if not garden_name or not garden_location:
+        return None, "Garden name and location are required"
+    error = (text_field_error(data, REQUIRED_TEXT_FIELDS, required=True)
+             or text_field_error(data, OPTIONAL_TEXT_FIELDS, required=False))
+    if error:
+        return None, error
+
+    # Use provided gardenId (lets clients retry idempotently) or generate one
+    garden_id = data.get("gardenId") or str(uuid.uuid4())
+    if not is_uuid(garden_id):
+        return None, "gardenId must be a UUID"
+
+    current_time = now or datetime.utcnow().isoformat()
+    item = {
+        "userId": user_id,
+        "gardenId": garden_id,
+        "name": garden_name,
+        "location": garden_location,
+        "description": data.get("description") or "",
+        "imageUrl": data.get("imageUrl") or "",
+        "status": "active",
+        "plantCount": 0,
+        "version": 1,
+        "createdAt": current_time,
+        "updatedAt": current_time
+    }
+    if user_email is not None:
+        item["userEmail"] = user_email
+
+    # Coordinates + geohash feed GET /gardens/nearby
+    coordinates, error = coordinate_fields(data, garden_location)
+    if error:
+        return None, error
+    item.update(coordinates)
+
+    # Uploaded content is shared: the item references it, never copies it
+    images, error = image_fields(data)
+    if error:
+        return None, error
+    item.update(images)
+
+    return item, None
@@ -0,0 +1,166 @@
+import math
+import os
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+import aws_clients
+
+# Inverted index: one posting per (user, term, garden)
+#   userId (HASH), termKey = "<term>#<gardenId>" (RANGE), gardenId, term, weight
+# begins_with(termKey, "<prefix>") finds every term starting with a prefix in
+# one Query, so prefix search needs no extra index.
+search_table_name = os.environ.get('GARDEN_SEARCH_TABLE', 'florify-garden-search-dev')
+search_table = aws_clients.lazy_table(search_table_name)
+
+# Fields indexed and how much a match in each is worth
+FIELD_WEIGHTS = {
+    'name': 3,
+    'location': 2,
+    'description': 1
+}
+
+# Repeats of a term in one field stop adding weight after this many
+MAX_TERM_FREQUENCY = 3
+
+# Bounds that keep a posting list (and a garden's postings) reasonable
+MAX_TERM_LENGTH = 40
+MAX_TERMS_PER_FIELD = 200
+
+# Query limits
+MAX_QUERY_TERMS = 5
+MAX_POSTINGS_PER_TERM = int(os.environ.get('SEARCH_MAX_POSTINGS_PER_TERM', '2000'))
+DEFAULT_SEARCH_RESULTS = 20
+MAX_SEARCH_RESULTS = 50
+
+# Score multiplier for a prefix match relative to an exact term match
+PREFIX_MATCH_FACTOR = 0.5
+
+STOPWORDS = frozenset(('a', 'an', 'and', 'at', 'by', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with'))
+
+_TOKEN_PATTERN = re.compile(r'[0-9a-z]+')
+
+
+def tokenize(text):
+    """Lowercase, strip accents and split on anything that isn't a letter or digit."""
+    if not isinstance(text, str) or not text:
+        return []
+    folded = unicodedata.normalize('NFKD', text.lower())
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch))
+    return [
+        token[:MAX_TERM_LENGTH] for token in _TOKEN_PATTERN.findall(folded)
+        if token not in STOPWORDS
+    ]
+
+
+def garden_terms(item):
+    """Return {term: weight} for a garden item (empty for None)."""
+    terms = {}
+    if not item:
+        return terms
+    for field, field_weight in FIELD_WEIGHTS.items():
+        counts = {}
+        for token in tokenize(item.get(field))[:MAX_TERMS_PER_FIELD]:
+            counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            terms[token] = terms.get(token, 0) + field_weight * min(count, MAX_TERM_FREQUENCY)
+    return terms
+
+
+def posting_key(term, garden_id):
+    return f"{term}#{garden_id}"
+
+
+def posting_item(user_id, garden_id, term, weight):
+    return {
+        'userId': user_id,
+        'termKey': posting_key(term, garden_id),
+        'gardenId': garden_id,
+        'term': term,
+        'weight': weight
+    }
+
+
+def posting_requests(user_id, garden_id, old_terms, new_terms):
+    """
+    BatchWriteItem requests that turn a garden's postings for `old_terms`
+    into postings for `new_terms`, touching only the terms that changed.
+    """
+    requests = []
+    for term in old_terms:
+        if term not in new_terms:
+            requests.append({"DeleteRequest": {"Key": {'userId': user_id, 'termKey': posting_key(term, garden_id)}}})
+    for term, weight in new_terms.items():
+        if old_terms.get(term) != weight:
+            requests.append({"PutRequest": {"Item": posting_item(user_id, garden_id, term, weight)}})
+    return requests
+
+
+def query_postings(user_id, prefix):
+    """Postings for every term starting with `prefix`, capped at MAX_POSTINGS_PER_TERM."""
+    postings = []
+    kwargs = {
+        "KeyConditionExpression": "userId = :userId AND begins_with(termKey, :prefix)",
+        "ExpressionAttributeValues": {':userId': user_id, ':prefix': prefix},
+        "ProjectionExpression": "gardenId, #term, weight",
+        "ExpressionAttributeNames": {'#term': 'term'}
+    }
+    while len(postings) < MAX_POSTINGS_PER_TERM:
+        kwargs["Limit"] = MAX_POSTINGS_PER_TERM - len(postings)
+        response = search_table.query(**kwargs)
+        postings.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response['LastEvaluatedKey']
+    return postings
+
+
+def parse_query(text):
+    """Query terms, deduplicated and capped; raises ValueError if nothing is searchable."""
+    terms = list(dict.fromkeys(tokenize(text)))[:MAX_QUERY_TERMS]
+    if not terms:
+        raise ValueError("q must contain at least one word")
+    return terms
+
+
+def rank(terms, postings_by_term):
+    """
+    Score gardens matching every query term. Each term contributes its best
+    posting weight (full for an exact term, reduced for a longer term it is
+    a prefix of) times an IDF-style factor, so rare terms count for more.
+    Returns [(gardenId, score)] best first.
+    """
+    candidates = set()
+    for postings in postings_by_term.values():
+        candidates.update(posting['gardenId'] for posting in postings)
+    total = max(len(candidates), 1)
+
+    scores = None
+    for term in terms:
+        best = {}
+        for posting in postings_by_term.get(term, []):
+            weight = float(posting['weight'])
+            if posting['term'] != term:
+                weight *= PREFIX_MATCH_FACTOR * (1 + len(term) / len(posting['term']))
+            garden_id = posting['gardenId']
+            if weight > best.get(garden_id, 0):
+                best[garden_id] = weight
+
+        idf = math.log(1 + total / max(len(best), 1))
+        term_scores = {garden_id: weight * idf for garden_id, weight in best.items()}
+        if scores is None:
+            scores = term_scores
+        else:
+            # Every term must match
+            scores = {garden_id: score + term_scores[garden_id]
+                      for garden_id, score in scores.items() if garden_id in term_scores}
+
+    return sorted((scores or {}).items(), key=lambda entry: (-entry[1], entry[0]))
+
+
+def search_garden_ids(user_id, text):
+    """Return [(gardenId, score)] for a search string, best first."""
+    terms = parse_query(text)
+    with ThreadPoolExecutor(max_workers=len(terms)) as executor:
+        postings = dict(zip(terms, executor.map(lambda term: query_postings(user_id, term), terms)))
+    return rank(terms, postings)
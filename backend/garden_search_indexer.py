@@ -0,0 +1,128 @@
+import aws_clients
+import os
+from boto3.dynamodb.types import TypeDeserializer
+from batch_ops import batch_write_requests
+from garden_search import garden_terms, posting_requests, search_table, search_table_name
+
+dynamodb = aws_clients.lazy_resource('dynamodb')
+table = aws_clients.lazy_table(os.environ['GARDENS_TABLE'])
+deserializer = TypeDeserializer()
+
+# Stop starting new users when less than this much Lambda time remains
+RESUME_MARGIN_MS = 10000
+
+def _image(record, name):
+    image = record.get('dynamodb', {}).get(name)
+    if not image:
+        return None
+    return {key: deserializer.deserialize(value) for key, value in image.items()}
+
+def _write(requests):
+    """Write posting changes; raise so the stream batch is retried if any fail."""
+    failed = batch_write_requests(dynamodb, search_table_name, requests)
+    if failed:
+        raise RuntimeError(f"{len(failed)} search index writes failed")
+
+def handler(event, context):
+    """
+    DynamoDB Streams consumer for the gardens table (NEW_AND_OLD_IMAGES).
+    Diffs each garden's terms before and after the change and writes only
+    the postings that changed. Writes are idempotent, so a retried batch
+    is safe.
+    """
+    # Keyed by posting: BatchWriteItem rejects two requests for one key, and
+    # the latest change to a garden in this batch is the one that counts
+    pending = {}
+    for record in event.get('Records', []):
+        keys = record.get('dynamodb', {}).get('Keys', {})
+        user_id = deserializer.deserialize(keys['userId'])
+        garden_id = deserializer.deserialize(keys['gardenId'])
+
+        old_terms = garden_terms(_image(record, 'OldImage'))
+        new_terms = garden_terms(_image(record, 'NewImage'))
+        for request in posting_requests(user_id, garden_id, old_terms, new_terms):
+            key = request.get("DeleteRequest", {}).get("Key") or request["PutRequest"]["Item"]
+            pending[(key['userId'], key['termKey'])] = request
+
+    if pending:
+        _write(list(pending.values()))
+    print(f"Search index: {len(event.get('Records', []))} changes, {len(pending)} postings written")
+    return {"postings": len(pending)}
+
+def _time_left_ms(context):
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        return context.get_remaining_time_in_millis()
+    return float('inf')
+
+def _query_all(target, **kwargs):
+    items = []
+    while True:
+        response = target.query(**kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response['LastEvaluatedKey']
+
+def _all_user_ids():
+    user_ids = set()
+    scan_kwargs = {"ProjectionExpression": "userId"}
+    while True:
+        response = table.scan(**scan_kwargs)
+        user_ids.update(item['userId'] for item in response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs["ExclusiveStartKey"] = response['LastEvaluatedKey']
+    return sorted(user_ids)
+
+def rebuild_user(user_id):
+    """Make one user's postings match their gardens; returns the number of postings written."""
+    gardens = _query_all(
+        table,
+        KeyConditionExpression='userId = :userId',
+        ExpressionAttributeValues={':userId': user_id},
+        ProjectionExpression='gardenId, #name, #location, description',
+        ExpressionAttributeNames={'#name': 'name', '#location': 'location'}
+    )
+    postings = _query_all(
+        search_table,
+        KeyConditionExpression='userId = :userId',
+        ExpressionAttributeValues={':userId': user_id},
+        ProjectionExpression='gardenId, #term, weight',
+        ExpressionAttributeNames={'#term': 'term'}
+    )
+
+    indexed = {}
+    for posting in postings:
+        indexed.setdefault(posting['gardenId'], {})[posting['term']] = posting['weight']
+
+    requests = []
+    for garden in gardens:
+        requests.extend(posting_requests(user_id, garden['gardenId'], indexed.pop(garden['gardenId'], {}), garden_terms(garden)))
+    # Whatever is left belongs to gardens that no longer exist
+    for garden_id, terms in indexed.items():
+        requests.extend(posting_requests(user_id, garden_id, terms, {}))
+
+    if requests:
+        _write(requests)
+    return len(requests)
+
+def rebuild_handler(event, context):
+    """
+    Rebuild the search index from the gardens table, e.g. once after first
+    deploying search. Invoke with {"userIds": [...]} or with no userIds for
+    everyone; if time runs short, "remaining" lists the users still to do.
+    """
+    event = event or {}
+    user_ids = event.get("userIds") or _all_user_ids()
+
+    rebuilt = 0
+    for index, user_id in enumerate(user_ids):
+        if _time_left_ms(context) < RESUME_MARGIN_MS:
+            remaining = user_ids[index:]
+            print(f"Search rebuild stopped early: {rebuilt} users rebuilt, {len(remaining)} remaining")
+            return {"rebuilt": rebuilt, "remaining": remaining}
+        written = rebuild_user(user_id)
+        rebuilt += 1
+        print(f"Search index rebuilt ({user_id}): {written} postings written")
+
+    return {"rebuilt": rebuilt, "remaining": []}
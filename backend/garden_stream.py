@@ -0,0 +1,22 @@
+import garden_changes
+import garden_push
+import garden_search_indexer
+
+# Every consumer of the gardens table stream, run in order on each batch.
+# One Lambda reads the stream for all of them (DynamoDB Streams throttles
+# more than two readers per shard); each is idempotent, so when one fails
+# and the batch is retried, the others simply repeat their writes.
+STREAM_CONSUMERS = (
+    garden_search_indexer.handler,
+    garden_changes.handler,
+    # Last, so clients told about a delete can already read its tombstone
+    garden_push.handler
+)
+
+
+def handler(event, context):
+    """DynamoDB Streams entry point for the gardens table."""
+    results = {}
+    for consumer in STREAM_CONSUMERS:
+        results.update(consumer(event, context) or {})
+    return results
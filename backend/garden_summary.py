@@ -0,0 +1,238 @@
+import os
+from datetime import datetime
+from decimal import Decimal
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+
+import aws_clients
+
+# One item per user: {userId, gardenCount, totalPlants, lastUpdated, revision}
+summary_table_name = os.environ.get('GARDEN_SUMMARY_TABLE', 'florify-garden-summaries-dev')
+summary_table = aws_clients.lazy_table(summary_table_name)
+
+# Read-check-write attempts before giving up on a garden that keeps changing
+TRANSACT_ATTEMPTS = int(os.environ.get('SUMMARY_TRANSACT_ATTEMPTS', '3'))
+
+serializer = TypeSerializer()
+deserializer = TypeDeserializer()
+
+
+class ConcurrentModification(Exception):
+    """The garden changed between our read and the transaction on every attempt."""
+
+
+def serialize(values):
+    """Python values -> DynamoDB AttributeValues, as TransactWriteItems expects."""
+    return {key: serializer.serialize(value) for key, value in values.items()}
+
+
+def deserialize(item):
+    return {key: deserializer.deserialize(value) for key, value in item.items()}
+
+
+def plant_count(item):
+    return int(item.get('plantCount') or 0)
+
+
+def summary_update(user_id, garden_delta, plant_delta, now=None):
+    """
+    TransactWriteItems `Update` that applies a delta to the user's summary.
+    ADD creates the item (and its counters) on first use. `revision` lets
+    repair_summary detect writes that land while it is rebuilding.
+    """
+    return {
+        "Update": {
+            "TableName": summary_table_name,
+            "Key": serialize({"userId": user_id}),
+            "UpdateExpression": "ADD gardenCount :gardens, totalPlants :plants, revision :one SET lastUpdated = :now",
+            "ExpressionAttributeValues": serialize({
+                ":gardens": garden_delta,
+                ":plants": plant_delta,
+                ":one": 1,
+                ":now": now or datetime.utcnow().isoformat()
+            })
+        }
+    }
+
+
+def unchanged_condition(item):
+    """
+    ConditionExpression parts that hold only while `item` is still the stored
+    version: `version` for versioned items, updatedAt for older ones.
+    """
+    if item.get('version') is not None:
+        return "#version = :seenVersion", {"#version": "version"}, {":seenVersion": item['version']}
+    return (
+        "attribute_not_exists(#version) AND updatedAt = :seenUpdatedAt",
+        {"#version": "version"},
+        {":seenUpdatedAt": item.get('updatedAt', '')}
+    )
+
+
+def cancellation_codes(error):
+    """Per-action cancellation codes from a TransactionCanceledException."""
+    return [reason.get("Code") for reason in error.response.get("CancellationReasons", [])]
+
+
+def is_cancelled(error):
+    return error.response.get("Error", {}).get("Code") == "TransactionCanceledException"
+
+
+def put_new_garden(table, item):
+    """
+    Create a garden and count it in the summary in one transaction.
+    Returns (created, stored_item): created is False when a garden with the
+    same gardenId already exists (an idempotent retry), and stored_item is
+    the existing garden in that case.
+    """
+    try:
+        table.meta.client.transact_write_items(TransactItems=[
+            {
+                "Put": {
+                    "TableName": table.name,
+                    "Item": serialize(item),
+                    "ConditionExpression": "attribute_not_exists(gardenId)",
+                    "ReturnValuesOnConditionCheckFailure": "ALL_OLD"
+                }
+            },
+            summary_update(item["userId"], 1, plant_count(item), item.get("updatedAt"))
+        ])
+        return True, item
+    except ClientError as e:
+        if not is_cancelled(e) or cancellation_codes(e)[:1] != ["ConditionalCheckFailed"]:
+            raise
+        existing = e.response["CancellationReasons"][0].get("Item")
+        return False, deserialize(existing) if existing else None
+
+
+def delete_garden(table, user_id, garden_id):
+    """
+    Delete a garden and subtract it from the summary in one transaction.
+    The garden is read first (its plantCount is needed for the delta) and the
+    delete is conditioned on it being unchanged, retrying if it was not.
+    Returns the deleted item, or None if there was no such garden.
+    """
+    key = {"userId": user_id, "gardenId": garden_id}
+    for _ in range(TRANSACT_ATTEMPTS):
+        current = table.get_item(Key=key, ConsistentRead=True).get('Item')
+        if not current:
+            return None
+
+        condition, names, values = unchanged_condition(current)
+        try:
+            table.meta.client.transact_write_items(TransactItems=[
+                {
+                    "Delete": {
+                        "TableName": table.name,
+                        "Key": serialize(key),
+                        "ConditionExpression": condition,
+                        "ExpressionAttributeNames": names,
+                        "ExpressionAttributeValues": serialize(values)
+                    }
+                },
+                summary_update(user_id, -1, -plant_count(current))
+            ])
+            return current
+        except ClientError as e:
+            if not is_cancelled(e):
+                raise
+            # Changed or deleted since our read (or a conflicting transaction); look again
+
+    raise ConcurrentModification(garden_id)
+
+
+def apply_summary_delta(user_id, garden_delta, plant_delta):
+    """
+    Apply a delta outside a transaction. Used after BatchWriteItem, which
+    can't join a transaction; repair_summary corrects any drift.
+    """
+    if not garden_delta and not plant_delta:
+        return
+    update = summary_update(user_id, garden_delta, plant_delta)["Update"]
+    try:
+        summary_table.meta.client.update_item(**update)
+    except ClientError as e:
+        print(f"Summary update failed for {user_id} (run the repair job): {e}")
+
+
+def read_summary(user_id):
+    """Return the summary item for a user, or None if none exists yet."""
+    return summary_table.get_item(Key={"userId": user_id}, ConsistentRead=True).get('Item')
+
+
+def compute_summary(gardens_table, user_id):
+    """
+    Aggregate a user's gardens straight from the base table. The read is
+    strongly consistent: the repair job saves this against the revision it
+    read first, and an eventually consistent count could miss a garden
+    written just before and save an undercount.
+    """
+    query_kwargs = {
+        "KeyConditionExpression": "userId = :userId",
+        "ExpressionAttributeValues": {":userId": user_id},
+        "ProjectionExpression": "plantCount, updatedAt",
+        "ConsistentRead": True
+    }
+    garden_count, total_plants, last_updated = 0, 0, None
+    while True:
+        response = gardens_table.query(**query_kwargs)
+        for item in response.get('Items', []):
+            garden_count += 1
+            total_plants += plant_count(item)
+            updated_at = item.get('updatedAt')
+            if updated_at and (last_updated is None or updated_at > last_updated):
+                last_updated = updated_at
+        if 'LastEvaluatedKey' not in response:
+            break
+        query_kwargs["ExclusiveStartKey"] = response['LastEvaluatedKey']
+
+    return {
+        "userId": user_id,
+        "gardenCount": garden_count,
+        "totalPlants": total_plants,
+        "lastUpdated": last_updated
+    }
+
+
+def repair_summary(gardens_table, user_id):
+    """
+    Rebuild one user's summary from the base table. The write is conditioned
+    on the summary's revision, so a create/delete that lands while we count
+    makes us recount instead of being overwritten.
+    Returns the stored summary.
+    """
+    for _ in range(TRANSACT_ATTEMPTS):
+        existing = read_summary(user_id)
+        summary = compute_summary(gardens_table, user_id)
+
+        if existing is None:
+            condition = {"ConditionExpression": "attribute_not_exists(userId)"}
+            summary["revision"] = Decimal(0)
+        else:
+            condition = {
+                "ConditionExpression": "revision = :revision",
+                "ExpressionAttributeValues": {":revision": existing.get("revision", 0)}
+            }
+            summary["revision"] = existing.get("revision", 0)
+        if summary["lastUpdated"] is None:
+            summary["lastUpdated"] = existing.get("lastUpdated") if existing else None
+        item = {key: value for key, value in summary.items() if value is not None}
+
+        try:
+            summary_table.put_item(Item=item, **condition)
+            return item
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+
+    raise ConcurrentModification(user_id)
+
+
+def summary_body(summary):
+    """API representation of a summary item."""
+    return {
+        "gardenCount": int(summary.get("gardenCount", 0)),
+        "totalPlants": int(summary.get("totalPlants", 0)),
+        "lastUpdated": summary.get("lastUpdated")
+    }
@@ -0,0 +1,33 @@
+import aws_clients
+import os
+from botocore.exceptions import ClientError
+from garden_cache import garden_cache
+from garden_summary import ConcurrentModification, read_summary, repair_summary, summary_body
+from simple_auth import require_auth, respond
+
+table = aws_clients.lazy_table(os.environ['GARDENS_TABLE'])
+
+@require_auth
+def handler(event, context):
+    try:
+        # Get authenticated user ID from the decorator
+        user_id = event['user_id']
+
+        def load():
+            summary = read_summary(user_id)
+            if summary is None:
+                # No summary yet (gardens created before summaries existed): build it once
+                summary = repair_summary(table, user_id)
+            return summary_body(summary)
+
+        # One item read instead of counting the whole partition
+        return respond(200, garden_cache.read_through('GET /gardens/summary', user_id, 'summary', '', load))
+
+    except ConcurrentModification:
+        return respond(409, {"message": "Gardens are being modified, please retry"})
+    except ClientError as e:
+        print(f"DynamoDB error: {e}")
+        return respond(500, {"message": "Database error occurred"})
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return respond(500, {"message": "Internal server error"})
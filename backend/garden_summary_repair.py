@@ -0,0 +1,54 @@
+import aws_clients
+import os
+from garden_cache import garden_cache
+from garden_summary import ConcurrentModification, repair_summary
+
+table = aws_clients.lazy_table(os.environ['GARDENS_TABLE'])
+
+# Stop starting new users when less than this much Lambda time remains
+RESUME_MARGIN_MS = 10000
+
+def _time_left_ms(context):
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        return context.get_remaining_time_in_millis()
+    return float('inf')
+
+def _all_user_ids():
+    """Every userId that owns at least one garden (keys-only scan)."""
+    user_ids = set()
+    scan_kwargs = {"ProjectionExpression": "userId"}
+    while True:
+        response = table.scan(**scan_kwargs)
+        user_ids.update(item['userId'] for item in response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs["ExclusiveStartKey"] = response['LastEvaluatedKey']
+    return sorted(user_ids)
+
+def handler(event, context):
+    """
+    Rebuild per-user summaries from the gardens table.
+
+    Invoke with {"userIds": [...]} to repair specific users, or with no
+    userIds to repair everyone (e.g. once after deploying summaries).
+    When time runs short the response lists the users still to do under
+    "remaining"; invoke again with {"userIds": remaining} to continue.
+    """
+    event = event or {}
+    user_ids = event.get("userIds") or _all_user_ids()
+
+    repaired, failed = 0, []
+    for index, user_id in enumerate(user_ids):
+        if _time_left_ms(context) < RESUME_MARGIN_MS:
+            remaining = user_ids[index:]
+            print(f"Summary repair stopped early: {repaired} repaired, {len(remaining)} remaining")
+            return {"repaired": repaired, "failed": failed, "remaining": remaining}
+        try:
+            summary = repair_summary(table, user_id)
+            garden_cache.invalidate_user(user_id)
+            repaired += 1
+            print(f"Summary repaired ({user_id}): {summary['gardenCount']} gardens, {summary['totalPlants']} plants")
+        except ConcurrentModification:
+            failed.append(user_id)
+
+    return {"repaired": repaired, "failed": failed, "remaining": []}
@@ -1,72 +1,28 @@
 import json
-import boto3
+import aws_clients
 import os
 import uuid
-import requests
-from datetime import datetime
 from botocore.exceptions import ClientError
-from jose import jwt, jwk
-from jose.exceptions import JWTError, JWKError
+from etags import conditional_respond, list_etag, request_variant
+from fieldsets import parse_fields, projection_kwargs
+from garden_cache import garden_cache
+from garden_records import build_garden_item
+from garden_summary import put_new_garden
+from pagination import decode_cursor, encode_cursor, parse_page_params, query_all, query_page
+from responses import respond
+from token_verifier import verify_token
 
-# Initialize AWS services
-dynamodb = boto3.resource('dynamodb')
-s3_client = boto3.client('s3')
+# AWS clients are created on first use (see aws_clients.py)
+s3_client = aws_clients.lazy_client('s3')
 
 # Get configuration from environment variables
 table_name = os.environ.get('GARDENS_TABLE_NAME', 'florify-gardens')
 s3_bucket = os.environ.get('S3_BUCKET_NAME', 'florify-garden-images')
-cognito_user_pool_id = os.environ.get('COGNITO_USER_POOL_ID')
 cognito_region = os.environ.get('COGNITO_REGION', 'eu-north-1')
 user_id_claim = os.environ.get('USER_ID_CLAIM', 'sub')
 
-# Initialize DynamoDB table
-table = dynamodb.Table(table_name)
-
-# Cache for JWKS to avoid repeated API calls
-_jwks_cache = None
-_jwks_cache_time = None
-JWKS_CACHE_DURATION = 300  # 5 minutes
-
-def cors_headers():
-    """Return CORS headers for all responses"""
-    return {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE",
-        "Access-Control-Allow-Headers": "Content-Type,Authorization"
-    }
-
-def respond(status, body):
-    """Create a standardized HTTP response"""
-    return {
-        "statusCode": status,
-        "headers": cors_headers(),
-        "body": json.dumps(body)
-    }
-
-def fetch_jwks():
-    """
-    Fetch and cache Cognito JWKS from the well-known endpoint.
-    Returns the JWKS data or None if fetch fails.
-    """
-    global _jwks_cache, _jwks_cache_time
-    
-    # Check if we have valid cached JWKS
-    if _jwks_cache and _jwks_cache_time:
-        if datetime.utcnow().timestamp() - _jwks_cache_time < JWKS_CACHE_DURATION:
-            return _jwks_cache
-    
-    # Fetch fresh JWKS from Cognito
-    jwks_url = f"https://cognito-idp.{cognito_region}.amazonaws.com/{cognito_user_pool_id}/.well-known/jwks.json"
-    
-    try:
-        response = requests.get(jwks_url, timeout=10)
-        response.raise_for_status()
-        _jwks_cache = response.json()
-        _jwks_cache_time = datetime.utcnow().timestamp()
-        return _jwks_cache
-    except requests.RequestException as e:
-        print(f"Error fetching JWKS: {str(e)}")
-        return None
+# DynamoDB table (created on first use)
+table = aws_clients.lazy_table(table_name)
 
 def get_user_from_token(authorization_header):
     """
@@ -80,98 +36,61 @@ def get_user_from_token(authorization_header):
     if not authorization_header.startswith('Bearer '):
         return None, None
     
-    token = authorization_header[7:]  # Remove 'Bearer ' prefix
-    
-    try:
-        # Get JWKS for token verification
-        jwks = fetch_jwks()
-        if not jwks:
-            print("Failed to fetch JWKS")
-            return None, None
-        
-        # Decode token header to get key ID
-        unverified_header = jwt.get_unverified_header(token)
-        kid = unverified_header.get('kid')
-        if not kid:
-            print("No kid in token header")
-            return None, None
-        
-        # Find the correct key in JWKS
-        key = None
-        for jwk_key in jwks.get('keys', []):
-            if jwk_key.get('kid') == kid:
-                key = jwk_key
-                break
-        
-        if not key:
-            print(f"Key with kid {kid} not found in JWKS")
-            return None, None
-        
-        # Convert JWK to PEM format for verification
-        public_key = jwk.construct(key)
-        
-        # Verify and decode the token
-        claims = jwt.decode(
-            token,
-            public_key,
-            algorithms=['RS256'],
-            audience=None,  # Cognito doesn't use audience
-            options={"verify_aud": False}
-        )
-        
-        # Verify issuer matches Cognito
-        expected_issuer = f"https://cognito-idp.{cognito_region}.amazonaws.com/{cognito_user_pool_id}"
-        if claims.get('iss') != expected_issuer:
-            print(f"Invalid issuer: {claims.get('iss')}")
-            return None, None
-        
-        # Check token expiration
-        current_time = datetime.utcnow().timestamp()
-        if claims.get('exp', 0) < current_time:
-            print("Token has expired")
-            return None, None
-        
-        # Extract user information
-        user_id = claims.get(user_id_claim)
-        email = claims.get('email')
-        
-        if not user_id:
-            print("No user ID found in token")
-            return None, None
-        
-        return user_id, email
-        
-    except (JWTError, JWKError) as e:
-        print(f"JWT verification error: {str(e)}")
+    # Signature, issuer and expiry checks live in the shared verifier
+    claims, error = verify_token(authorization_header[7:])
+    if error:
+        print(f"JWT verification error: {error}")
         return None, None
-    except Exception as e:
-        print(f"Unexpected error during token verification: {str(e)}")
+    
+    # Extract user information
+    user_id = claims.get(user_id_claim)
+    email = claims.get('email')
+    
+    if not user_id:
+        print("No user ID found in token")
         return None, None
+    
+    return user_id, email
 
-def query_gardens_for_user(user_id):
+def _gardens_query(user_id, fields=None):
+    query_kwargs = {
+        "KeyConditionExpression": 'userId = :user_id',
+        "ExpressionAttributeValues": {
+            ':user_id': user_id
+        }
+    }
+    query_kwargs.update(projection_kwargs(fields))
+    return query_kwargs
+
+def query_gardens_for_user(user_id, fields=None):
     """
     Query DynamoDB to get all gardens for a specific user.
+    Follows LastEvaluatedKey so lists over 1 MB are not truncated.
+    Pass `fields` (from parse_fields) to read only those attributes.
     Returns list of garden items.
     """
     try:
-        response = table.query(
-            KeyConditionExpression='userId = :user_id',
-            ExpressionAttributeValues={
-                ':user_id': user_id
-            }
-        )
-        return response.get('Items', [])
+        return query_all(table, _gardens_query(user_id, fields))
     except ClientError as e:
         print(f"Error querying gardens for user {user_id}: {str(e)}")
         return []
 
+def query_gardens_page(user_id, limit, cursor=None, fields=None):
+    """
+    Query one page of gardens for a user.
+    Returns (gardens, next_cursor); raises ValueError for an invalid cursor.
+    """
+    start_key = decode_cursor(cursor, user_id) if cursor else None
+    gardens, last_key = query_page(table, _gardens_query(user_id, fields), limit, start_key)
+    return gardens, encode_cursor(last_key, user_id)
+
 def put_garden_item(item):
     """
-    Write a garden item to DynamoDB.
-    Returns True on success, False on failure.
+    Write a new garden item to DynamoDB and count it in the user's summary.
+    Returns True on success (or if the garden already exists), False on failure.
     """
     try:
-        table.put_item(Item=item)
+        put_new_garden(table, item)
         return True
     except ClientError as e:
         print(f"Error putting garden item: {str(e)}")
@@ -228,10 +147,22 @@ def handler(event, context):
     path = event.get("requestContext", {}).get("http", {}).get("path", "")
     
     if method == "GET" and path == "/gardens":
-        # Get all gardens for authenticated user
+        # Get gardens for authenticated user, paginated when ?limit= or ?cursor= is given
         try:
-            gardens = query_gardens_for_user(user_id)
-            return respond(200, {"gardens": gardens})
+            query_params = event.get("queryStringParameters") or {}
+            limit, cursor = parse_page_params(query_params)
+            fields = parse_fields(query_params.get("fields"))
+            if limit is None:
+                gardens = query_gardens_for_user(user_id, fields)
+                next_cursor = None
+            else:
+                gardens, next_cursor = query_gardens_page(user_id, limit, cursor, fields)
+            
+            # 304 when the client's If-None-Match still matches the list version
+            etag = list_etag(gardens, request_variant(event, 'fields', 'limit', 'cursor'))
+            return conditional_respond(event, etag, {"gardens": gardens, "nextCursor": next_cursor})
+        except ValueError as e:
+            return respond(400, {"message": str(e)})
         except Exception as e:
             print(f"Error fetching gardens: {str(e)}")
             return respond(500, {"message": "Failed to fetch gardens"})
@@ -274,32 +205,15 @@ def handler(event, context):
             
             data = json.loads(body)
             
-            # Validate required fields
-            if not data.get("name") or not data.get("location"):
-                return respond(400, {"message": "Name and location are required"})
-            
-            # Use provided gardenId or generate new one
-            garden_id = data.get("gardenId", str(uuid.uuid4()))
-            
-            # Create garden item
-            now = datetime.utcnow().isoformat()
-            garden_item = {
-                "userId": user_id,
-                "gardenId": garden_id,
-                "name": data.get("name"),
-                "location": data.get("location"),
-                "description": data.get("description", ""),
-                "imageUrl": data.get("imageUrl", ""),
-                "status": "active",
-                "plantCount": 0,
-                "userEmail": user_email or "",
-                "createdAt": now,
-                "updatedAt": now
-            }
+            # Validate and build the garden item (shared with bulk import)
+            garden_item, error = build_garden_item(user_id, data, user_email or "")
+            if error:
+                return respond(400, {"message": error})
             
             # Save to DynamoDB
             if not put_garden_item(garden_item):
                 return respond(500, {"message": "Failed to save garden"})
+            garden_cache.invalidate_user(user_id)
             
             return respond(201, garden_item)
             
@@ -1,62 +1,7 @@
 import json
-import os
-import requests
 from datetime import datetime
-from jose import jwt, jwk
-
-# Cache for JWKS to avoid repeated API calls
-_jwks_cache = None
-_jwks_cache_time = None
-JWKS_CACHE_DURATION = 300  # 5 minutes
-
-def cors_headers():
-    """Return CORS headers for all responses"""
-    return {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE",
-        "Access-Control-Allow-Headers": "Content-Type,Authorization"
-    }
-
-def respond(status, body):
-    """Create a standardized HTTP response"""
-    return {
-        "statusCode": status,
-        "headers": cors_headers(),
-        "body": json.dumps(body)
-    }
-
-def fetch_jwks():
-    """
-    Fetch and cache Cognito JWKS from the well-known endpoint.
-    Returns the JWKS data or None if fetch fails.
-    """
-    global _jwks_cache, _jwks_cache_time
-    
-    # Check if we have valid cached JWKS
-    if _jwks_cache and _jwks_cache_time:
-        if datetime.utcnow().timestamp() - _jwks_cache_time < JWKS_CACHE_DURATION:
-            return _jwks_cache
-    
-    # Get Cognito configuration from environment
-    cognito_user_pool_id = os.environ.get('COGNITO_USER_POOL_ID')
-    cognito_region = os.environ.get('COGNITO_REGION', 'eu-north-1')
-    
-    if not cognito_user_pool_id:
-        print("COGNITO_USER_POOL_ID not set")
-        return None
-    
-    # Fetch fresh JWKS from Cognito
-    jwks_url = f"https://cognito-idp.{cognito_region}.amazonaws.com/{cognito_user_pool_id}/.well-known/jwks.json"
-    
-    try:
-        response = requests.get(jwks_url, timeout=10)
-        response.raise_for_status()
-        _jwks_cache = response.json()
-        _jwks_cache_time = datetime.utcnow().timestamp()
-        return _jwks_cache
-    except requests.RequestException as e:
-        print(f"Error fetching JWKS: {str(e)}")
-        return None
+from token_verifier import verify_token
+from responses import respond
 
 def get_user_from_token(authorization_header):
     """
@@ -70,73 +15,21 @@ def get_user_from_token(authorization_header):
     if not authorization_header.startswith('Bearer '):
         return None, None
     
-    token = authorization_header[7:]  # Remove 'Bearer ' prefix
+    # Signature, issuer and expiry checks live in the shared verifier
+    claims, error = verify_token(authorization_header[7:])
+    if error:
+        print(f"JWT verification error: {error}")
+        return None, None
     
-    try:
-        # Get JWKS for token verification
-        jwks = fetch_jwks()
-        if not jwks:
-            print("Failed to fetch JWKS")
-            return None, None
-        
-        # Decode token header to get key ID
-        unverified_header = jwt.get_unverified_header(token)
-        kid = unverified_header.get('kid')
-        if not kid:
-            print("No kid in token header")
-            return None, None
-        
-        # Find the correct key in JWKS
-        key = None
-        for jwk_key in jwks.get('keys', []):
-            if jwk_key.get('kid') == kid:
-                key = jwk_key
-                break
-        
-        if not key:
-            print(f"Key with kid {kid} not found in JWKS")
-            return None, None
-        
-        # Convert JWK to PEM format for verification
-        public_key = jwk.construct(key)
-        
-        # Verify and decode the token
-        claims = jwt.decode(
-            token,
-            public_key,
-            algorithms=['RS256'],
-            audience=None,  # Cognito doesn't use audience
-            options={"verify_aud": False}
-        )
-        
-        # Verify issuer matches Cognito
-        cognito_user_pool_id = os.environ.get('COGNITO_USER_POOL_ID')
-        cognito_region = os.environ.get('COGNITO_REGION', 'eu-north-1')
-        expected_issuer = f"https://cognito-idp.{cognito_region}.amazonaws.com/{cognito_user_pool_id}"
-        
-        if claims.get('iss') != expected_issuer:
-            print(f"Invalid issuer: {claims.get('iss')}")
-            return None, None
-        
-        # Check token expiration
-        current_time = datetime.utcnow().timestamp()
-        if claims.get('exp', 0) < current_time:
-            print("Token has expired")
-            return None, None
-        
-        # Extract user information
-        user_id = claims.get('sub')
-        email = claims.get('email')
-        
-        if not user_id:
-            print("No user ID found in token")
-            return None, None
-        
-        return user_id, email
-        
-    except Exception as e:
-        print(f"Error during token verification: {str(e)}")
+    # Extract user information
+    user_id = claims.get('sub')
+    email = claims.get('email')
+    
+    if not user_id:
+        print("No user ID found in token")
         return None, None
+    
+    return user_id, email
 
 def handler(event, context):
     """Main Lambda handler for gardens API - Step 1: Basic JWT verification only"""
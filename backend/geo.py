@@ -0,0 +1,160 @@
+import math
+from decimal import Decimal
+
+EARTH_RADIUS_KM = 6371.0088
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_BASE32_INDEX = {ch: index for index, ch in enumerate(_BASE32)}
+
+# Precision stored on gardens (~5 m cells); range queries use prefixes of it
+GEOHASH_PRECISION = 9
+
+# Upper bound on cells (one Query each) used to cover a search circle
+MAX_COVER_CELLS = 12
+
+
+def validate_coordinates(lat, lon):
+    """Return (lat, lon) as floats; raises ValueError when out of range or not numbers."""
+    try:
+        if isinstance(lat, bool) or isinstance(lon, bool):
+            raise TypeError
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        raise ValueError("lat and lon must be numbers")
+    if not (-90 <= lat <= 90) or not (-180 <= lon <= 180) or math.isnan(lat) or math.isnan(lon):
+        raise ValueError("lat must be within [-90, 90] and lon within [-180, 180]")
+    return lat, lon
+
+
+def to_decimal(value, places=6):
+    """DynamoDB rejects floats; ~0.1 m precision is plenty."""
+    return Decimal(str(round(value, places)))
+
+
+def encode(lat, lon, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        target, bounds = (lon, lon_range) if even else (lat, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if target >= middle:
+            value = (value << 1) | 1
+            bounds[0] = middle
+        else:
+            value <<= 1
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def decode_bbox(geohash):
+    """Return (min_lat, min_lon, max_lat, max_lon) of a geohash cell."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for ch in geohash:
+        value = _BASE32_INDEX[ch]
+        for shift in range(4, -1, -1):
+            bounds = lon_range if even else lat_range
+            middle = (bounds[0] + bounds[1]) / 2
+            if (value >> shift) & 1:
+                bounds[0] = middle
+            else:
+                bounds[1] = middle
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a cell at `precision`."""
+    lon_bits = (precision * 5 + 1) // 2
+    lat_bits = precision * 5 // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _wrap_lon(lon):
+    return (lon + 180.0) % 360.0 - 180.0
+
+
+def _circle_bbox(lat, lon, radius_km):
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - d_lat, lat + d_lat
+    if min_lat <= -90 or max_lat >= 90:
+        # The circle contains a pole: every longitude is in range
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+    d_lon = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat)))))
+    return min_lat, lon - d_lon, max_lat, lon + d_lon
+
+
+def _distance_to_cell_km(lat, lon, cell):
+    """Distance from a point to the nearest point of a cell (0 if inside)."""
+    min_lat, min_lon, max_lat, max_lon = decode_bbox(cell)
+    if min_lon <= lon <= max_lon:
+        return haversine_km(lat, lon, min(max(lat, min_lat), max_lat), lon)
+
+    # Closest meridian edge, measured around the antimeridian if that is shorter
+    to_min = abs(_wrap_lon(lon - min_lon))
+    to_max = abs(_wrap_lon(lon - max_lon))
+    edge_lon, d_lon = (min_lon, to_min) if to_min < to_max else (max_lon, to_max)
+
+    # Nearest point on that meridian is poleward of `lat` (great circles bend
+    # toward the pole), so clamping `lat` alone would overestimate the distance
+    if d_lon < 90:
+        nearest_lat = math.degrees(math.atan(math.tan(math.radians(lat)) / math.cos(math.radians(d_lon))))
+    else:
+        nearest_lat = 90.0 if lat >= 0 else -90.0
+    return haversine_km(lat, lon, min(max(nearest_lat, min_lat), max_lat), edge_lon)
+
+
+def _cells_in_bbox(bbox, precision):
+    min_lat, min_lon, max_lat, max_lon = bbox
+    height, width = cell_size(precision)
+    first_lat = math.floor((min_lat + 90.0) / height)
+    last_lat = math.floor((min(max_lat, 90.0 - 1e-9) + 90.0) / height)
+    first_lon = math.floor((min_lon + 180.0) / width)
+    last_lon = math.floor((max_lon + 180.0) / width)
+
+    columns = min(last_lon - first_lon + 1, int(round(360.0 / width)))
+    cells = []
+    for row in range(first_lat, last_lat + 1):
+        center_lat = -90.0 + (row + 0.5) * height
+        for column in range(first_lon, first_lon + columns):
+            center_lon = _wrap_lon(-180.0 + (column + 0.5) * width)
+            cells.append(encode(center_lat, center_lon, precision))
+    return cells
+
+
+def _cell_count(bbox, precision):
+    min_lat, min_lon, max_lat, max_lon = bbox
+    height, width = cell_size(precision)
+    rows = math.floor((min(max_lat, 90.0 - 1e-9) + 90.0) / height) - math.floor((min_lat + 90.0) / height) + 1
+    columns = min(math.floor((max_lon + 180.0) / width) - math.floor((min_lon + 180.0) / width) + 1, round(360.0 / width))
+    return rows * columns
+
+
+def cover_circle(lat, lon, radius_km, max_cells=MAX_COVER_CELLS):
+    """
+    Geohash prefixes whose cells together cover the circle. Uses the finest
+    precision that needs at most `max_cells` cells (so each Query reads as
+    little outside the circle as possible), then drops cells that don't
+    touch the circle at all.
+    """
+    bbox = _circle_bbox(lat, lon, radius_km)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        if _cell_count(bbox, precision) > max_cells:
+            continue
+        cells = _cells_in_bbox(bbox, precision)
+        return [cell for cell in dict.fromkeys(cells) if _distance_to_cell_km(lat, lon, cell) <= radius_km]
+    # Larger than a precision-1 cover allows: the whole world, one cell per prefix
+    return list(_BASE32)
@@ -0,0 +1,26 @@
+from geocoding import geocode
+from simple_auth import require_auth, respond
+
+@require_auth
+def handler(event, context):
+    try:
+        query_params = event.get('queryStringParameters') or {}
+        text = (query_params.get('q') or '').strip()
+        if not text:
+            return respond(400, {"message": "q parameter is required"})
+
+        # Offline gazetteer lookup, cached per container
+        place = geocode(text)
+        if not place:
+            return respond(404, {"message": "Location not found"})
+
+        return respond(200, {
+            "latitude": place["lat"],
+            "longitude": place["lon"],
+            "formattedAddress": f"{place['name']}, {place['country']}",
+            "placeId": f"gazetteer:{place['country']}:{place['name']}"
+        })
+
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return respond(500, {"message": "Internal server error"})
@@ -0,0 +1,146 @@
+import csv
+import os
+import re
+import threading
+import unicodedata
+
+from garden_cache import MemoryCacheBackend
+
+# Offline gazetteer: the bundled CSV (name,country,lat,lon,population,
+# alternate_names) or a GeoNames citiesN.txt dump for wider coverage
+GAZETTEER_PATH = os.environ.get(
+    'GAZETTEER_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'gazetteer.csv')
+)
+
+GEOCODE_CACHE_MAX_ENTRIES = int(os.environ.get('GEOCODE_CACHE_MAX_ENTRIES', '4096'))
+
+# Longest run of words tried as a place name ("rio de janeiro")
+MAX_NAME_WORDS = 4
+
+COUNTRY_ALIASES = {
+    'usa': 'US', 'united states': 'US', 'united states of america': 'US', 'america': 'US',
+    'uk': 'GB', 'united kingdom': 'GB', 'england': 'GB', 'scotland': 'GB', 'great britain': 'GB',
+    'norway': 'NO', 'norge': 'NO', 'sweden': 'SE', 'sverige': 'SE', 'denmark': 'DK', 'finland': 'FI',
+    'iceland': 'IS', 'germany': 'DE', 'deutschland': 'DE', 'france': 'FR', 'spain': 'ES', 'italy': 'IT',
+    'portugal': 'PT', 'netherlands': 'NL', 'belgium': 'BE', 'switzerland': 'CH', 'austria': 'AT',
+    'poland': 'PL', 'czechia': 'CZ', 'czech republic': 'CZ', 'hungary': 'HU', 'romania': 'RO',
+    'greece': 'GR', 'ireland': 'IE', 'turkey': 'TR', 'russia': 'RU', 'ukraine': 'UA',
+    'pakistan': 'PK', 'india': 'IN', 'bangladesh': 'BD', 'china': 'CN', 'japan': 'JP',
+    'south korea': 'KR', 'korea': 'KR', 'taiwan': 'TW', 'thailand': 'TH', 'singapore': 'SG',
+    'indonesia': 'ID', 'philippines': 'PH', 'uae': 'AE', 'united arab emirates': 'AE',
+    'saudi arabia': 'SA', 'iran': 'IR', 'egypt': 'EG', 'nigeria': 'NG', 'kenya': 'KE',
+    'south africa': 'ZA', 'canada': 'CA', 'mexico': 'MX', 'brazil': 'BR', 'argentina': 'AR',
+    'chile': 'CL', 'australia': 'AU', 'new zealand': 'NZ', 'hong kong': 'HK'
+}
+
+_WORD = re.compile(r'[a-z]+')
+
+_places = None
+_load_lock = threading.Lock()
+_cache = MemoryCacheBackend(GEOCODE_CACHE_MAX_ENTRIES)
+
+
+def normalize(text):
+    """Lowercase, strip accents and keep letters only ("São Paulo 01000" -> "sao paulo")."""
+    folded = unicodedata.normalize('NFKD', text.lower())
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch))
+    return ' '.join(_WORD.findall(folded))
+
+
+def _read_csv(path):
+    with open(path, newline='', encoding='utf-8') as handle:
+        for row in csv.DictReader(handle):
+            aliases = [alias for alias in (row.get('alternate_names') or '').split(';') if alias]
+            yield row['name'], row['country'], float(row['lat']), float(row['lon']), int(row.get('population') or 0), aliases
+
+
+def _read_geonames(path):
+    # geonameid, name, asciiname, alternatenames, lat, lon, class, code, country, ..., population (index 14)
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            columns = line.rstrip('\n').split('\t')
+            if len(columns) < 15:
+                continue
+            yield columns[1], columns[8], float(columns[4]), float(columns[5]), int(columns[14] or 0), [columns[2]]
+
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    """Index the gazetteer by normalized name (and alias); loaded once per container."""
+    global _places
+    if _places is not None:
+        return _places
+
+    with _load_lock:
+        if _places is None:
+            reader = _read_geonames if path.endswith('.txt') else _read_csv
+            places = {}
+            for name, country, lat, lon, population, aliases in reader(path):
+                place = {"name": name, "country": country, "lat": lat, "lon": lon, "population": population}
+                for key in {normalize(name)} | {normalize(alias) for alias in aliases}:
+                    if key:
+                        places.setdefault(key, []).append(place)
+            _places = places
+            print(f"Gazetteer loaded: {len(places)} names from {os.path.basename(path)}")
+    return _places
+
+
+def _country_of(words):
+    phrase = ' '.join(words)
+    if phrase in COUNTRY_ALIASES:
+        return COUNTRY_ALIASES[phrase]
+    if len(words) == 1 and len(phrase) == 2:
+        return phrase.upper()
+    return None
+
+
+def _lookup(text):
+    """
+    Find the most specific known place in free-text `text`. Comma-separated
+    parts are tried right to left (street addresses end with the city), and
+    within a part the longest run of words wins. A country mentioned anywhere
+    picks between places with the same name; otherwise the most populous wins.
+    """
+    places = load_gazetteer()
+    parts = [normalize(part).split() for part in text.split(',')]
+    parts = [words for words in parts if words]
+
+    country = None
+    for words in reversed(parts):
+        for size in range(min(len(words), 3), 0, -1):
+            country = _country_of(words[-size:])
+            if country:
+                break
+        if country:
+            break
+
+    for words in reversed(parts):
+        for size in range(min(len(words), MAX_NAME_WORDS), 0, -1):
+            for start in range(len(words) - size, -1, -1):
+                candidates = places.get(' '.join(words[start:start + size]))
+                if not candidates:
+                    continue
+                in_country = [place for place in candidates if place["country"] == country]
+                return max(in_country or candidates, key=lambda place: place["population"])
+    return None
+
+
+def geocode(text):
+    """
+    Return {"lat", "lon", "name", "country"} for a free-text location, or
+    None if no known place is mentioned. Results (misses too) are cached
+    per container, keyed by the normalized text.
+    """
+    if not isinstance(text, str) or not text.strip():
+        return None
+
+    key = ','.join(normalize(part) for part in text.split(','))
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached or None
+
+    place = _lookup(text)
+    result = None
+    if place:
+        result = {"lat": place["lat"], "lon": place["lon"], "name": place["name"], "country": place["country"]}
+    _cache.set(key, result or {})
+    return result
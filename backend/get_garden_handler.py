@@ -1,11 +1,14 @@
 import json
-import boto3
+import aws_clients
 import os
 from botocore.exceptions import ClientError
+from etags import conditional_respond, item_etag, request_variant
+from fieldsets import parse_fields, projection_kwargs
+from garden_cache import fields_variant, garden_cache
+from image_urls import sign_garden, url_variant
 from simple_auth import require_auth, respond
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['GARDENS_TABLE'])
+table = aws_clients.lazy_table(os.environ['GARDENS_TABLE'])
 
 @require_auth
 def handler(event, context):
@@ -18,20 +21,35 @@ def handler(event, context):
         if not garden_id:
             return respond(400, {"message": "Garden ID is required"})
 
-        # Get garden from DynamoDB
-        response = table.get_item(
-            Key={
-                'userId': user_id,
-                'gardenId': garden_id
-            }
-        )
+        # Optional ?fields=card|detail|a,b,c to read only some attributes
+        query_params = event.get('queryStringParameters') or {}
+        fields = parse_fields(query_params.get('fields'))
+
+        # Get garden from DynamoDB, through the read-through cache
+        def load():
+            response = table.get_item(
+                Key={
+                    'userId': user_id,
+                    'gardenId': garden_id
+                },
+                **projection_kwargs(fields)
+            )
+            return response.get('Item')
 
-        garden = response.get('Item')
+        garden = garden_cache.read_through(
+            'GET /gardens/{gardenId}', user_id, 'item', fields_variant(fields), load, garden_id=garden_id
+        )
         if not garden:
             return respond(404, {"message": "Garden not found"})
 
-        return respond(200, {"garden": garden})
+        garden = sign_garden(garden)
+
+        # 304 when the client's If-None-Match still matches this version (and its URLs)
+        etag = item_etag(garden, request_variant(event, 'fields') + url_variant())
+        return conditional_respond(event, etag, {"garden": garden})
 
+    except ValueError as e:
+        return respond(400, {"message": str(e)})
     except ClientError as e:
         print(f"DynamoDB error: {e}")
         return respond(500, {"message": "Database error occurred"})
@@ -1,11 +1,16 @@
 import json
-import boto3
+import aws_clients
 import os
 from botocore.exceptions import ClientError
+from etags import conditional_respond, list_etag, request_variant
+from fieldsets import parse_fields, projection_kwargs
+from garden_cache import fields_variant, garden_cache
+from image_urls import sign_gardens, url_variant
+from list_planner import parse_list_params, plan_list_query
+from pagination import decode_cursor, encode_cursor, parse_page_params, query_all, query_page
 from simple_auth import require_auth, respond
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['GARDENS_TABLE'])
+table = aws_clients.lazy_table(os.environ['GARDENS_TABLE'])
 
 @require_auth
 def handler(event, context):
@@ -13,21 +18,54 @@ def handler(event, context):
         # Get authenticated user ID from the decorator
         user_id = event['user_id']
 
+        # Optional ?limit=N&cursor=... pagination; without it every page is returned
+        query_params = event.get('queryStringParameters') or {}
+        limit, cursor = parse_page_params(query_params)
+
+        # Optional ?fields=card|detail|a,b,c to read only some attributes
+        fields = parse_fields(query_params.get('fields'))
+
+        # Optional ?sort=updatedAt|createdAt|name&order=asc|desc&status=... picks an index
+        sort, order, status = parse_list_params(query_params)
+        plan = plan_list_query(sort, order, status)
+
+        # Filtered pages end on a returned item, so its index key must be read too
+        if fields and plan.sort_key and plan.sort_key not in fields:
+            fields = fields + (plan.sort_key,)
+
         # Query gardens for this user
-        response = table.query(
-            KeyConditionExpression='userId = :userId',
-            ExpressionAttributeValues={
-                ':userId': user_id
-            }
-        )
-
-        gardens = response.get('Items', [])
-        
-        return respond(200, {
+        query_kwargs = plan.query_kwargs(user_id)
+        query_kwargs.update(projection_kwargs(fields, query_kwargs.get("ExpressionAttributeNames")))
+
+        # Validate the cursor up front so a bad one is a 400 even on a cache hit
+        cursor_scope = plan.cursor_scope(user_id)
+        start_key = decode_cursor(cursor, cursor_scope) if cursor else None
+
+        def load():
+            if limit is None:
+                return {"gardens": query_all(table, query_kwargs), "nextCursor": None}
+            gardens, last_key = query_page(table, query_kwargs, limit, start_key, plan.key_attributes())
+            return {"gardens": gardens, "nextCursor": encode_cursor(last_key, cursor_scope)}
+
+        # Served from the read-through cache; writes invalidate the user's entries
+        variant = f"{plan.name}|{status or ''}|{fields_variant(fields)}|{limit or ''}|{cursor or ''}"
+        page = garden_cache.read_through('GET /gardens', user_id, 'list', variant, load)
+        gardens, next_cursor = page["gardens"], page["nextCursor"]
+
+        # Private bucket: presigned image URLs, memoized per object and signing window
+        gardens = sign_gardens(gardens)
+
+        # 304 when the client's If-None-Match still matches the list version (and its URLs)
+        variant = request_variant(event, 'fields', 'limit', 'cursor', 'sort', 'order', 'status') + url_variant()
+        etag = list_etag(gardens, variant)
+        return conditional_respond(event, etag, {
             "gardens": gardens,
-            "count": len(gardens)
+            "count": len(gardens),
+            "nextCursor": next_cursor
         })
 
+    except ValueError as e:
+        return respond(400, {"message": str(e)})
     except ClientError as e:
         print(f"DynamoDB error: {e}")
         return respond(500, {"message": "Database error occurred"})
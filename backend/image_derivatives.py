@@ -0,0 +1,110 @@
+import base64
+import io
+import os
+
+try:
+    from PIL import Image, ImageFilter, ImageOps
+except ImportError:
+    Image = None
+
+# Fixed widths rendered for every upload; cards use the smallest, detail views the larger
+IMAGE_VARIANT_WIDTHS = tuple(
+    int(width) for width in os.environ.get('IMAGE_VARIANT_WIDTHS', '320,640').split(',') if width.strip()
+)
+
+JPEG_QUALITY = int(os.environ.get('IMAGE_JPEG_QUALITY', '80'))
+WEBP_QUALITY = int(os.environ.get('IMAGE_WEBP_QUALITY', '75'))
+
+# The placeholder is a blurred thumbnail this wide, inlined as a data URI
+# (a few hundred bytes) so cards paint something before any image loads
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_QUALITY = 40
+
+# Largest source file rendered, however it was uploaded (presigned POST or
+# upload session); the whole file is held in memory while decoding
+MAX_SOURCE_BYTES = 10 * 1024 * 1024
+
+# Refuse decompression bombs; 40 MP covers any phone camera
+MAX_SOURCE_PIXELS = int(os.environ.get('IMAGE_MAX_SOURCE_PIXELS', str(40 * 1000 * 1000)))
+
+# (format passed to Pillow, file extension, content type)
+OUTPUT_FORMATS = (
+    ('WEBP', 'webp', 'image/webp'),
+    ('JPEG', 'jpg', 'image/jpeg')
+)
+
+
+class UnsupportedImage(ValueError):
+    """The upload isn't an image Pillow can read, or is too large to process."""
+
+
+def _require_pillow():
+    if Image is None:
+        raise RuntimeError("Pillow is required to process images (see requirements.txt)")
+
+
+def open_image(data):
+    """Decode `data` (bytes or a binary file) into an RGB image with EXIF rotation applied."""
+    _require_pillow()
+    Image.MAX_IMAGE_PIXELS = MAX_SOURCE_PIXELS
+    try:
+        image = Image.open(data if hasattr(data, 'read') else io.BytesIO(data))
+        if image.width * image.height > MAX_SOURCE_PIXELS:
+            raise UnsupportedImage(f"Image is {image.width}x{image.height}, larger than {MAX_SOURCE_PIXELS} pixels")
+        # Phone photos are stored sideways with an orientation tag; bake it in
+        image = ImageOps.exif_transpose(image)
+        if image.mode != 'RGB':
+            # Flatten transparency onto white: JPEG has no alpha channel
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel('A'))
+    except (OSError, Image.DecompressionBombError) as e:
+        raise UnsupportedImage(f"Unreadable image: {e}")
+    return image
+
+
+def _resize(image, width):
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def _encode(image, pillow_format, quality):
+    buffer = io.BytesIO()
+    options = {"quality": quality}
+    if pillow_format == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    else:
+        options["method"] = 4
+    image.save(buffer, pillow_format, **options)
+    return buffer.getvalue()
+
+
+def target_widths(source_width, widths=IMAGE_VARIANT_WIDTHS):
+    """
+    Widths to render for a source `source_width` wide: never upscale, but a
+    small source still gets one variant at its own width.
+    """
+    fitting = sorted(width for width in set(widths) if width <= source_width)
+    return fitting or [source_width]
+
+
+def render_variants(image, widths=IMAGE_VARIANT_WIDTHS):
+    """
+    Yield (width, height, extension, content_type, bytes) for every width in
+    every output format. Each width is resized once from the source and
+    encoded to WebP and JPEG.
+    """
+    for width in target_widths(image.width, widths):
+        resized = image if width == image.width else _resize(image, width)
+        for pillow_format, extension, content_type in OUTPUT_FORMATS:
+            quality = WEBP_QUALITY if pillow_format == 'WEBP' else JPEG_QUALITY
+            yield width, resized.height, extension, content_type, _encode(resized, pillow_format, quality)
+
+
+def blur_placeholder(image):
+    """A tiny blurred JPEG of `image` as a data URI."""
+    tiny = image.copy()
+    tiny.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH * 4))
+    tiny = tiny.filter(ImageFilter.GaussianBlur(1))
+    data = _encode(tiny, 'JPEG', PLACEHOLDER_QUALITY)
+    return "data:image/jpeg;base64," + base64.b64encode(data).decode('ascii')
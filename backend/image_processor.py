@@ -0,0 +1,105 @@
+import os
+import time
+from datetime import datetime
+from urllib.parse import unquote_plus
+
+import aws_clients
+from botocore.exceptions import ClientError
+from garden_cache import garden_cache
+from garden_images import OWNER_METADATA_KEY, derived_prefix, parse_original_key
+from image_derivatives import MAX_SOURCE_BYTES, UnsupportedImage
+from image_store import build_derivatives, garden_image_fields, read_manifest
+
+s3_client = aws_clients.lazy_client('s3')
+table = aws_clients.lazy_table(os.environ['GARDENS_TABLE'])
+
+
+class GardenNotReady(Exception):
+    """
+    The upload finished before its garden was created (the wizard uploads
+    first). Raising lets Lambda retry the async invocation; the retry reuses
+    the derivatives already written.
+    """
+
+
+def _source_tag(etag):
+    # Multipart ETags look like "<md5>-<parts>"; the first 12 hex digits are plenty
+    return etag.strip('"').split('-')[0][:12]
+
+
+def attach_to_garden(user_id, garden_id, fields):
+    """Write variant URLs onto the garden, bumping its version so ETags change."""
+    try:
+        table.update_item(
+            Key={'userId': user_id, 'gardenId': garden_id},
+            UpdateExpression=(
+                "SET imageVariants = :variants, imagePlaceholder = :placeholder, "
+                "updatedAt = :updatedAt, #version = if_not_exists(#version, :zero) + :one"
+            ),
+            ConditionExpression="attribute_exists(gardenId)",
+            ExpressionAttributeNames={'#version': 'version'},
+            ExpressionAttributeValues={
+                ':variants': fields["imageVariants"],
+                ':placeholder': fields["imagePlaceholder"],
+                ':updatedAt': datetime.utcnow().isoformat(),
+                ':zero': 0,
+                ':one': 1
+            }
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            raise GardenNotReady(f"Garden {garden_id} does not exist (yet)")
+        raise
+    garden_cache.invalidate_user(user_id)
+
+
+def process_upload(bucket, key):
+    """Derive variants for one original upload. Returns a short status string."""
+    parsed = parse_original_key(key)
+    if parsed is None:
+        return "skipped"
+    user_id, garden_id = parsed
+
+    response = s3_client.get_object(Bucket=bucket, Key=key)
+    if response.get('Metadata', {}).get(OWNER_METADATA_KEY) != user_id:
+        print(f"Image {key} has no matching {OWNER_METADATA_KEY} metadata; skipping")
+        response['Body'].close()
+        return "skipped"
+    # The presigned POST caps uploads at this size; anything bigger got here another way
+    if response.get('ContentLength', 0) > MAX_SOURCE_BYTES:
+        print(f"Image {key} is {response['ContentLength']} bytes; skipping")
+        return "skipped"
+
+    source_tag = _source_tag(response['ETag'])
+    prefix = derived_prefix(user_id, garden_id)
+    manifest = read_manifest(bucket, prefix)
+    if manifest is None or manifest.get("source") != source_tag:
+        try:
+            manifest = build_derivatives(bucket, prefix, response['Body'].read(), source_tag)
+        except UnsupportedImage as e:
+            print(f"Image {key} not processed: {e}")
+            return "unsupported"
+    else:
+        response['Body'].close()
+
+    attach_to_garden(user_id, garden_id, garden_image_fields(manifest))
+    return "processed"
+
+
+def handler(event, context):
+    """
+    S3 ObjectCreated consumer for the image bucket (prefix gardens/). For
+    each original upload, renders fixed-width WebP and JPEG variants and a
+    blur placeholder under gardens/<userId>/<gardenId>/derived/, then writes their
+    URLs onto the garden item. Derivative keys are ignored, so the
+    processor's own writes never re-trigger it.
+    """
+    results = {}
+    for record in event.get('Records', []):
+        bucket = record['s3']['bucket']['name']
+        key = unquote_plus(record['s3']['object']['key'])
+        started = time.perf_counter()
+        status = process_upload(bucket, key)
+        results[key] = status
+        print(f"Image {key}: {status} in {round((time.perf_counter() - started) * 1000, 1)} ms")
+    return {"results": results}
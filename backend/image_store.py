@@ -0,0 +1,96 @@
+import json
+import os
+
+import aws_clients
+from botocore.exceptions import ClientError
+from garden_cache import MemoryCacheBackend
+from garden_images import S3_BUCKET_NAME, content_key, content_prefix, manifest_key, public_url, variant_key
+
+s3_client = aws_clients.lazy_client('s3')
+
+# Derivative and content keys never change meaning, so they can be cached forever
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Content manifests are immutable once written; remember them per container
+CONTENT_MANIFEST_CACHE_MAX_ENTRIES = int(os.environ.get('CONTENT_MANIFEST_CACHE_MAX_ENTRIES', '1024'))
+
+_content_manifests = MemoryCacheBackend(CONTENT_MANIFEST_CACHE_MAX_ENTRIES)
+
+
+def read_manifest(bucket, prefix):
+    """The manifest written under `prefix`, or None if derivatives don't exist (yet)."""
+    try:
+        response = s3_client.get_object(Bucket=bucket, Key=manifest_key(prefix))
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+            return None
+        raise
+    return json.loads(response['Body'].read())
+
+
+def build_derivatives(bucket, prefix, data, source_tag=None, image=None):
+    """
+    Render and upload every variant plus the placeholder under `prefix`.
+    The manifest is written last, so its presence means the set is complete.
+    Returns the manifest: {"source", "variants": [{"width", "height",
+    "webp", "jpg"}], "placeholder"}, with S3 keys rather than URLs.
+    """
+    # Pillow is only imported by the code paths that render
+    from image_derivatives import blur_placeholder, open_image, render_variants
+
+    image = image or open_image(data)
+    variants = {}
+    for width, height, extension, content_type, body in render_variants(image):
+        key = variant_key(prefix, width, extension, source_tag)
+        s3_client.put_object(
+            Bucket=bucket, Key=key, Body=body,
+            ContentType=content_type, CacheControl=IMMUTABLE_CACHE_CONTROL
+        )
+        variants.setdefault(width, {"width": width, "height": height})[extension] = key
+
+    manifest = {
+        "source": source_tag,
+        "variants": [variants[width] for width in sorted(variants)],
+        "placeholder": blur_placeholder(image)
+    }
+    s3_client.put_object(
+        Bucket=bucket, Key=manifest_key(prefix),
+        Body=json.dumps(manifest).encode('utf-8'), ContentType='application/json'
+    )
+    return manifest
+
+
+def garden_image_fields(manifest):
+    """The attributes written onto a garden item for a manifest."""
+    variants = []
+    for variant in manifest["variants"]:
+        entry = {"width": variant["width"], "height": variant["height"]}
+        for extension in ("webp", "jpg"):
+            if extension in variant:
+                entry[extension] = public_url(variant[extension])
+        variants.append(entry)
+    return {"imageVariants": variants, "imagePlaceholder": manifest["placeholder"]}
+
+
+def content_manifest(sha256):
+    """Manifest of stored content `sha256`, or None if it was never (fully) uploaded."""
+    manifest = _content_manifests.get(sha256)
+    if manifest is None:
+        manifest = read_manifest(S3_BUCKET_NAME, content_prefix(sha256))
+        if manifest is not None:
+            _content_manifests.set(sha256, manifest)
+    return manifest
+
+
+def content_image_fields(sha256):
+    """
+    Garden attributes referencing shared content `sha256`: the hash, the
+    original's URL and its variants. None if the content doesn't exist.
+    """
+    manifest = content_manifest(sha256)
+    if manifest is None:
+        return None
+    fields = garden_image_fields(manifest)
+    fields["imageHash"] = sha256
+    fields["imageUrl"] = public_url(content_key(sha256))
+    return fields
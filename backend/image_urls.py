@@ -0,0 +1,130 @@
+import hashlib
+import hmac
+import os
+import time
+from datetime import datetime
+from urllib.parse import quote, unquote, urlsplit
+
+from garden_cache import MemoryCacheBackend
+from garden_images import IMAGE_PUBLIC_BASE_URL, S3_REGION
+from presigned_post import current_credentials, signing_key
+
+# public: image URLs are returned as stored (the bucket is public-read)
+# signed: the bucket is private and responses carry presigned GET URLs
+IMAGE_URL_MODE = os.environ.get('IMAGE_URL_MODE', 'public')
+
+# Lifetime of a presigned read URL (seconds)
+IMAGE_READ_URL_EXPIRES = int(os.environ.get('IMAGE_READ_URL_EXPIRES', '3600'))
+
+# URLs are signed as of the start of a window this long, so every response in
+# a window carries identical URLs (memoizable, and ETags stay stable) and each
+# URL is still valid for at least EXPIRES - WINDOW seconds after it is served
+IMAGE_READ_URL_WINDOW = int(os.environ.get('IMAGE_READ_URL_WINDOW', '900'))
+
+IMAGE_READ_URL_CACHE_MAX_ENTRIES = int(os.environ.get('IMAGE_READ_URL_CACHE_MAX_ENTRIES', '20000'))
+
+_signed_urls = MemoryCacheBackend(IMAGE_READ_URL_CACHE_MAX_ENTRIES)
+
+_base = urlsplit(IMAGE_PUBLIC_BASE_URL)
+_BASE_PREFIX = IMAGE_PUBLIC_BASE_URL + '/'
+
+
+def signing_enabled():
+    return IMAGE_URL_MODE == 'signed'
+
+
+def signing_window(now=None):
+    """Start (epoch seconds) of the signing window containing `now`."""
+    now = time.time() if now is None else now
+    return int(now // IMAGE_READ_URL_WINDOW) * IMAGE_READ_URL_WINDOW
+
+
+def url_variant(now=None):
+    """ETag variant for responses carrying image URLs: changes when the URLs are re-signed."""
+    return f"urls={signing_window(now)}" if signing_enabled() else ''
+
+
+def _encode(value, safe='-_.~'):
+    return quote(value, safe=safe)
+
+
+def presigned_get_url(key, window_start):
+    """
+    SigV4 query-string presigned GET for `key`, dated `window_start`.
+    The URL is built on IMAGE_PUBLIC_BASE_URL (virtual-hosted S3 or a
+    path-style endpoint), so it must point at S3 itself in signed mode.
+    """
+    credentials = current_credentials()
+    amz_date = datetime.utcfromtimestamp(window_start).strftime('%Y%m%dT%H%M%SZ')
+    date_stamp = amz_date[:8]
+    scope = f"{date_stamp}/{S3_REGION}/s3/aws4_request"
+
+    path = f"{_base.path}/{_encode(key, safe='/~')}"
+    params = {
+        'X-Amz-Algorithm': 'AWS4-HMAC-SHA256',
+        'X-Amz-Credential': f"{credentials.access_key}/{scope}",
+        'X-Amz-Date': amz_date,
+        'X-Amz-Expires': str(IMAGE_READ_URL_EXPIRES),
+        'X-Amz-SignedHeaders': 'host'
+    }
+    if credentials.token is not None:
+        params['X-Amz-Security-Token'] = credentials.token
+    query = '&'.join(f"{_encode(name)}={_encode(value)}" for name, value in sorted(params.items()))
+
+    canonical_request = f"GET\n{path}\n{query}\nhost:{_base.netloc}\n\nhost\nUNSIGNED-PAYLOAD"
+    string_to_sign = (
+        f"AWS4-HMAC-SHA256\n{amz_date}\n{scope}\n"
+        + hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+    )
+    signature = hmac.new(
+        signing_key(credentials.secret_key, date_stamp, S3_REGION), string_to_sign.encode('utf-8'), hashlib.sha256
+    ).hexdigest()
+    return f"{_base.scheme}://{_base.netloc}{path}?{query}&X-Amz-Signature={signature}"
+
+
+def sign_url(url, window_start):
+    """Presigned form of a stored image URL; other URLs (external, empty, data:) pass through."""
+    if not isinstance(url, str) or not url.startswith(_BASE_PREFIX):
+        return url
+    key = unquote(url[len(_BASE_PREFIX):])
+    cache_key = f"{window_start}|{key}"
+    signed = _signed_urls.get(cache_key)
+    if signed is None:
+        signed = presigned_get_url(key, window_start)
+        _signed_urls.set(cache_key, signed, ttl=IMAGE_READ_URL_WINDOW)
+    return signed
+
+
+def _sign_garden(garden, window_start):
+    if not garden.get('imageUrl') and not garden.get('imageVariants'):
+        return garden
+    # Items may come from the shared read cache: never modify them in place
+    signed = dict(garden)
+    if garden.get('imageUrl'):
+        signed['imageUrl'] = sign_url(garden['imageUrl'], window_start)
+    if garden.get('imageVariants'):
+        signed['imageVariants'] = [
+            {name: sign_url(value, window_start) if name in ('webp', 'jpg') else value
+             for name, value in variant.items()}
+            for variant in garden['imageVariants']
+        ]
+    return signed
+
+
+def sign_gardens(gardens, now=None):
+    """
+    Return `gardens` with every stored image URL presigned, in one pass.
+    URLs are memoized per object key for the current window, so a warm
+    container signs each image at most once per window. A no-op unless
+    IMAGE_URL_MODE=signed.
+    """
+    if not signing_enabled():
+        return gardens
+    window_start = signing_window(now)
+    return [_sign_garden(garden, window_start) for garden in gardens]
+
+
+def sign_garden(garden, now=None):
+    if not signing_enabled() or not garden:
+        return garden
+    return _sign_garden(garden, signing_window(now))
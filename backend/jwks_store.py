@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+
+# Age after which the key set is refreshed in the background
+JWKS_REFRESH_INTERVAL = int(os.environ.get('JWKS_REFRESH_INTERVAL', '300'))
+
+# Minimum gap between refreshes forced by an unknown kid
+JWKS_MIN_FORCED_REFRESH_INTERVAL = int(os.environ.get('JWKS_MIN_FORCED_REFRESH_INTERVAL', '30'))
+
+# Timeout (seconds) for the JWKS HTTP request
+JWKS_FETCH_TIMEOUT = float(os.environ.get('JWKS_FETCH_TIMEOUT', '3'))
+
+# Snapshots older than this are ignored on cold start (Cognito rotates rarely)
+JWKS_SNAPSHOT_MAX_AGE = int(os.environ.get('JWKS_SNAPSHOT_MAX_AGE', '86400'))
+
+
+def _jwks_checksum(jwks_url, jwks):
+    canonical = json.dumps({"url": jwks_url, "jwks": jwks}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class JwksKeyStore:
+    """
+    Maps JWKS `kid` values to ready-to-use public keys.
+    Keys are built once per refresh with `key_builder(jwk_dict)`. A stale
+    key set keeps being served while a single background refresh runs, and
+    unknown kids force at most one synchronous refresh per
+    `min_forced_interval` seconds.
+
+    When `snapshot_path` is set, every successful fetch is written there with
+    a checksum, and a cold container loads the snapshot instead of waiting on
+    the network. A `file://` URL reads the JWKS from local disk (test stub).
+    """
+
+    def __init__(self, name, jwks_url, key_builder,
+                 refresh_interval=JWKS_REFRESH_INTERVAL,
+                 min_forced_interval=JWKS_MIN_FORCED_REFRESH_INTERVAL,
+                 fetch_timeout=JWKS_FETCH_TIMEOUT,
+                 session=None, snapshot_path=None,
+                 snapshot_max_age=JWKS_SNAPSHOT_MAX_AGE):
+        self.name = name
+        self.jwks_url = jwks_url
+        self.key_builder = key_builder
+        self.refresh_interval = refresh_interval
+        self.min_forced_interval = min_forced_interval
+        self.fetch_timeout = fetch_timeout
+        self.session = session or requests
+        self.snapshot_path = snapshot_path
+        self.snapshot_max_age = snapshot_max_age
+        self._keys = {}
+        self._jwks = None
+        self._fetched_at = 0.0
+        self._last_forced_at = 0.0
+        self._state_lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._background_refresh = None
+        self.fetches = 0
+
+    def get_jwks(self):
+        """Return the raw JWKS document currently being served, or None."""
+        self._ensure_loaded()
+        return self._jwks
+
+    def get_key(self, kid):
+        """Return the public key for `kid`, or None if it is not in the JWKS."""
+        self._ensure_loaded()
+
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        # Unknown kid: Cognito may have rotated keys, but throttle so that
+        # garbage tokens cannot trigger a fetch per request
+        with self._state_lock:
+            now = time.time()
+            if now - self._last_forced_at < self.min_forced_interval:
+                return None
+            self._last_forced_at = now
+            seen = self._fetched_at
+
+        self._refresh_blocking(seen)
+        return self._keys.get(kid)
+
+    def _ensure_loaded(self):
+        if not self._fetched_at and not self._load_snapshot():
+            self._refresh_blocking(self._fetched_at)
+        if self._fetched_at and time.time() - self._fetched_at >= self.refresh_interval:
+            self._start_background_refresh()
+
+    def _refresh_blocking(self, seen_fetched_at):
+        """Refresh unless another caller finished a refresh since `seen_fetched_at`."""
+        with self._fetch_lock:
+            if self._fetched_at != seen_fetched_at:
+                return
+            self._refresh()
+
+    def _start_background_refresh(self):
+        with self._state_lock:
+            if self._background_refresh is not None and self._background_refresh.is_alive():
+                return
+            seen = self._fetched_at
+            self._background_refresh = threading.Thread(
+                target=self._refresh_blocking, args=(seen,), daemon=True
+            )
+            self._background_refresh.start()
+
+    def _refresh(self):
+        jwks = self._fetch()
+        if jwks is None:
+            # Keep serving the previous key set; retry after a short delay
+            # instead of on every request
+            if self._keys:
+                self._fetched_at = time.time() - self.refresh_interval + self.min_forced_interval
+            return
+
+        self._install(jwks, time.time())
+        self._write_snapshot(jwks)
+
+    def _install(self, jwks, fetched_at):
+        keys = {}
+        for jwk_dict in jwks.get('keys', []):
+            kid = jwk_dict.get('kid')
+            if not kid:
+                continue
+            try:
+                keys[kid] = self.key_builder(jwk_dict)
+            except Exception as e:
+                print(f"Skipping JWKS key {kid} ({self.name}): {str(e)}")
+
+        self._keys = keys
+        self._jwks = jwks
+        self._fetched_at = fetched_at
+
+    def _load_snapshot(self):
+        """Install keys from the on-disk snapshot. Returns True if it was usable."""
+        if not self.snapshot_path:
+            return False
+
+        with self._fetch_lock:
+            if self._fetched_at:
+                return True
+            try:
+                with open(self.snapshot_path, 'r') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                return False
+
+            jwks = snapshot.get('jwks')
+            fetched_at = snapshot.get('fetchedAt', 0)
+            if not isinstance(jwks, dict):
+                return False
+            if (snapshot.get('url') != self.jwks_url
+                    or snapshot.get('checksum') != _jwks_checksum(self.jwks_url, jwks)):
+                print(f"Ignoring JWKS snapshot with bad checksum ({self.name})")
+                return False
+            if time.time() - fetched_at > self.snapshot_max_age:
+                return False
+
+            # Keep the original fetch time so the usual staleness check
+            # schedules a background refresh when the snapshot is old
+            self._install(jwks, max(float(fetched_at), 1.0))
+            return bool(self._keys)
+
+    def _write_snapshot(self, jwks):
+        if not self.snapshot_path:
+            return
+
+        snapshot = {
+            "url": self.jwks_url,
+            "fetchedAt": self._fetched_at,
+            "jwks": jwks,
+            "checksum": _jwks_checksum(self.jwks_url, jwks)
+        }
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"Error writing JWKS snapshot ({self.name}): {str(e)}")
+
+    def _fetch(self):
+        """Fetch the raw JWKS document. Returns None if the fetch fails."""
+        if not self.jwks_url:
+            print(f"JWKS URL not configured ({self.name})")
+            return None
+
+        self.fetches += 1
+        try:
+            if self.jwks_url.startswith('file://'):
+                with open(self.jwks_url[len('file://'):], 'r') as f:
+                    return json.load(f)
+
+            response = self.session.get(self.jwks_url, timeout=self.fetch_timeout)
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, OSError, ValueError) as e:
+            print(f"Error fetching JWKS ({self.name}): {str(e)}")
+            return None
@@ -1,98 +1,13 @@
-import json
-import boto3
-import requests
-from botocore.exceptions import ClientError
-
-# Try to import jwt, fallback to python-jose if PyJWT is not available
-try:
-    import jwt
-    JWT_AVAILABLE = True
-except ImportError:
-    try:
-        from jose import jwt
-        JWT_AVAILABLE = True
-    except ImportError:
-        JWT_AVAILABLE = False
-
-def cors_headers():
-    return {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE",
-        "Access-Control-Allow-Headers": "Content-Type,Authorization"
-    }
-
-def respond(status, body):
-    return {
-        "statusCode": status,
-        "headers": cors_headers(),
-        "body": json.dumps(body)
-    }
+import token_verifier
+from responses import respond
 
 def get_cognito_public_keys():
     """Get Cognito public keys for JWT verification"""
-    region = "eu-north-1"
-    user_pool_id = "eu-north-1_i7vhr8PxH"
-    
-    url = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}/.well-known/jwks.json"
-    
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"Error fetching Cognito public keys: {e}")
-        return None
+    return token_verifier.get_jwks()
 
 def verify_jwt_token(token):
     """Verify JWT token and return user information"""
-    if not JWT_AVAILABLE:
-        return None, "JWT library not available"
-    
-    try:
-        # Remove 'Bearer ' prefix if present
-        if token.startswith('Bearer '):
-            token = token[7:]
-        
-        # Get Cognito public keys
-        jwks = get_cognito_public_keys()
-        if not jwks:
-            return None, "Unable to verify token"
-        
-        # Decode token header to get key ID
-        unverified_header = jwt.get_unverified_header(token)
-        kid = unverified_header.get('kid')
-        
-        if not kid:
-            return None, "Invalid token format"
-        
-        # Find the correct key
-        public_key = None
-        for key in jwks['keys']:
-            if key['kid'] == kid:
-                public_key = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
-                break
-        
-        if not public_key:
-            return None, "Invalid token key"
-        
-        # Verify and decode the token
-        decoded_token = jwt.decode(
-            token,
-            public_key,
-            algorithms=['RS256'],
-            audience="76i7it21omdm3n80nf9j9dc2oc",  # Client ID
-            issuer=f"https://cognito-idp.eu-north-1.amazonaws.com/eu-north-1_i7vhr8PxH"
-        )
-        
-        return decoded_token, None
-        
-    except jwt.ExpiredSignatureError:
-        return None, "Token has expired"
-    except jwt.InvalidTokenError as e:
-        return None, f"Invalid token: {str(e)}"
-    except Exception as e:
-        print(f"Error verifying token: {e}")
-        return None, "Token verification failed"
+    return token_verifier.verify_token(token)
 
 def get_user_id_from_token(event):
     """Extract and verify user ID from Authorization header"""
@@ -0,0 +1,110 @@
+import re
+
+# Global secondary indexes on the gardens table (see serverless.yml). All are
+# partitioned by userId, so every plan stays a single-partition Query.
+SORT_INDEXES = {
+    'updatedAt': 'userId-updatedAt-index',
+    'createdAt': 'userId-createdAt-index',
+    'name': 'userId-name-index'
+}
+STATUS_INDEX = 'userId-status-index'
+
+SORT_ORDERS = ('asc', 'desc')
+
+_STATUS_PATTERN = re.compile(r'^[a-z][a-z_-]{0,31}$')
+
+
+class ListPlan:
+    """How one `GET /gardens` combination is read from DynamoDB."""
+
+    def __init__(self, name, index=None, sort_key=None, descending=False, status=None, status_in_key=False):
+        self.name = name
+        self.index = index
+        self.sort_key = sort_key
+        self.descending = descending
+        self.status = status
+        self.status_in_key = status_in_key
+
+    def query_kwargs(self, user_id):
+        """Query kwargs for this plan, ready for projection_kwargs/query_page."""
+        names = {}
+        values = {':userId': user_id}
+        key_condition = 'userId = :userId'
+
+        if self.status_in_key:
+            names['#status'] = 'status'
+            values[':status'] = self.status
+            key_condition += ' AND #status = :status'
+
+        kwargs = {
+            "KeyConditionExpression": key_condition,
+            "ExpressionAttributeValues": values
+        }
+        if self.index:
+            kwargs["IndexName"] = self.index
+        if self.descending:
+            kwargs["ScanIndexForward"] = False
+        if self.status and not self.status_in_key:
+            # Sorted by another key: status can only be filtered, and filtered-out
+            # items still count against read capacity
+            names['#status'] = 'status'
+            values[':status'] = self.status
+            kwargs["FilterExpression"] = '#status = :status'
+        if names:
+            kwargs["ExpressionAttributeNames"] = names
+        return kwargs
+
+    def key_attributes(self):
+        """Attributes of a LastEvaluatedKey for this plan: table key plus index key."""
+        if self.index is None:
+            return ('userId', 'gardenId')
+        return ('userId', 'gardenId', self.sort_key)
+
+    def cursor_scope(self, user_id):
+        """
+        Cursors carry index-specific LastEvaluatedKeys, so sign them for
+        this plan as well as the user: a cursor from one sort can't be
+        replayed against another.
+        """
+        return user_id if self.index is None else f"{user_id}|{self.name}"
+
+
+def parse_list_params(query_params):
+    """
+    Read `sort`, `order` and `status` from query string parameters.
+    Returns (sort, order, status); raises ValueError on unknown values.
+    """
+    query_params = query_params or {}
+    sort = query_params.get('sort') or None
+    order = query_params.get('order') or None
+    status = query_params.get('status') or None
+
+    if sort is not None and sort not in SORT_INDEXES:
+        raise ValueError(f"sort must be one of: {', '.join(SORT_INDEXES)}")
+    if order is not None and order not in SORT_ORDERS:
+        raise ValueError("order must be asc or desc")
+    if status is not None and not _STATUS_PATTERN.match(status):
+        raise ValueError("Invalid status")
+
+    return sort, order, status
+
+
+def plan_list_query(sort=None, order=None, status=None):
+    """
+    Pick the cheapest way to serve a listing:
+    - no sort, no status       -> base table, gardenId order (unchanged behaviour)
+    - status only              -> status index, status in the key condition
+    - sort (with/without status) -> that sort's index, status as a filter
+    `order` defaults to desc for dates (newest first) and asc otherwise.
+    """
+    if order is None:
+        order = 'desc' if sort in ('updatedAt', 'createdAt') else 'asc'
+    descending = order == 'desc'
+
+    if sort is None and status is None:
+        return ListPlan('table', descending=descending)
+    if sort is None:
+        return ListPlan('status', index=STATUS_INDEX, sort_key='status', descending=descending,
+                        status=status, status_in_key=True)
+    return ListPlan(f"{sort}-{order}" + ('-filtered' if status else ''), index=SORT_INDEXES[sort],
+                    sort_key=sort, descending=descending, status=status)
@@ -1,23 +1,10 @@
 import json
-import boto3
+import aws_clients
 import os
 from botocore.exceptions import ClientError
+from responses import respond
 
-client = boto3.client("cognito-idp")
-
-def cors_headers():
-    return {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Methods": "OPTIONS,POST,GET",
-        "Access-Control-Allow-Headers": "Content-Type"
-    }
-
-def respond(status, body):
-    return {
-        "statusCode": status,
-        "headers": cors_headers(),
-        "body": json.dumps(body)
-    }
+client = aws_clients.lazy_client("cognito-idp")
 
 def handler(event, context):
     # Handle CORS preflight
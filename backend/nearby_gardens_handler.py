@@ -0,0 +1,90 @@
+import aws_clients
+import os
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
+import geo
+from fieldsets import parse_fields, projection_kwargs
+from image_urls import sign_gardens
+from pagination import query_all
+from simple_auth import require_auth, respond
+
+table = aws_clients.lazy_table(os.environ['GARDENS_TABLE'])
+
+GEOHASH_INDEX = 'userId-geohash-index'
+
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 1000
+DEFAULT_NEARBY_RESULTS = 50
+MAX_NEARBY_RESULTS = 100
+
+def _parse_number(query_params, name, default, low, high):
+    value = query_params.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+    if not (low <= number <= high):
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return number
+
+def _query_cell(user_id, cell, fields):
+    query_kwargs = {
+        "IndexName": GEOHASH_INDEX,
+        "KeyConditionExpression": 'userId = :userId AND begins_with(geohash, :cell)',
+        "ExpressionAttributeValues": {
+            ':userId': user_id,
+            ':cell': cell
+        }
+    }
+    query_kwargs.update(projection_kwargs(fields))
+    return query_all(table, query_kwargs)
+
+@require_auth
+def handler(event, context):
+    try:
+        # Get authenticated user ID from the decorator
+        user_id = event['user_id']
+
+        query_params = event.get('queryStringParameters') or {}
+        if not query_params.get('lat') or not query_params.get('lon'):
+            return respond(400, {"message": "lat and lon parameters are required"})
+        lat, lon = geo.validate_coordinates(query_params['lat'], query_params['lon'])
+        radius_km = _parse_number(query_params, 'radius_km', DEFAULT_RADIUS_KM, 0.001, MAX_RADIUS_KM)
+        limit = int(_parse_number(query_params, 'limit', DEFAULT_NEARBY_RESULTS, 1, MAX_NEARBY_RESULTS))
+
+        # Optional ?fields=; coordinates are always read for the distance check
+        fields = parse_fields(query_params.get('fields'))
+        if fields:
+            fields = fields + tuple(field for field in ('lat', 'lon') if field not in fields)
+
+        # One range query per geohash cell covering the circle, run in parallel
+        cells = geo.cover_circle(lat, lon, radius_km)
+        with ThreadPoolExecutor(max_workers=len(cells)) as executor:
+            results = list(executor.map(lambda cell: _query_cell(user_id, cell, fields), cells))
+
+        # Cells are squares around a circle: keep only gardens within the exact distance
+        nearby = []
+        for items in results:
+            for item in items:
+                distance = geo.haversine_km(lat, lon, float(item['lat']), float(item['lon']))
+                if distance <= radius_km:
+                    nearby.append(dict(item, distanceKm=round(distance, 3)))
+        nearby.sort(key=lambda garden: garden['distanceKm'])
+
+        return respond(200, {
+            "gardens": sign_gardens(nearby[:limit]),
+            "count": min(len(nearby), limit),
+            "totalMatches": len(nearby),
+            "cellsQueried": len(cells)
+        })
+
+    except ValueError as e:
+        return respond(400, {"message": str(e)})
+    except ClientError as e:
+        print(f"DynamoDB error: {e}")
+        return respond(500, {"message": "Database error occurred"})
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return respond(500, {"message": "Internal server error"})
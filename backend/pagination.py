@@ -0,0 +1,136 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+
+# Secret used to sign pagination cursors so clients cannot forge start keys;
+# upload session and sync tokens are signed with it too. There is no default:
+# a known secret would let anyone mint tokens, so a missing one fails the
+# cold start instead (serverless.yml reads it from SSM at deploy time).
+CURSOR_SIGNING_SECRET = os.environ['CURSOR_SIGNING_SECRET']
+if not CURSOR_SIGNING_SECRET:
+    raise RuntimeError("CURSOR_SIGNING_SECRET must not be empty")
+
+# Page size bounds for `?limit=`
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def _sign(payload, scope):
+    message = scope.encode('utf-8') + b'.' + payload
+    return hmac.new(CURSOR_SIGNING_SECRET.encode('utf-8'), message, hashlib.sha256).digest()
+
+
+def encode_cursor(last_evaluated_key, scope):
+    """
+    Wrap a DynamoDB LastEvaluatedKey into an opaque, signed cursor string.
+    `scope` (usually the user ID) is bound into the signature so a cursor
+    cannot be replayed against another user's listing.
+    """
+    if not last_evaluated_key:
+        return None
+
+    payload = json.dumps(last_evaluated_key, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    token = payload + _sign(payload, scope)
+    return base64.urlsafe_b64encode(token).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, scope):
+    """
+    Return the ExclusiveStartKey wrapped by `cursor`.
+    Raises ValueError if the cursor is malformed or was tampered with.
+    """
+    try:
+        token = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    if len(token) <= 32:
+        raise ValueError("Invalid cursor")
+
+    payload, signature = token[:-32], token[-32:]
+    if not hmac.compare_digest(signature, _sign(payload, scope)):
+        raise ValueError("Invalid cursor")
+
+    try:
+        return json.loads(payload)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def parse_page_params(query_params):
+    """
+    Read `limit` and `cursor` from query string parameters.
+    Returns (limit, cursor); limit is None when the caller wants every item.
+    Raises ValueError on an out-of-range limit.
+    """
+    query_params = query_params or {}
+    limit = query_params.get('limit')
+    cursor = query_params.get('cursor') or None
+
+    if limit is None or limit == '':
+        return (DEFAULT_PAGE_SIZE if cursor else None), cursor
+
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    return limit, cursor
+
+
+def query_page(table, query_kwargs, limit, exclusive_start_key=None, key_attributes=None):
+    """
+    Run `table.query` until `limit` items are collected or the partition is exhausted.
+    Returns (items, last_evaluated_key); the key is None on the final page.
+
+    With a FilterExpression, Limit caps the items *evaluated*, not returned,
+    so every call reads at least a full page (MAX_PAGE_SIZE) instead of
+    shrinking towards one item per round trip. Surplus matches are trimmed
+    and the cursor is rebuilt from the last item returned, using
+    `key_attributes` (the table key plus the index key, all projected).
+    """
+    filtered = 'FilterExpression' in query_kwargs
+    if filtered and not key_attributes:
+        raise ValueError("key_attributes are required to page a filtered query")
+
+    items = []
+    start_key = exclusive_start_key
+
+    while True:
+        read_size = max(limit, MAX_PAGE_SIZE) if filtered else limit - len(items)
+        kwargs = dict(query_kwargs, Limit=read_size)
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+
+        response = table.query(**kwargs)
+        items.extend(response.get('Items', []))
+        start_key = response.get('LastEvaluatedKey')
+
+        if len(items) > limit:
+            items = items[:limit]
+            return items, {attribute: items[-1][attribute] for attribute in key_attributes}
+        if not start_key or len(items) >= limit:
+            return items, start_key
+
+
+def query_all(table, query_kwargs):
+    """Run `table.query` across every page and return all items."""
+    items = []
+    start_key = None
+
+    while True:
+        kwargs = dict(query_kwargs)
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+
+        response = table.query(**kwargs)
+        items.extend(response.get('Items', []))
+        start_key = response.get('LastEvaluatedKey')
+
+        if not start_key:
+            return items
@@ -0,0 +1,106 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import aws_clients
+
+# Frozen credentials are reused this long (seconds) before asking botocore
+# again; Lambda's role credentials are valid for hours
+CREDENTIALS_REUSE_SECONDS = 300
+
+_lock = threading.Lock()
+_credentials = None
+_credentials_at = 0.0
+_signing_keys = {}
+_form_urls = {}
+
+
+def _hmac(key, message):
+    return hmac.new(key, message.encode('utf-8'), hashlib.sha256).digest()
+
+
+def current_credentials():
+    """Frozen (access key, secret, token) from the shared session, refreshed every few minutes."""
+    global _credentials, _credentials_at
+    now = time.time()
+    with _lock:
+        if _credentials is None or now - _credentials_at > CREDENTIALS_REUSE_SECONDS:
+            _credentials = aws_clients.credentials().get_frozen_credentials()
+            _credentials_at = now
+        return _credentials
+
+
+def signing_key(secret_key, date_stamp, region, service='s3'):
+    """
+    SigV4 signing key: four chained HMACs that only change with the secret,
+    the day and the region, so one derivation serves every policy that day.
+    """
+    cache_key = (secret_key, date_stamp, region, service)
+    key = _signing_keys.get(cache_key)
+    if key is None:
+        key = _hmac(f"AWS4{secret_key}".encode('utf-8'), date_stamp)
+        for part in (region, service, 'aws4_request'):
+            key = _hmac(key, part)
+        with _lock:
+            # Yesterday's keys are dead weight once the date rolls over
+            for stale in [k for k in _signing_keys if k[1] != date_stamp]:
+                del _signing_keys[stale]
+            _signing_keys[cache_key] = key
+    return key
+
+
+def form_url(s3_client, bucket):
+    """
+    The URL browsers POST the form to. botocore resolves it (virtual-hosted
+    or a custom endpoint) once per bucket; the result never changes.
+    """
+    url = _form_urls.get(bucket)
+    if url is None:
+        url = s3_client.generate_presigned_post(Bucket=bucket, Key='probe')['url']
+        _form_urls[bucket] = url
+    return url
+
+
+def presigned_post(s3_client, bucket, key, fields, conditions, expires_in, now=None):
+    """
+    Equivalent of s3_client.generate_presigned_post for SigV4, but with the
+    credentials, signing key and form URL reused across calls. Returns
+    {"url", "fields"} in the same shape.
+    """
+    credentials = current_credentials()
+    region = s3_client.meta.region_name
+    now = now or datetime.utcnow()
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    date_stamp = amz_date[:8]
+    credential = f"{credentials.access_key}/{date_stamp}/{region}/s3/aws4_request"
+
+    fields = dict(fields, key=key)
+    fields.update({
+        'x-amz-algorithm': 'AWS4-HMAC-SHA256',
+        'x-amz-credential': credential,
+        'x-amz-date': amz_date
+    })
+    policy_conditions = list(conditions) + [{'bucket': bucket}, {'key': key}]
+    policy_conditions += [
+        {'x-amz-algorithm': 'AWS4-HMAC-SHA256'},
+        {'x-amz-credential': credential},
+        {'x-amz-date': amz_date}
+    ]
+    if credentials.token is not None:
+        fields['x-amz-security-token'] = credentials.token
+        policy_conditions.append({'x-amz-security-token': credentials.token})
+
+    policy = {
+        'expiration': (now + timedelta(seconds=expires_in)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'conditions': policy_conditions
+    }
+    fields['policy'] = base64.b64encode(json.dumps(policy).encode('utf-8')).decode('utf-8')
+    fields['x-amz-signature'] = hmac.new(
+        signing_key(credentials.secret_key, date_stamp, region), fields['policy'].encode('utf-8'), hashlib.sha256
+    ).hexdigest()
+
+    return {'url': form_url(s3_client, bucket), 'fields': fields}
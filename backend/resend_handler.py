@@ -1,35 +1,24 @@
 import json
-import boto3
+import aws_clients
 import os
+from responses import respond
 
-client = boto3.client("cognito-idp")
+client = aws_clients.lazy_client("cognito-idp")
 
 def handler(event, context):
     # Handle CORS preflight
     if event.get("httpMethod") == "OPTIONS":
-        return {
-            "statusCode": 200,
-            "headers": cors_headers(),
-            "body": ""
-        }
+        return respond(200, {"message": "CORS preflight"})
 
     try:
         body = json.loads(event.get("body", "{}"))
     except Exception:
-        return {
-            "statusCode": 400,
-            "headers": cors_headers(),
-            "body": json.dumps({"message": "Invalid JSON body"})
-        }
+        return respond(400, {"message": "Invalid JSON body"})
 
     email = body.get("email")
 
     if not email:
-        return {
-            "statusCode": 400,
-            "headers": cors_headers(),
-            "body": json.dumps({"message": "Email is required"})
-        }
+        return respond(400, {"message": "Email is required"})
 
     try:
         client.resend_confirmation_code(
@@ -37,33 +26,10 @@ def handler(event, context):
             Username=email
         )
 
-        return {
-            "statusCode": 200,
-            "headers": cors_headers(),
-            "body": json.dumps({"message": "Confirmation code resent successfully."})
-        }
+        return respond(200, {"message": "Confirmation code resent successfully."})
     except client.exceptions.InvalidParameterException:
-        return {
-            "statusCode": 400,
-            "headers": cors_headers(),
-            "body": json.dumps({"message": "Invalid email address"})
-        }
+        return respond(400, {"message": "Invalid email address"})
     except client.exceptions.UserNotFoundException:
-        return {
-            "statusCode": 400,
-            "headers": cors_headers(),
-            "body": json.dumps({"message": "User not found"})
-        }
+        return respond(400, {"message": "User not found"})
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "headers": cors_headers(),
-            "body": json.dumps({"message": "Internal server error"})
-        }
-
-def cors_headers():
-    return {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Methods": "OPTIONS,POST,GET",
-        "Access-Control-Allow-Headers": "Content-Type"
-    }
+        return respond(500, {"message": "Internal server error"})
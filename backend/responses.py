@@ -0,0 +1,88 @@
+import datetime
+import decimal
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# CORS headers shared by every response; built once per container, treat as read-only
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE",
+    "Access-Control-Allow-Headers": "Content-Type,Authorization,If-None-Match,If-Match",
+    "Access-Control-Expose-Headers": "ETag"
+}
+
+# auto (orjson when installed), orjson or json
+RESPONSE_JSON_ENCODER = os.environ.get('RESPONSE_JSON_ENCODER', 'auto')
+
+
+def json_default(value):
+    """Serialize types boto3 and handlers return that JSON doesn't support natively."""
+    if isinstance(value, decimal.Decimal):
+        # DynamoDB numbers come back as Decimal; keep integers as integers
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_stdlib(body):
+    return json.dumps(body, default=json_default, separators=(',', ':'))
+
+
+def encode_orjson(body):
+    # orjson handles datetime natively; Decimal and sets go through json_default
+    return orjson.dumps(body, default=json_default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+
+ENCODERS = {"json": encode_stdlib}
+if orjson is not None:
+    ENCODERS["orjson"] = encode_orjson
+
+
+def select_encoder(name=RESPONSE_JSON_ENCODER):
+    """Return the encoder function for `name`, falling back to stdlib json."""
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'json'
+    if name not in ENCODERS:
+        print(f"Response encoder {name} unavailable, using json")
+        name = 'json'
+    return ENCODERS[name]
+
+
+encode_body = select_encoder()
+
+
+def get_header(event, name):
+    """Case-insensitive request header lookup (API Gateway preserves client casing)"""
+    headers = event.get('headers') or {}
+    value = headers.get(name)
+    if value is not None:
+        return value
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def cors_headers():
+    """Return CORS headers for all responses"""
+    return dict(CORS_HEADERS)
+
+
+def respond(status, body, headers=None):
+    """Create a standardized HTTP response"""
+    return {
+        "statusCode": status,
+        "headers": dict(CORS_HEADERS, **headers) if headers else CORS_HEADERS,
+        "body": encode_body(body)
+    }
@@ -0,0 +1,171 @@
+import importlib
+import re
+import time
+
+import aws_clients
+
+from compression import compress_response, decode_request_body
+from simple_auth import get_user_id_from_token, respond
+
+# (method, path template, "module.function", auth required)
+# Handler modules are imported on first use so a cold start only pays for
+# the routes it actually serves.
+ROUTES = [
+    ("POST", "/signup", "signup_handler.handler", False),
+    ("POST", "/login", "login_handler.handler", False),
+    ("POST", "/confirm", "confirm_handler.handler", False),
+    ("POST", "/resend", "resend_handler.handler", False),
+    ("GET", "/hello", "handler.hello", False),
+
+    ("GET", "/gardens", "get_gardens_handler.handler", True),
+    ("POST", "/gardens", "create_garden_handler.handler", True),
+    ("POST", "/gardens/bulk", "bulk_import_gardens_handler.handler", True),
+    ("POST", "/gardens/bulk-delete", "bulk_delete_gardens_handler.handler", True),
+    ("POST", "/gardens/batch-get", "batch_get_gardens_handler.handler", True),
+    ("GET", "/gardens/summary", "garden_summary_handler.handler", True),
+    ("GET", "/gardens/search", "search_gardens_handler.handler", True),
+    ("GET", "/gardens/nearby", "nearby_gardens_handler.handler", True),
+    ("GET", "/gardens/changes", "garden_changes_handler.handler", True),
+    ("GET", "/gardens/upload-url", "upload_url_handler.handler", True),
+    ("POST", "/gardens/upload-urls", "upload_url_handler.batch_handler", True),
+    ("GET", "/geocode", "geocode_handler.handler", True),
+    ("POST", "/uploads", "upload_sessions_handler.create", True),
+    ("GET", "/uploads/{uploadId}", "upload_sessions_handler.status", True),
+    ("POST", "/uploads/{uploadId}/complete", "upload_sessions_handler.complete", True),
+    ("DELETE", "/uploads/{uploadId}", "upload_sessions_handler.abort", True),
+    ("GET", "/gardens/{gardenId}", "get_garden_handler.handler", True),
+    ("PUT", "/gardens/{gardenId}", "update_garden_handler.handler", True),
+    ("DELETE", "/gardens/{gardenId}", "delete_garden_handler.handler", True),
+]
+
+_TEMPLATE_PARAM = re.compile(r"\{(\w+)\}")
+
+
+class Route:
+    def __init__(self, method, template, target, auth_required):
+        self.method = method
+        self.template = template
+        self.target = target
+        self.auth_required = auth_required
+        self.pattern = None
+        if _TEMPLATE_PARAM.search(template):
+            regex = _TEMPLATE_PARAM.sub(lambda m: f"(?P<{m.group(1)}>[^/]+)", template)
+            self.pattern = re.compile(f"^{regex}$")
+        self._func = None
+
+    def resolve(self):
+        """Import the handler on first use; authenticated routes get the undecorated function."""
+        if self._func is None:
+            module_name, func_name = self.target.rsplit(".", 1)
+            started = time.perf_counter()
+            func = getattr(importlib.import_module(module_name), func_name)
+            print(f"Route {self.method} {self.template}: imported {module_name} in {round((time.perf_counter() - started) * 1000, 1)} ms")
+            if self.auth_required:
+                func = getattr(func, "__wrapped__", func)
+            self._func = func
+        return self._func
+
+
+def compile_routes(routes):
+    """
+    Precompile the route table into an exact-match dict for static paths
+    and a list of regex routes for templated paths.
+    """
+    static = {}
+    templated = []
+    for method, template, target, auth_required in routes:
+        route = Route(method, template, target, auth_required)
+        if route.pattern is None:
+            static[(method, template)] = route
+        else:
+            templated.append(route)
+    static_paths = {template for _, template in static}
+    return static, templated, static_paths
+
+
+_STATIC_ROUTES, _TEMPLATED_ROUTES, _STATIC_PATHS = compile_routes(ROUTES)
+
+
+def get_method_and_path(event):
+    """Read the HTTP method and stage-less path from an API Gateway v1 or v2 event."""
+    request_context = event.get("requestContext") or {}
+    http = request_context.get("http") or {}
+
+    method = (http.get("method") or event.get("httpMethod") or "").upper()
+    path = event.get("rawPath") or http.get("path") or event.get("path") or "/"
+
+    # HTTP API (v2) paths include the stage unless it is $default
+    stage = request_context.get("stage")
+    if http and stage and stage != "$default" and path.startswith(f"/{stage}/"):
+        path = path[len(stage) + 1:]
+
+    if len(path) > 1:
+        path = path.rstrip("/")
+    return method, path
+
+
+def match_route(method, path):
+    """
+    Return (route, path_params) for a request, or (None, status) where status
+    is 404 for an unknown path and 405 for a known path with the wrong method.
+    """
+    route = _STATIC_ROUTES.get((method, path))
+    if route is not None:
+        return route, {}
+
+    path_known = path in _STATIC_PATHS
+    for route in _TEMPLATED_ROUTES:
+        match = route.pattern.match(path)
+        if match is None:
+            continue
+        if route.method == method:
+            return route, match.groupdict()
+        path_known = True
+
+    return None, 405 if path_known else 404
+
+
+def handler(event, context):
+    """Single entry point serving every API route from one warm function"""
+    try:
+        decode_request_body(event)
+    except (ValueError, UnicodeDecodeError):
+        return compress_response(event, respond(400, {"message": "Request body must be UTF-8 text"}))
+
+    # gzip/br per Accept-Encoding for every route, in one place
+    return compress_response(event, dispatch(event, context))
+
+
+def dispatch(event, context):
+    """Route one request to its handler and return the handler's response"""
+    method, path = get_method_and_path(event)
+
+    # Handle CORS preflight for every route
+    if method == "OPTIONS":
+        return respond(200, {"message": "CORS preflight"})
+
+    route, params = match_route(method, path)
+    if route is None:
+        if params == 405:
+            return respond(405, {"message": "Method not allowed"})
+        return respond(404, {"message": "Not found"})
+
+    # Normalise the event so handlers written for either event version work
+    event["httpMethod"] = method
+    event["pathParameters"] = dict(event.get("pathParameters") or {}, **params)
+
+    if route.auth_required:
+        user_id, error = get_user_id_from_token(event)
+        if error:
+            return respond(401, {"message": f"Authentication required: {error}"})
+        event["user_id"] = user_id
+
+    func = route.resolve()
+    known_clients = set(aws_clients.init_timings)
+    response = func(event, context)
+
+    # Report which AWS clients this route had to initialise (cold-start cost)
+    new_clients = {key: ms for key, ms in aws_clients.init_timings.items() if key not in known_clients}
+    if new_clients:
+        print(f"Route {route.method} {route.template}: AWS client init {new_clients}")
+    return response
@@ -0,0 +1,65 @@
+import aws_clients
+import os
+from botocore.exceptions import ClientError
+from batch_ops import batch_get_items
+from fieldsets import parse_fields, projection_kwargs
+from garden_search import DEFAULT_SEARCH_RESULTS, MAX_SEARCH_RESULTS, search_garden_ids
+from image_urls import sign_gardens
+from simple_auth import require_auth, respond
+
+dynamodb = aws_clients.lazy_resource('dynamodb')
+table_name = os.environ['GARDENS_TABLE']
+
+def _parse_limit(value):
+    if value is None or value == '':
+        return DEFAULT_SEARCH_RESULTS
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1 or limit > MAX_SEARCH_RESULTS:
+        raise ValueError(f"limit must be between 1 and {MAX_SEARCH_RESULTS}")
+    return limit
+
+@require_auth
+def handler(event, context):
+    try:
+        # Get authenticated user ID from the decorator
+        user_id = event['user_id']
+
+        query_params = event.get('queryStringParameters') or {}
+        text = (query_params.get('q') or '').strip()
+        if not text:
+            return respond(400, {"message": "q parameter is required"})
+        limit = _parse_limit(query_params.get('limit'))
+
+        # Optional ?fields=card|detail|a,b,c, as on GET /gardens
+        fields = parse_fields(query_params.get('fields'))
+
+        # Rank from the inverted index, then fetch only the gardens we return
+        ranked = search_garden_ids(user_id, text)
+        top_ids = [garden_id for garden_id, _ in ranked[:limit]]
+        keys = [{'userId': user_id, 'gardenId': garden_id} for garden_id in top_ids]
+        items, unprocessed = batch_get_items(dynamodb, table_name, keys, projection_kwargs(fields))
+        if unprocessed:
+            print(f"BatchGetItem left {len(unprocessed)} keys unprocessed for user {user_id}")
+            return respond(503, {"message": "Database is busy, please retry"})
+
+        # Postings can briefly outlive a deleted garden; those are skipped
+        gardens_by_id = {item['gardenId']: item for item in items}
+        gardens = [gardens_by_id[garden_id] for garden_id in top_ids if garden_id in gardens_by_id]
+
+        return respond(200, {
+            "gardens": sign_gardens(gardens),
+            "count": len(gardens),
+            "totalMatches": len(ranked)
+        })
+
+    except ValueError as e:
+        return respond(400, {"message": str(e)})
+    except ClientError as e:
+        print(f"DynamoDB error: {e}")
+        return respond(500, {"message": "Database error occurred"})
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return respond(500, {"message": "Internal server error"})
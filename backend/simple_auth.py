@@ -1,24 +1,9 @@
-import json
-import boto3
-import os
-from botocore.exceptions import ClientError
-
-def cors_headers():
-    return {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE",
-        "Access-Control-Allow-Headers": "Content-Type,Authorization"
-    }
-
-def respond(status, body):
-    return {
-        "statusCode": status,
-        "headers": cors_headers(),
-        "body": json.dumps(body)
-    }
+import functools
+from responses import respond
+from token_verifier import verify_token
 
 def get_user_id_from_token(event):
-    """Extract user ID from Authorization header - simplified version"""
+    """Extract and verify user ID from Authorization header"""
     try:
         # Get Authorization header
         headers = event.get('headers', {})
@@ -27,48 +12,29 @@ def get_user_id_from_token(event):
         if not auth_header:
             return None, "No authorization header found"
         
-        # For now, we'll use a simple approach
-        # In a real implementation, you'd verify the JWT token
-        # For this demo, we'll extract user info from the token
-        
-        # Remove 'Bearer ' prefix if present
-        if auth_header.startswith('Bearer '):
-            token = auth_header[7:]
-        else:
-            token = auth_header
-        
-        # For now, we'll use a simple mapping or extract from token
-        # This is a temporary solution until JWT verification is properly set up
+        # Verify JWT signature, issuer and expiry against the Cognito JWKS
+        claims, error = verify_token(auth_header)
+        if error:
+            return None, error
         
-        # Try to decode the token as base64 to get user info
-        import base64
-        try:
-            # JWT tokens have 3 parts separated by dots
-            parts = token.split('.')
-            if len(parts) == 3:
-                # Decode the payload (second part)
-                payload = parts[1]
-                # Add padding if needed
-                payload += '=' * (4 - len(payload) % 4)
-                decoded = base64.urlsafe_b64decode(payload)
-                payload_data = json.loads(decoded)
-                
-                # Extract user ID from the token payload
-                user_id = payload_data.get('sub')  # 'sub' is the user ID in Cognito tokens
-                if user_id:
-                    return user_id, None
-        except:
-            pass
+        # Extract user ID from the verified claims
+        user_id = claims.get('sub')  # 'sub' is the user ID in Cognito tokens
+        if not user_id:
+            return None, "No user ID found in token"
         
-        # If we can't decode the token, return an error
-        return None, "Invalid token format"
+        return user_id, None
         
     except Exception as e:
         print(f"Error extracting user ID: {e}")
         return None, "Authentication failed"
 
 def require_auth(handler_func):
-    """Decorator to require authentication for Lambda handlers - simplified version"""
+    """
+    Decorator to require authentication for Lambda handlers.
+    The undecorated function stays reachable as `__wrapped__` for callers
+    (such as router.py) that authenticate the request themselves.
+    """
+    @functools.wraps(handler_func)
     def wrapper(event, context):
         # Handle CORS preflight
         if event.get("httpMethod") == "OPTIONS":
@@ -0,0 +1,86 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Upper bound on verified tokens kept per warm container
+TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get('TOKEN_CACHE_MAX_ENTRIES', '1024'))
+
+# Log hit/miss counters every N lookups (0 disables)
+TOKEN_CACHE_LOG_EVERY = int(os.environ.get('TOKEN_CACHE_LOG_EVERY', '100'))
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verification results for bearer tokens.
+    Entries are keyed by a SHA-256 hash of the raw token (the token itself
+    is never stored) and expire at the token's `exp` claim.
+    """
+
+    def __init__(self, name, max_entries=TOKEN_CACHE_MAX_ENTRIES, log_every=TOKEN_CACHE_LOG_EVERY):
+        self.name = name
+        self.max_entries = max_entries
+        self.log_every = log_every
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token):
+        """Return the cached value for a token, or None if absent or expired."""
+        key = self._key(token)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                value = entry[1]
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                value = None
+            lookups = self.hits + self.misses
+
+        if self.log_every and lookups % self.log_every == 0:
+            print(f"Token cache stats ({self.name}): {self.stats()}")
+
+        return value
+
+    def put(self, token, value, expires_at):
+        """Cache a verification result until `expires_at` (epoch seconds)."""
+        if not expires_at or expires_at <= time.time() or self.max_entries <= 0:
+            return
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (float(expires_at), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters for logging and diagnostics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
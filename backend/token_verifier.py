@@ -0,0 +1,108 @@
+import os
+
+import requests
+from jose import jwt, jwk
+from jose.exceptions import ExpiredSignatureError, JWTError, JWKError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from jwks_store import JwksKeyStore
+from token_cache import VerifiedTokenCache
+
+# Get configuration from environment variables
+cognito_user_pool_id = os.environ.get('COGNITO_USER_POOL_ID', 'eu-north-1_i7vhr8PxH')
+cognito_region = os.environ.get('COGNITO_REGION', 'eu-north-1')
+client_id = os.environ.get('CLIENT_ID')
+
+# Local JWKS snapshot so a cold container can verify without a network call
+JWKS_SNAPSHOT_PATH = os.environ.get('JWKS_SNAPSHOT_PATH', '/tmp/florify-jwks.json')
+
+# Hermetic test mode: read keys from a local JWKS stub instead of Cognito
+AUTH_TEST_MODE = os.environ.get('AUTH_TEST_MODE', '').lower() in ('1', 'true', 'yes')
+AUTH_JWKS_STUB_PATH = os.environ.get('AUTH_JWKS_STUB_PATH', '')
+
+expected_issuer = f"https://cognito-idp.{cognito_region}.amazonaws.com/{cognito_user_pool_id}"
+
+
+def _build_http_session():
+    """Pooled HTTP session reused for every JWKS fetch in this container"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=4,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(500, 502, 503, 504))
+    )
+    session.mount('https://', adapter)
+    return session
+
+
+def _build_key_store():
+    if AUTH_TEST_MODE:
+        if not AUTH_JWKS_STUB_PATH:
+            print("AUTH_TEST_MODE is set but AUTH_JWKS_STUB_PATH is empty")
+        return JwksKeyStore('verifier-stub', f"file://{AUTH_JWKS_STUB_PATH}", jwk.construct)
+
+    return JwksKeyStore(
+        'verifier',
+        f"{expected_issuer}/.well-known/jwks.json",
+        jwk.construct,
+        session=_build_http_session(),
+        snapshot_path=JWKS_SNAPSHOT_PATH
+    )
+
+
+key_store = _build_key_store()
+verified_tokens = VerifiedTokenCache('verifier')
+
+
+def get_jwks():
+    """Return the Cognito JWKS document currently used for verification"""
+    return key_store.get_jwks()
+
+
+def verify_token(token):
+    """
+    Verify a Cognito JWT (with or without the 'Bearer ' prefix).
+    Returns (claims, None) on success or (None, error_message) on failure.
+    """
+    if not token:
+        return None, "No token provided"
+
+    if token.startswith('Bearer '):
+        token = token[7:]
+
+    # Skip signature verification for tokens already verified in this container
+    cached_claims = verified_tokens.get(token)
+    if cached_claims is not None:
+        return cached_claims, None
+
+    try:
+        # Decode token header to get key ID
+        kid = jwt.get_unverified_header(token).get('kid')
+        if not kid:
+            return None, "Invalid token format"
+
+        public_key = key_store.get_key(kid)
+        if public_key is None:
+            return None, "Invalid token key"
+
+        # Cognito access tokens carry no aud claim; jose only checks it when present
+        claims = jwt.decode(
+            token,
+            public_key,
+            algorithms=['RS256'],
+            audience=client_id,
+            issuer=expected_issuer,
+            options={"verify_aud": bool(client_id)}
+        )
+
+    except ExpiredSignatureError:
+        return None, "Token has expired"
+    except (JWTError, JWKError) as e:
+        return None, f"Invalid token: {str(e)}"
+    except Exception as e:
+        print(f"Unexpected error during token verification: {str(e)}")
+        return None, "Token verification failed"
+
+    verified_tokens.put(token, claims, claims.get('exp'))
+    return claims, None
@@ -0,0 +1,259 @@
+"""
+Local harness for the WebSocket push channel: gardens are written to an
+in-memory table whose changes an in-process DynamoDB Streams stand-in
+delivers, in batches, to the stream consumers; connections and the API
+Gateway management API are held in memory too.
+
+Run from the backend directory:
+    python tools/push_harness.py [--batch-size 100] [--consumer garden_push.handler]
+It plays a short scenario (two users, several connections, coalesced
+writes, a delete, a dropped connection, a $disconnect) and exits non-zero
+if any client saw the wrong messages. Passing --consumer garden_stream.handler
+runs the full stream fan-out instead, which also writes the search index
+and tombstones (so it needs DynamoDB Local or real tables).
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from boto3.dynamodb.types import TypeSerializer
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GARDENS_TABLE', 'florify-gardens-dev')
+os.environ.setdefault('CURSOR_SIGNING_SECRET', 'push-harness')
+
+import garden_push
+import garden_push_handler
+
+serializer = TypeSerializer()
+
+
+def _serialize(item):
+    return {key: serializer.serialize(value) for key, value in item.items()}
+
+
+class StreamStandIn:
+    """
+    Collects NEW_AND_OLD_IMAGES records in write order and hands them to
+    consumers in batches, as the Lambda event source mapping would. A batch
+    whose consumer raises is delivered again, up to `max_attempts` times.
+    """
+
+    def __init__(self, batch_size=100, max_attempts=3):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.pending = []
+        self.sequence = 0
+
+    def emit(self, event_name, keys, old_image=None, new_image=None):
+        self.sequence += 1
+        data = {
+            "Keys": _serialize(keys),
+            "SequenceNumber": str(self.sequence).zfill(21),
+            "ApproximateCreationDateTime": int(time.time()),
+            "StreamViewType": "NEW_AND_OLD_IMAGES"
+        }
+        if old_image is not None:
+            data["OldImage"] = _serialize(old_image)
+        if new_image is not None:
+            data["NewImage"] = _serialize(new_image)
+        self.pending.append({"eventName": event_name, "eventSource": "aws:dynamodb", "dynamodb": data})
+
+    def drain(self, consumer):
+        """Deliver every pending record; returns the consumers' results per batch."""
+        results = []
+        while self.pending:
+            batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    results.append(consumer({"Records": batch}, None))
+                    break
+                except Exception as e:
+                    print(f"  stream batch failed (attempt {attempt}): {e!r}")
+            else:
+                print(f"  stream batch of {len(batch)} records dropped")
+        return results
+
+
+class GardenTable:
+    """The gardens table, reduced to the writes the API makes, feeding a stream."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.items = {}
+
+    def put(self, user_id, garden_id, **attributes):
+        now = datetime.utcnow().isoformat()
+        key = {"userId": user_id, "gardenId": garden_id}
+        item = dict(key, createdAt=now, updatedAt=now, version=Decimal(1), **attributes)
+        self.items[(user_id, garden_id)] = item
+        self.stream.emit("INSERT", key, new_image=item)
+
+    def update(self, user_id, garden_id, **attributes):
+        old = self.items[(user_id, garden_id)]
+        new = dict(old, updatedAt=datetime.utcnow().isoformat(), version=old["version"] + 1, **attributes)
+        self.items[(user_id, garden_id)] = new
+        self.stream.emit("MODIFY", {"userId": user_id, "gardenId": garden_id}, old_image=old, new_image=new)
+
+    def delete(self, user_id, garden_id):
+        old = self.items.pop((user_id, garden_id))
+        self.stream.emit("REMOVE", {"userId": user_id, "gardenId": garden_id}, old_image=old)
+
+
+class ConnectionsTable:
+    """In-memory florify-garden-connections-dev with its userId-index."""
+
+    def __init__(self):
+        self.items = {}
+
+    def put_item(self, Item):
+        self.items[Item["connectionId"]] = dict(Item)
+
+    def delete_item(self, Key):
+        self.items.pop(Key["connectionId"], None)
+
+    def query(self, IndexName, KeyConditionExpression, ExpressionAttributeValues, **kwargs):
+        user_id = ExpressionAttributeValues[":userId"]
+        return {"Items": [
+            {"connectionId": item["connectionId"], "userId": item["userId"]}
+            for item in self.items.values() if item["userId"] == user_id
+        ]}
+
+
+class ManagementApi:
+    """post_to_connection into per-connection inboxes; closed connections are Gone."""
+
+    def __init__(self):
+        self.inboxes = {}
+        self.closed = set()
+
+    def open(self, connection_id):
+        self.inboxes[connection_id] = []
+
+    def close(self, connection_id):
+        self.closed.add(connection_id)
+
+    def post_to_connection(self, ConnectionId, Data):
+        if ConnectionId not in self.inboxes or ConnectionId in self.closed:
+            raise ClientError({"Error": {"Code": "GoneException", "Message": "Gone"}}, "PostToConnection")
+        self.inboxes[ConnectionId].append(json.loads(Data))
+
+    def take(self, connection_id):
+        messages, self.inboxes[connection_id] = self.inboxes[connection_id], []
+        return messages
+
+
+class Harness:
+    def __init__(self, consumer, batch_size):
+        self.consumer = consumer
+        self.stream = StreamStandIn(batch_size)
+        self.gardens = GardenTable(self.stream)
+        self.connections = ConnectionsTable()
+        self.api = ManagementApi()
+        self.failures = []
+
+        garden_push.connections_table = self.connections
+        garden_push.management_client = lambda: self.api
+        garden_push.PUSH_ENDPOINT = 'http://push-harness.local'
+
+    def connect(self, connection_id, user_id):
+        # $connect minus the token check, which needs a real Cognito token
+        self.api.open(connection_id)
+        garden_push.register_connection(connection_id, user_id)
+
+    def disconnect(self, connection_id):
+        garden_push_handler.handler(
+            {"requestContext": {"routeKey": "$disconnect", "connectionId": connection_id}}, None
+        )
+
+    def deliver(self):
+        for result in self.stream.drain(self.consumer):
+            print(f"  consumer: {result}")
+
+    def expect(self, connection_id, expected):
+        """
+        `expected`: the (gardenId, op, version) changes received, in order.
+        Messages are flattened, since how they split depends on batching.
+        """
+        received = [
+            (change["gardenId"], change["op"], change["version"])
+            for message in self.api.take(connection_id) for change in message["changes"]
+        ]
+        status = "ok" if received == expected else "FAILED"
+        print(f"  {connection_id}: {received} {status}")
+        if received != expected:
+            self.failures.append(f"{connection_id}: expected {expected}, got {received}")
+
+    def expect_registered(self, connection_id, registered):
+        if (connection_id in self.connections.items) != registered:
+            state = "registered" if registered else "forgotten"
+            print(f"  {connection_id} should be {state} FAILED")
+            self.failures.append(f"{connection_id} should be {state}")
+
+
+def run_scenario(harness):
+    print("1. Writes reach every connection of their owner, and only theirs")
+    harness.connect('alice-laptop', 'alice')
+    harness.connect('alice-phone', 'alice')
+    harness.connect('bob-laptop', 'bob')
+    harness.gardens.put('alice', 'rose-bed', name='Rose bed')
+    harness.gardens.put('alice', 'herbs', name='Herbs')
+    harness.gardens.put('bob', 'veg', name='Vegetables')
+    harness.deliver()
+    alice_created = [('rose-bed', 'upsert', 1), ('herbs', 'upsert', 1)]
+    harness.expect('alice-laptop', alice_created)
+    harness.expect('alice-phone', alice_created)
+    harness.expect('bob-laptop', [('veg', 'upsert', 1)])
+
+    print("2. Several writes to one garden in a batch become one change")
+    harness.gardens.update('alice', 'rose-bed', plantCount=Decimal(12))
+    harness.gardens.update('alice', 'rose-bed', status='active')
+    harness.gardens.delete('alice', 'herbs')
+    harness.deliver()
+    harness.expect('alice-laptop', [('rose-bed', 'upsert', 3), ('herbs', 'delete', 1)])
+    harness.expect('alice-phone', [('rose-bed', 'upsert', 3), ('herbs', 'delete', 1)])
+    harness.expect('bob-laptop', [])
+
+    print("3. A connection dropped without $disconnect is forgotten on the next push")
+    harness.api.close('alice-phone')
+    harness.gardens.update('alice', 'rose-bed', name='Roses')
+    harness.deliver()
+    harness.expect('alice-laptop', [('rose-bed', 'upsert', 4)])
+    harness.expect_registered('alice-phone', False)
+
+    print("4. $disconnect stops delivery")
+    harness.disconnect('bob-laptop')
+    harness.gardens.update('bob', 'veg', name='Veg patch')
+    harness.deliver()
+    harness.expect('bob-laptop', [])
+    harness.expect_registered('bob-laptop', False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--batch-size', type=int, default=100, help='stream records per consumer invocation (2 or more, or the two updates in step 2 are not coalesced)')
+    parser.add_argument('--consumer', default='garden_push.handler', help='module.function receiving stream batches')
+    args = parser.parse_args()
+
+    module_name, func_name = args.consumer.rsplit('.', 1)
+    consumer = getattr(importlib.import_module(module_name), func_name)
+
+    harness = Harness(consumer, args.batch_size)
+    run_scenario(harness)
+
+    if harness.failures:
+        print(f"\n{len(harness.failures)} check(s) failed:")
+        for failure in harness.failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nAll push checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Local stand-in for Redis: speaks enough of the Redis protocol (RESP2) for
+garden_cache.RedisCacheBackend, with in-memory storage and lazy expiry.
+
+Run from the backend directory:
+    python tools/resp_server.py --port 6390
+then start the API with
+    GARDEN_CACHE_BACKEND=redis REDIS_URL=redis://127.0.0.1:6390/0
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+_store = {}
+_lock = threading.Lock()
+
+
+def _live(key):
+    entry = _store.get(key)
+    if entry is None:
+        return None
+    value, expires_at = entry
+    if expires_at is not None and expires_at <= time.time():
+        del _store[key]
+        return None
+    return value
+
+
+def _set(args):
+    key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+    expires_at = None
+    if b'EX' in options:
+        expires_at = time.time() + int(args[2 + options.index(b'EX') + 1])
+    if b'PX' in options:
+        expires_at = time.time() + int(args[2 + options.index(b'PX') + 1]) / 1000
+    with _lock:
+        exists = _live(key) is not None
+        if (b'NX' in options and exists) or (b'XX' in options and not exists):
+            return None
+        _store[key] = (value, expires_at)
+    return 'OK'
+
+
+def _get(args):
+    with _lock:
+        return _live(args[0])
+
+
+def _delete(args):
+    with _lock:
+        removed = 0
+        for key in args:
+            if _live(key) is not None:
+                del _store[key]
+                removed += 1
+    return removed
+
+
+def _exists(args):
+    with _lock:
+        return sum(1 for key in args if _live(key) is not None)
+
+
+def _flush(args):
+    with _lock:
+        _store.clear()
+    return 'OK'
+
+
+COMMANDS = {
+    b'PING': lambda args: 'PONG',
+    b'AUTH': lambda args: 'OK',
+    b'SELECT': lambda args: 'OK',
+    b'GET': _get,
+    b'SET': _set,
+    b'DEL': _delete,
+    b'EXISTS': _exists,
+    b'FLUSHDB': _flush,
+}
+
+
+def encode_reply(value):
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, str):
+        return b'+%s\r\n' % value.encode('utf-8')
+    if isinstance(value, int):
+        return b':%d\r\n' % value
+    if isinstance(value, Exception):
+        return b'-ERR %s\r\n' % str(value).encode('utf-8')
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            # Inline command, e.g. typed into `nc`
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            if not args:
+                continue
+            command = COMMANDS.get(args[0].upper())
+            try:
+                if command is None:
+                    raise ValueError(f"unknown command '{args[0].decode('utf-8', 'replace')}'")
+                reply = command(args[1:])
+            except (ValueError, IndexError) as e:
+                reply = e
+            self.wfile.write(encode_reply(reply))
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6390)
+    args = parser.parse_args()
+
+    with RespServer((args.host, args.port), RespHandler) as server:
+        print(f"Redis stand-in listening on {args.host}:{args.port}")
+        server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+"""
+Local stand-in for S3: path-style PUT/GET/HEAD/DELETE, CopyObject,
+multipart uploads, ListObjectsV2, DeleteObjects and browser POST uploads
+(presigned POST forms), with in-memory storage and S3-style ObjectCreated
+notifications.
+
+Run from the backend directory:
+    python tools/s3_server.py --port 9000 --notify image_processor.handler
+then point boto3 and the public URLs at it:
+    AWS_ENDPOINT_URL_S3=http://127.0.0.1:9000
+    IMAGE_PUBLIC_BASE_URL=http://127.0.0.1:9000/florify-garden-images
+Signatures are not checked. --notify imports the handler in this process
+and calls it for every object created, as the S3 event trigger would; it
+needs GARDENS_TABLE (and e.g. AWS_ENDPOINT_URL_DYNAMODB for DynamoDB Local).
+"""
+import argparse
+import hashlib
+import importlib
+import os
+import sys
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (bucket, key) -> {"body", "etag", "contentType", "cacheControl", "metadata", "modified"}
+_objects = {}
+_lock = threading.Lock()
+
+# uploadId -> {"bucket", "key", "contentType", "parts": {number: body}}
+_multipart = {}
+
+_notify = None
+
+
+def _store(bucket, key, body, content_type, cache_control, metadata):
+    entry = {
+        "body": body,
+        "etag": '"%s"' % hashlib.md5(body).hexdigest(),
+        "contentType": content_type or 'binary/octet-stream',
+        "cacheControl": cache_control,
+        "metadata": metadata,
+        "modified": time.time()
+    }
+    with _lock:
+        _objects[(bucket, key)] = entry
+    if _notify is not None:
+        threading.Thread(target=_notify_created, args=(bucket, key, entry), daemon=True).start()
+    return entry
+
+
+def _notify_created(bucket, key, entry):
+    event = {"Records": [{
+        "eventSource": "aws:s3",
+        "eventName": "ObjectCreated:Put",
+        "s3": {
+            "bucket": {"name": bucket},
+            "object": {"key": quote(key), "size": len(entry["body"]), "eTag": entry["etag"].strip('"')}
+        }
+    }]}
+    try:
+        print(f"notify {key}: {_notify(event, None)}")
+    except Exception as e:
+        print(f"notify {key} failed: {e!r}")
+
+
+def _decode_aws_chunked(body):
+    """Strip aws-chunked framing ("<hex size>;chunk-signature=...\\r\\n<data>\\r\\n")."""
+    data, position = b'', 0
+    while position < len(body):
+        line_end = body.index(b'\r\n', position)
+        size = int(body[position:line_end].split(b';')[0], 16)
+        if size == 0:
+            break
+        data += body[line_end + 2:line_end + 2 + size]
+        position = line_end + 2 + size + 2
+    return data
+
+
+class S3Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _target(self):
+        parts = urlsplit(self.path)
+        bucket, _, key = parts.path.lstrip('/').partition('/')
+        return unquote(bucket), unquote(key), parse_qs(parts.query, keep_blank_values=True)
+
+    def _body(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if 'aws-chunked' in (self.headers.get('Content-Encoding') or '') or \
+                (self.headers.get('x-amz-content-sha256') or '').startswith('STREAMING-'):
+            body = _decode_aws_chunked(body)
+        return body
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _xml(self, status, xml):
+        self._send(status, ('<?xml version="1.0" encoding="UTF-8"?>' + xml).encode('utf-8'),
+                   {'Content-Type': 'application/xml'})
+
+    def _error(self, status, code, message):
+        self._xml(status, f"<Error><Code>{code}</Code><Message>{escape(message)}</Message></Error>")
+
+    def do_PUT(self):
+        bucket, key, query = self._target()
+        if not key:
+            return self._send(200)  # CreateBucket: buckets exist implicitly
+        if 'uploadId' in query:
+            return self._upload_part(query)
+        if self.headers.get('x-amz-copy-source'):
+            return self._copy(bucket, key)
+        metadata = {
+            name[len('x-amz-meta-'):].lower(): value
+            for name, value in self.headers.items() if name.lower().startswith('x-amz-meta-')
+        }
+        entry = _store(bucket, key, self._body(), self.headers.get('Content-Type'),
+                       self.headers.get('Cache-Control'), metadata)
+        self._send(200, headers={'ETag': entry["etag"]})
+
+    def _upload_part(self, query):
+        upload = _multipart.get(query['uploadId'][0])
+        if upload is None:
+            return self._error(404, 'NoSuchUpload', 'The specified upload does not exist.')
+        body = self._body()
+        upload["parts"][int(query['partNumber'][0])] = body
+        self._send(200, headers={'ETag': '"%s"' % hashlib.md5(body).hexdigest()})
+
+    def _copy(self, bucket, key):
+        source_bucket, _, source_key = unquote(self.headers['x-amz-copy-source']).lstrip('/').partition('/')
+        with _lock:
+            source = _objects.get((source_bucket, source_key))
+        if source is None:
+            return self._error(404, 'NoSuchKey', 'The specified key does not exist.')
+        self._body()
+        replace = self.headers.get('x-amz-metadata-directive') == 'REPLACE'
+        entry = _store(
+            bucket, key, source["body"],
+            self.headers.get('Content-Type') if replace else source["contentType"],
+            self.headers.get('Cache-Control') if replace else source["cacheControl"],
+            {} if replace else source["metadata"]
+        )
+        self._xml(200, f"<CopyObjectResult><ETag>{escape(entry['etag'])}</ETag></CopyObjectResult>")
+
+    def do_POST(self):
+        bucket, key, query = self._target()
+        if 'delete' in query:
+            return self._delete_objects(bucket)
+        if 'uploads' in query:
+            self._body()
+            upload_id = uuid.uuid4().hex
+            _multipart[upload_id] = {"bucket": bucket, "key": key, "contentType": self.headers.get('Content-Type'), "parts": {}}
+            return self._xml(200, f"<InitiateMultipartUploadResult><Bucket>{escape(bucket)}</Bucket>"
+                                  f"<Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>")
+        if 'uploadId' in query:
+            self._body()
+            upload = _multipart.pop(query['uploadId'][0], None)
+            if upload is None:
+                return self._error(404, 'NoSuchUpload', 'The specified upload does not exist.')
+            body = b''.join(upload["parts"][number] for number in sorted(upload["parts"]))
+            entry = _store(bucket, key, body, upload["contentType"], None, {})
+            return self._xml(200, f"<CompleteMultipartUploadResult><Bucket>{escape(bucket)}</Bucket>"
+                                  f"<Key>{escape(key)}</Key><ETag>{escape(entry['etag'])}</ETag></CompleteMultipartUploadResult>")
+        if key:
+            return self._error(501, 'NotImplemented', 'Only form uploads are supported')
+
+        # Browser upload of a presigned POST form; the file is the last field
+        content_type = self.headers.get('Content-Type', '')
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + self._body()
+        )
+        fields, file_body = {}, None
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            if name == 'file':
+                file_body = part.get_payload(decode=True) or b''
+            else:
+                fields[name.lower()] = part.get_content().strip()
+        if file_body is None or 'key' not in fields:
+            return self._error(400, 'InvalidArgument', 'Form must include key and file')
+
+        metadata = {name[len('x-amz-meta-'):]: value for name, value in fields.items() if name.startswith('x-amz-meta-')}
+        entry = _store(bucket, fields['key'], file_body, fields.get('content-type'), None, metadata)
+        self._send(204, headers={'ETag': entry["etag"], 'Location': f"/{bucket}/{quote(fields['key'])}"})
+
+    def _delete_objects(self, bucket):
+        request = ElementTree.fromstring(self._body())
+        deleted = []
+        for element in request.iter():
+            if element.tag.endswith('Key'):
+                with _lock:
+                    _objects.pop((bucket, element.text), None)
+                deleted.append(element.text)
+        self._xml(200, "<DeleteResult>" + "".join(
+            f"<Deleted><Key>{escape(key)}</Key></Deleted>" for key in deleted
+        ) + "</DeleteResult>")
+
+    def do_GET(self):
+        bucket, key, query = self._target()
+        if not key:
+            return self._list(bucket, query)
+        if 'uploadId' in query:
+            return self._list_parts(query)
+        with _lock:
+            entry = _objects.get((bucket, key))
+        if entry is None:
+            return self._error(404, 'NoSuchKey', 'The specified key does not exist.')
+        headers = {
+            'ETag': entry["etag"],
+            'Content-Type': entry["contentType"],
+            'Last-Modified': formatdate(entry["modified"], usegmt=True)
+        }
+        if entry["cacheControl"]:
+            headers['Cache-Control'] = entry["cacheControl"]
+        for name, value in entry["metadata"].items():
+            headers[f'x-amz-meta-{name}'] = value
+        self._send(200, entry["body"], headers)
+
+    do_HEAD = do_GET
+
+    def _list(self, bucket, query):
+        prefix = query.get('prefix', [''])[0]
+        with _lock:
+            keys = sorted(key for (owner, key) in _objects if owner == bucket and key.startswith(prefix))
+            contents = "".join(
+                f"<Contents><Key>{escape(key)}</Key><ETag>{escape(_objects[(bucket, key)]['etag'])}</ETag>"
+                f"<Size>{len(_objects[(bucket, key)]['body'])}</Size></Contents>"
+                for key in keys
+            )
+        self._xml(200, f"<ListBucketResult><Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix>"
+                       f"<KeyCount>{len(keys)}</KeyCount><IsTruncated>false</IsTruncated>{contents}</ListBucketResult>")
+
+    def _list_parts(self, query):
+        upload = _multipart.get(query['uploadId'][0])
+        if upload is None:
+            return self._error(404, 'NoSuchUpload', 'The specified upload does not exist.')
+        parts = "".join(
+            f"<Part><PartNumber>{number}</PartNumber><ETag>\"{hashlib.md5(body).hexdigest()}\"</ETag>"
+            f"<Size>{len(body)}</Size></Part>"
+            for number, body in sorted(upload["parts"].items())
+        )
+        self._xml(200, f"<ListPartsResult><UploadId>{query['uploadId'][0]}</UploadId>"
+                       f"<IsTruncated>false</IsTruncated>{parts}</ListPartsResult>")
+
+    def do_DELETE(self):
+        bucket, key, query = self._target()
+        if 'uploadId' in query:
+            if _multipart.pop(query['uploadId'][0], None) is None:
+                return self._error(404, 'NoSuchUpload', 'The specified upload does not exist.')
+            return self._send(204)
+        with _lock:
+            _objects.pop((bucket, key), None)
+        self._send(204)
+
+
+def main():
+    global _notify
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--notify', help='module.function called with an S3 event for every object created')
+    args = parser.parse_args()
+
+    if args.notify:
+        module_name, func_name = args.notify.rsplit('.', 1)
+        _notify = getattr(importlib.import_module(module_name), func_name)
+
+    with ThreadingHTTPServer((args.host, args.port), S3Handler) as server:
+        print(f"S3 stand-in listening on http://{args.host}:{args.port}")
+        server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,78 +1,254 @@
 import json
-import boto3
+import aws_clients
 import os
 from datetime import datetime
+from boto3.dynamodb.types import TypeDeserializer
 from botocore.exceptions import ClientError
+from etags import item_etag, item_matches_etag, parse_item_etag
+from garden_cache import garden_cache
+from garden_records import (
+    OPTIONAL_TEXT_FIELDS, REQUIRED_TEXT_FIELDS, coordinate_fields, image_fields, text_field_error
+)
+from garden_summary import ConcurrentModification, TRANSACT_ATTEMPTS, is_cancelled, serialize, summary_update
+from image_urls import sign_garden
+from responses import get_header
 from simple_auth import require_auth, respond
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['GARDENS_TABLE'])
+table = aws_clients.lazy_table(os.environ['GARDENS_TABLE'])
+deserializer = TypeDeserializer()
+
+# Body attributes a client may change, mapped to their placeholders
+UPDATABLE_FIELDS = {
+    "name": "#name",
+    "location": "#location",
+    "description": "#description",
+    "plantCount": "#plantCount"
+}
+
+# Derived from location (or lat/lon in the body) by the server, never set directly
+COORDINATE_FIELDS = {
+    "lat": "#lat",
+    "lon": "#lon",
+    "geohash": "#geohash",
+    "geoSource": "#geoSource"
+}
+
+# Follow imageHash (shared uploaded content), never set directly
+IMAGE_FIELDS = {
+    "imageHash": "#imageHash",
+    "imageUrl": "#imageUrl",
+    "imageVariants": "#imageVariants",
+    "imagePlaceholder": "#imagePlaceholder"
+}
+
+FIELD_PLACEHOLDERS = dict(UPDATABLE_FIELDS, **COORDINATE_FIELDS, **IMAGE_FIELDS)
+
+def build_update(changes, if_match, current_time):
+    """
+    Build update_item kwargs that, in one call:
+    - only update an existing garden (no phantom items),
+    - enforce If-Match against the stored version, and
+    - skip the write when every field already has the requested value.
+    A change to None removes the attribute.
+    """
+    names = {placeholder: field for field, placeholder in FIELD_PLACEHOLDERS.items() if field in changes}
+    names["#version"] = "version"
+    values = {
+        ":updatedAt": current_time,
+        ":zero": 0,
+        ":one": 1
+    }
+
+    sets = ["updatedAt = :updatedAt", "#version = if_not_exists(#version, :zero) + :one"]
+    removes = []
+    differs = []
+    for field, value in changes.items():
+        placeholder = FIELD_PLACEHOLDERS[field]
+        if value is None:
+            removes.append(placeholder)
+            differs.append(f"attribute_exists({placeholder})")
+            continue
+        values[f":{field}"] = value
+        sets.append(f"{placeholder} = :{field}")
+        differs.append(f"attribute_not_exists({placeholder}) OR {placeholder} <> :{field}")
+
+    conditions = ["attribute_exists(gardenId)", "(" + " OR ".join(differs) + ")"]
+
+    if if_match and if_match.strip() != '*':
+        kind, expected = parse_item_etag(if_match)
+        if kind == 'version':
+            conditions.append("#version = :expectedVersion")
+            values[":expectedVersion"] = expected
+        else:
+            conditions.append("attribute_not_exists(#version) AND updatedAt = :expectedUpdatedAt")
+            values[":expectedUpdatedAt"] = expected
+
+    return {
+        "UpdateExpression": "SET " + ", ".join(sets) + (" REMOVE " + ", ".join(removes) if removes else ""),
+        "ConditionExpression": " AND ".join(conditions),
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": values
+    }
+
+def update_with_plant_count(user_id, garden_id, changes, if_match):
+    """
+    plantCount also moves the user's summary total, so the garden update and
+    the summary delta go through one transaction. The delta needs the stored
+    count, so the garden is read first and the transaction is conditioned on
+    that version (retried if it changed in between).
+    """
+    key = {'userId': user_id, 'gardenId': garden_id}
+    for _ in range(TRANSACT_ATTEMPTS):
+        current = table.get_item(Key=key, ConsistentRead=True).get('Item')
+        if not current:
+            return respond(404, {"message": "Garden not found"})
+
+        if if_match and if_match.strip() != '*' and not item_matches_etag(current, if_match):
+            return respond(412, {
+                "message": "Garden was modified by someone else",
+                "garden": sign_garden(current)
+            }, {"ETag": item_etag(current)})
+
+        if all(current.get(field) == value for field, value in changes.items()):
+            return respond(200, {
+                "message": "Garden unchanged",
+                "garden": sign_garden(current)
+            }, {"ETag": item_etag(current)})
+
+        current_time = datetime.utcnow().isoformat()
+        update = build_update(changes, item_etag(current), current_time)
+        plant_delta = changes['plantCount'] - int(current.get('plantCount') or 0)
+        try:
+            table.meta.client.transact_write_items(TransactItems=[
+                {
+                    "Update": {
+                        "TableName": table.name,
+                        "Key": serialize(key),
+                        "UpdateExpression": update["UpdateExpression"],
+                        "ConditionExpression": update["ConditionExpression"],
+                        "ExpressionAttributeNames": update["ExpressionAttributeNames"],
+                        "ExpressionAttributeValues": serialize(update["ExpressionAttributeValues"])
+                    }
+                },
+                summary_update(user_id, 0, plant_delta, current_time)
+            ])
+        except ClientError as e:
+            if not is_cancelled(e):
+                raise
+            # Changed since our read; look again
+            continue
+
+        garden_cache.invalidate_user(user_id)
+        updated_garden = {key: value for key, value in dict(current, **changes).items() if value is not None}
+        updated_garden['updatedAt'] = current_time
+        updated_garden['version'] = int(current.get('version') or 0) + 1
+        return respond(200, {
+            "message": "Garden updated successfully",
+            "garden": sign_garden(updated_garden)
+        }, {"ETag": item_etag(updated_garden)})
+
+    raise ConcurrentModification(garden_id)
 
 @require_auth
 def handler(event, context):
     try:
         # Get authenticated user ID from the decorator
         user_id = event['user_id']
-        
+
         # Get garden ID from path parameters
         garden_id = event.get('pathParameters', {}).get('gardenId')
         if not garden_id:
             return respond(400, {"message": "Garden ID is required"})
 
         # Parse request body
-        body = json.loads(event.get("body", "{}"))
-        garden_name = body.get("name")
-        garden_location = body.get("location")
-        garden_description = body.get("description")
+        body = json.loads(event.get("body") or "{}")
+        if not isinstance(body, dict):
+            return respond(400, {"message": "Body must be a JSON object"})
+        changes = {field: body[field] for field in UPDATABLE_FIELDS if body.get(field) is not None}
 
-        # Build update expression dynamically
-        current_time = datetime.utcnow().isoformat()
-        update_expression = "SET updatedAt = :updatedAt"
-        expression_attribute_values = {
-            ":updatedAt": current_time
-        }
+        # Same text rules as create, for the fields being changed
+        error = (text_field_error(changes, [f for f in REQUIRED_TEXT_FIELDS if f in changes], required=True)
+                 or text_field_error(changes, OPTIONAL_TEXT_FIELDS, required=False))
+        if error:
+            return respond(400, {"message": error})
+
+        # Coordinates follow the location unless the client sends lat/lon with it;
+        # a location the gazetteer doesn't know clears stale coordinates
+        if 'location' in changes or body.get('lat') is not None or body.get('lon') is not None:
+            coordinates, error = coordinate_fields(body, changes.get('location'))
+            if error:
+                return respond(400, {"message": error})
+            changes.update(coordinates or {field: None for field in COORDINATE_FIELDS})
 
-        if garden_name is not None:
-            update_expression += ", #name = :name"
-            expression_attribute_values[":name"] = garden_name
+        # Switching to another uploaded image brings its URL and variants along
+        if body.get('imageHash') is not None:
+            images, error = image_fields(body)
+            if error:
+                return respond(400, {"message": error})
+            changes.update(images)
 
-        if garden_location is not None:
-            update_expression += ", #location = :location"
-            expression_attribute_values[":location"] = garden_location
+        if not changes:
+            return respond(400, {"message": "Nothing to update"})
+        plant_count = changes.get('plantCount')
+        if plant_count is not None and (isinstance(plant_count, bool) or not isinstance(plant_count, int) or plant_count < 0):
+            return respond(400, {"message": "plantCount must be a non-negative integer"})
 
-        if garden_description is not None:
-            update_expression += ", description = :description"
-            expression_attribute_values[":description"] = garden_description
+        # Optional optimistic concurrency: If-Match carries the ETag from a GET
+        if_match = get_header(event, 'If-Match')
+        if if_match and if_match.strip() != '*' and parse_item_etag(if_match) is None:
+            return respond(412, {"message": "If-Match does not match the current garden version"})
+
+        if 'plantCount' in changes:
+            return update_with_plant_count(user_id, garden_id, changes, if_match)
 
         # Update garden in DynamoDB
-        response = table.update_item(
-            Key={
-                'userId': user_id,
-                'gardenId': garden_id
-            },
-            UpdateExpression=update_expression,
-            ExpressionAttributeNames={
-                '#name': 'name',
-                '#location': 'location'
-            },
-            ExpressionAttributeValues=expression_attribute_values,
-            ReturnValues="ALL_NEW"
-        )
+        try:
+            response = table.update_item(
+                Key={
+                    'userId': user_id,
+                    'gardenId': garden_id
+                },
+                ReturnValues="ALL_NEW",
+                ReturnValuesOnConditionCheckFailure="ALL_OLD",
+                **build_update(changes, if_match, datetime.utcnow().isoformat())
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
 
-        updated_garden = response.get('Attributes')
-        if not updated_garden:
-            return respond(404, {"message": "Garden not found"})
+            # The stored item comes back with the failure, so no extra read is needed
+            stored = e.response.get("Item")
+            if not stored:
+                return respond(404, {"message": "Garden not found"})
+            current = {key: deserializer.deserialize(value) for key, value in stored.items()}
+
+            if if_match and if_match.strip() != '*' and not item_matches_etag(current, if_match):
+                return respond(412, {
+                    "message": "Garden was modified by someone else",
+                    "garden": sign_garden(current)
+                }, {"ETag": item_etag(current)})
 
+            # Every field already had the requested value: nothing was written
+            return respond(200, {
+                "message": "Garden unchanged",
+                "garden": sign_garden(current)
+            }, {"ETag": item_etag(current)})
+
+        garden_cache.invalidate_user(user_id)
+
+        updated_garden = response.get('Attributes')
         return respond(200, {
             "message": "Garden updated successfully",
-            "garden": updated_garden
-        })
+            "garden": sign_garden(updated_garden)
+        }, {"ETag": item_etag(updated_garden)})
 
     except json.JSONDecodeError:
         return respond(400, {"message": "Invalid JSON body"})
+    except ConcurrentModification:
+        return respond(409, {"message": "Garden is being modified, please retry"})
     except ClientError as e:
         print(f"DynamoDB error: {e}")
         return respond(500, {"message": "Database error occurred"})
     except Exception as e:
         print(f"Unexpected error: {e}")
-        return respond(500, {"message": "Internal server error"})
\ No newline at end of file
+        return respond(500, {"message": "Internal server error"})
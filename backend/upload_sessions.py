@@ -0,0 +1,231 @@
+import hashlib
+import io
+import math
+import os
+import uuid
+
+import aws_clients
+from botocore.exceptions import ClientError
+from garden_images import S3_BUCKET_NAME, content_key, content_prefix, is_sha256, staging_key
+from image_derivatives import MAX_SOURCE_BYTES, open_image
+from image_store import IMMUTABLE_CACHE_CONTROL, build_derivatives, content_image_fields
+from pagination import decode_cursor, encode_cursor
+
+s3_client = aws_clients.lazy_client('s3')
+
+# Largest image accepted through an upload session (bytes). Completing a
+# session renders its variants within the API's 29 s, so this never exceeds
+# what the image pipeline renders
+MAX_UPLOAD_BYTES = min(int(os.environ.get('MAX_UPLOAD_BYTES', str(MAX_SOURCE_BYTES))), MAX_SOURCE_BYTES)
+
+# Bytes per multipart part; S3 requires at least 5 MiB for all but the last part
+UPLOAD_PART_SIZE = max(int(os.environ.get('UPLOAD_PART_SIZE', str(8 * 1024 * 1024))), 5 * 1024 * 1024)
+
+# Presigned part URLs stay valid this long (seconds); resuming hands out fresh ones
+PART_URL_EXPIRES = 3600
+
+# Chunk size used while hashing a completed upload
+VERIFY_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadIncomplete(ValueError):
+    """Complete was called before every part arrived."""
+
+
+def _token_scope(user_id):
+    return f"{user_id}|upload"
+
+
+def encode_session(user_id, session):
+    """
+    Sessions are stateless: everything needed to resume or complete one is
+    in a token signed for the user (the same signing as list cursors).
+    """
+    return encode_cursor(session, _token_scope(user_id))
+
+
+def decode_session(user_id, token):
+    try:
+        return decode_cursor(token, _token_scope(user_id))
+    except ValueError:
+        raise ValueError("Invalid upload session")
+
+
+def parse_upload_request(body):
+    """Validate a start request. Returns (sha256, size, content_type); raises ValueError."""
+    if not isinstance(body, dict):
+        raise ValueError("Body must be a JSON object")
+
+    sha256 = body.get("sha256")
+    if not is_sha256(sha256):
+        raise ValueError("sha256 must be 64 lowercase hex digits")
+
+    size = body.get("size")
+    if isinstance(size, bool) or not isinstance(size, int) or size < 1:
+        raise ValueError("size must be a positive integer")
+    if size > MAX_UPLOAD_BYTES:
+        raise ValueError(f"Images are limited to {MAX_UPLOAD_BYTES} bytes")
+
+    content_type = body.get("contentType") or "image/jpeg"
+    if not isinstance(content_type, str) or not content_type.startswith("image/"):
+        raise ValueError("contentType must be an image type")
+
+    return sha256, size, content_type
+
+
+def part_count(size, part_size):
+    return max(1, math.ceil(size / part_size))
+
+
+def part_urls(session, part_numbers):
+    """Presigned UploadPart URLs; the browser PUTs each part and keeps the ETag header."""
+    return [
+        {
+            "partNumber": number,
+            "url": s3_client.generate_presigned_url(
+                'upload_part',
+                Params={
+                    'Bucket': S3_BUCKET_NAME,
+                    'Key': session["key"],
+                    'UploadId': session["uploadId"],
+                    'PartNumber': number
+                },
+                ExpiresIn=PART_URL_EXPIRES
+            )
+        }
+        for number in part_numbers
+    ]
+
+
+def start_session(user_id, sha256, size, content_type):
+    """
+    Short-circuit if the content is already stored; otherwise open a
+    multipart upload and presign every part. Returns the response body.
+    """
+    existing = content_image_fields(sha256)
+    if existing is not None:
+        return dict(existing, exists=True)
+
+    session_id = uuid.uuid4().hex
+    key = staging_key(user_id, session_id)
+    upload = s3_client.create_multipart_upload(Bucket=S3_BUCKET_NAME, Key=key, ContentType=content_type)
+    session = {
+        "key": key,
+        "uploadId": upload['UploadId'],
+        "sha256": sha256,
+        "size": size,
+        "contentType": content_type,
+        "partSize": UPLOAD_PART_SIZE
+    }
+    return {
+        "exists": False,
+        "uploadId": encode_session(user_id, session),
+        "partSize": UPLOAD_PART_SIZE,
+        "parts": part_urls(session, range(1, part_count(size, UPLOAD_PART_SIZE) + 1))
+    }
+
+
+def uploaded_parts(session):
+    """Parts S3 has received so far: [{"partNumber", "etag", "size"}]."""
+    parts = []
+    kwargs = {'Bucket': S3_BUCKET_NAME, 'Key': session["key"], 'UploadId': session["uploadId"]}
+    while True:
+        response = s3_client.list_parts(**kwargs)
+        parts.extend(
+            {"partNumber": part['PartNumber'], "etag": part['ETag'], "size": part['Size']}
+            for part in response.get('Parts', [])
+        )
+        if not response.get('IsTruncated'):
+            return parts
+        kwargs['PartNumberMarker'] = response['NextPartNumberMarker']
+
+
+def session_status(session):
+    """What a client needs to resume: the parts already stored and fresh URLs for the rest."""
+    done = uploaded_parts(session)
+    done_numbers = {part["partNumber"] for part in done}
+    missing = [
+        number for number in range(1, part_count(session["size"], session["partSize"]) + 1)
+        if number not in done_numbers
+    ]
+    return {
+        "completedParts": done,
+        "partSize": session["partSize"],
+        "parts": part_urls(session, missing)
+    }
+
+
+def _read_verified(key, expected_sha256):
+    """
+    Download `key`, hashing as it streams into a single in-memory file.
+    Returns that file, rewound, if it hashes to `expected_sha256`, else None.
+    """
+    body = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=key)['Body']
+    digest = hashlib.sha256()
+    data = io.BytesIO()
+    for chunk in iter(lambda: body.read(VERIFY_CHUNK_BYTES), b''):
+        digest.update(chunk)
+        data.write(chunk)
+    if digest.hexdigest() != expected_sha256:
+        return None
+    data.seek(0)
+    return data
+
+
+def complete_session(session):
+    """
+    Assemble the parts, check the result really hashes to the declared
+    sha256, then publish it under its content key with derivatives. The
+    staging object is removed either way. Returns the garden image fields.
+    """
+    sha256 = session["sha256"]
+    existing = content_image_fields(sha256)
+    if existing is not None:
+        # Someone stored the same content meanwhile; this upload isn't needed
+        abort_session(session)
+        return existing
+
+    # S3's own list is authoritative, so clients needn't track part ETags
+    parts = uploaded_parts(session)
+    expected = part_count(session["size"], session["partSize"])
+    if [part["partNumber"] for part in parts] != list(range(1, expected + 1)):
+        raise UploadIncomplete(f"{len(parts)} of {expected} parts uploaded")
+    if sum(part["size"] for part in parts) != session["size"]:
+        raise ValueError("Uploaded size does not match the declared size")
+
+    s3_client.complete_multipart_upload(
+        Bucket=S3_BUCKET_NAME,
+        Key=session["key"],
+        UploadId=session["uploadId"],
+        MultipartUpload={'Parts': [{'PartNumber': part["partNumber"], 'ETag': part["etag"]} for part in parts]}
+    )
+    try:
+        data = _read_verified(session["key"], sha256)
+        if data is None:
+            raise ValueError("Uploaded content does not match sha256")
+        # Raises UnsupportedImage (a ValueError) before anything is published
+        image = open_image(data)
+
+        s3_client.copy_object(
+            Bucket=S3_BUCKET_NAME,
+            Key=content_key(sha256),
+            CopySource={'Bucket': S3_BUCKET_NAME, 'Key': session["key"]},
+            ContentType=session["contentType"],
+            CacheControl=IMMUTABLE_CACHE_CONTROL,
+            MetadataDirective='REPLACE'
+        )
+        # Writes the manifest last: from then on the hash short-circuits uploads
+        build_derivatives(S3_BUCKET_NAME, content_prefix(sha256), data, image=image)
+    finally:
+        s3_client.delete_object(Bucket=S3_BUCKET_NAME, Key=session["key"])
+
+    return content_image_fields(sha256)
+
+
+def abort_session(session):
+    """Drop the multipart upload and any parts stored for it; safe to repeat."""
+    try:
+        s3_client.abort_multipart_upload(Bucket=S3_BUCKET_NAME, Key=session["key"], UploadId=session["uploadId"])
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'NoSuchUpload':
+            raise
@@ -0,0 +1,83 @@
+import json
+from botocore.exceptions import ClientError
+from simple_auth import require_auth, respond
+from upload_sessions import (UploadIncomplete, abort_session, complete_session, decode_session,
+                             parse_upload_request, session_status, start_session)
+
+def _session(event):
+    token = (event.get('pathParameters') or {}).get('uploadId')
+    if not token:
+        raise ValueError("uploadId is required")
+    return decode_session(event['user_id'], token)
+
+def _error(e, action):
+    """Map S3 errors: a finished or aborted session is gone, anything else is a 500."""
+    if e.response.get("Error", {}).get("Code") == "NoSuchUpload":
+        return respond(404, {"message": "Upload session not found"})
+    print(f"S3 error ({action}): {e}")
+    return respond(500, {"message": f"Failed to {action}"})
+
+@require_auth
+def create(event, context):
+    """
+    POST /uploads {"sha256", "size", "contentType"}: 200 with the stored
+    image when the hash is already known, otherwise 201 with a session
+    token and presigned part URLs.
+    """
+    try:
+        body = json.loads(event.get("body") or "{}")
+        sha256, size, content_type = parse_upload_request(body)
+        result = start_session(event['user_id'], sha256, size, content_type)
+        return respond(200 if result["exists"] else 201, result)
+    except json.JSONDecodeError:
+        return respond(400, {"message": "Invalid JSON body"})
+    except ValueError as e:
+        return respond(400, {"message": str(e)})
+    except ClientError as e:
+        return _error(e, "start upload")
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return respond(500, {"message": "Internal server error"})
+
+@require_auth
+def status(event, context):
+    """GET /uploads/{uploadId}: parts already stored and fresh URLs for the rest."""
+    try:
+        return respond(200, session_status(_session(event)))
+    except ValueError as e:
+        return respond(400, {"message": str(e)})
+    except ClientError as e:
+        return _error(e, "read upload")
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return respond(500, {"message": "Internal server error"})
+
+@require_auth
+def complete(event, context):
+    """POST /uploads/{uploadId}/complete: verify, publish and return the image fields."""
+    try:
+        image = complete_session(_session(event))
+        return respond(200, dict(image, exists=True))
+    except UploadIncomplete as e:
+        return respond(409, {"message": str(e)})
+    except ValueError as e:
+        return respond(400, {"message": str(e)})
+    except ClientError as e:
+        return _error(e, "complete upload")
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return respond(500, {"message": "Internal server error"})
+
+@require_auth
+def abort(event, context):
+    """DELETE /uploads/{uploadId}: discard the parts uploaded so far."""
+    try:
+        abort_session(_session(event))
+        return respond(200, {"message": "Upload aborted"})
+    except ValueError as e:
+        return respond(400, {"message": str(e)})
+    except ClientError as e:
+        return _error(e, "abort upload")
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return respond(500, {"message": "Internal server error"})
@@ -0,0 +1,140 @@
+import json
+import aws_clients
+import re
+import uuid
+from botocore.exceptions import ClientError
+from garden_cache import MemoryCacheBackend
+from garden_images import OWNER_METADATA_KEY, S3_BUCKET_NAME, original_key, public_url
+from presigned_post import presigned_post
+from simple_auth import require_auth, respond
+
+s3_client = aws_clients.lazy_client('s3')
+
+# Presigned POSTs stay valid this long (seconds)
+UPLOAD_URL_EXPIRES = 3600
+
+# A cached policy is handed out again only while it has this long left (seconds)
+POLICY_REUSE_MARGIN = 600
+
+# Largest accepted upload (bytes)
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+# Files per POST /gardens/upload-urls
+MAX_BATCH_UPLOADS = 20
+
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Signed policies by (user, requestId, file): a repeated request is answered
+# without signing again and keeps pointing at the same gardenId
+_policies = MemoryCacheBackend(1024)
+
+def parse_upload_request(params):
+    """Validate one file's parameters. Returns (filename, content_type, request_id)."""
+    if not isinstance(params, dict):
+        raise ValueError("Each file must be a JSON object")
+    filename = params.get("filename")
+    content_type = params.get("contentType") or "image/jpeg"
+    request_id = params.get("requestId") or None
+
+    if not filename or not isinstance(filename, str):
+        raise ValueError("filename parameter is required")
+    if not isinstance(content_type, str) or not content_type.startswith("image/"):
+        raise ValueError("contentType must be an image type")
+    if request_id is not None and (not isinstance(request_id, str) or not _REQUEST_ID_PATTERN.match(request_id)):
+        raise ValueError("requestId must be 1-64 letters, digits, '-' or '_'")
+    return filename, content_type, request_id
+
+def upload_target(user_id, filename, content_type, request_id=None):
+    """
+    Presigned POST for one new garden image. With a requestId, an identical
+    request within the policy's lifetime gets the cached answer back.
+    """
+    cache_key = f"{user_id}|{request_id}|{filename}|{content_type}" if request_id else None
+    if cache_key:
+        cached = _policies.get(cache_key)
+        if cached is not None:
+            return cached
+
+    # The garden is created after the upload, under this ID
+    garden_id = str(uuid.uuid4())
+    s3_key = original_key(user_id, garden_id, filename)
+
+    # The owner is signed into the form so the image processor can find the garden
+    owner_field = f"x-amz-meta-{OWNER_METADATA_KEY}"
+    upload_data = presigned_post(
+        s3_client,
+        S3_BUCKET_NAME,
+        s3_key,
+        fields={"Content-Type": content_type, owner_field: user_id},
+        conditions=[
+            {"Content-Type": content_type},
+            {owner_field: user_id},
+            ["content-length-range", 1, MAX_UPLOAD_BYTES]
+        ],
+        expires_in=UPLOAD_URL_EXPIRES
+    )
+    target = {
+        "uploadData": upload_data,
+        "publicUrl": public_url(s3_key),
+        "gardenId": garden_id
+    }
+    if cache_key:
+        _policies.set(cache_key, target, ttl=UPLOAD_URL_EXPIRES - POLICY_REUSE_MARGIN)
+    return target
+
+@require_auth
+def handler(event, context):
+    """GET /gardens/upload-url?filename=..&contentType=..[&requestId=..]"""
+    try:
+        # Get authenticated user ID from the decorator
+        user_id = event['user_id']
+
+        query_params = event.get("queryStringParameters") or {}
+        filename, content_type, request_id = parse_upload_request(query_params)
+        return respond(200, upload_target(user_id, filename, content_type, request_id))
+
+    except ValueError as e:
+        return respond(400, {"message": str(e)})
+    except ClientError as e:
+        print(f"S3 error: {e}")
+        return respond(500, {"message": "Failed to generate upload URL"})
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return respond(500, {"message": "Failed to generate upload URL"})
+
+@require_auth
+def batch_handler(event, context):
+    """
+    POST /gardens/upload-urls {"files": [{"filename", "contentType",
+    "requestId"?}, ...]}: one presigned POST per file, in order, signed
+    with one set of credentials and one derived signing key.
+    """
+    try:
+        user_id = event['user_id']
+
+        body = json.loads(event.get("body") or "{}")
+        files = body.get("files") if isinstance(body, dict) else None
+        if not isinstance(files, list) or not files:
+            return respond(400, {"message": "files must be a non-empty list"})
+        if len(files) > MAX_BATCH_UPLOADS:
+            return respond(400, {"message": f"At most {MAX_BATCH_UPLOADS} files per request"})
+
+        requests = []
+        for index, params in enumerate(files):
+            try:
+                requests.append(parse_upload_request(params))
+            except ValueError as e:
+                return respond(400, {"message": f"files[{index}]: {e}"})
+
+        return respond(200, {
+            "uploads": [upload_target(user_id, *request) for request in requests]
+        })
+
+    except json.JSONDecodeError:
+        return respond(400, {"message": "Invalid JSON body"})
+    except ClientError as e:
+        print(f"S3 error: {e}")
+        return respond(500, {"message": "Failed to generate upload URLs"})
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return respond(500, {"message": "Failed to generate upload URLs"})
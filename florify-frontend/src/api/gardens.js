@@ -4,15 +4,26 @@ import axios from "axios";
 // Replace with your API Gateway Invoke URL after deployment
 const API_BASE_URL = "https://jiazehdrvf.execute-api.eu-north-1.amazonaws.com/dev";
 
+// WebSocket push URL (wss://...) printed by `serverless deploy`; empty disables push
+const PUSH_URL = "";
+
 // Create axios instance with better error handling
 const api = axios.create({
   baseURL: API_BASE_URL,
   timeout: 10000, // 10 second timeout
   headers: {
     'Content-Type': 'application/json',
-  }
+  },
+  // 304 Not Modified is answered from the ETag cache below
+  validateStatus: (status) => (status >= 200 && status < 300) || status === 304
 });
 
+// ETag cache for GET responses: validators are sent automatically and a
+// 304 reuses the cached body instead of downloading it again
+const etagCache = new Map();
+
+const etagCacheKey = (config) => `${config.headers?.Authorization || ''} ${api.getUri(config)}`;
+
 // Add request interceptor to include auth token
 api.interceptors.request.use(
   (config) => {
@@ -20,6 +31,12 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    if ((config.method || 'get').toLowerCase() === 'get') {
+      const cached = etagCache.get(etagCacheKey(config));
+      if (cached) {
+        config.headers['If-None-Match'] = cached.etag;
+      }
+    }
     return config;
   },
   (error) => {
@@ -29,7 +46,24 @@ api.interceptors.request.use(
 
 // Add response interceptor for better error handling
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    if ((response.config.method || 'get').toLowerCase() !== 'get') {
+      return response;
+    }
+    const key = etagCacheKey(response.config);
+    if (response.status === 304) {
+      const cached = etagCache.get(key);
+      if (cached) {
+        return { ...response, status: 200, data: cached.data };
+      }
+      return response;
+    }
+    const etag = response.headers?.etag;
+    if (etag) {
+      etagCache.set(key, { etag, data: response.data });
+    }
+    return response;
+  },
   (error) => {
     console.error('API Error:', error);
     
@@ -40,7 +74,9 @@ api.interceptors.response.use(
     if (error.response) {
       // Server responded with error status
       const errorMessage = error.response.data?.message || 'Server error occurred';
-      throw new Error(errorMessage);
+      const serverError = new Error(errorMessage);
+      serverError.status = error.response.status;
+      throw serverError;
     } else if (error.request) {
       // Request was made but no response received
       throw new Error('Network error. Please check your internet connection and try again.');
@@ -63,16 +99,162 @@ export const createGarden = async (gardenData) => {
   }
 };
 
-// Get all gardens for the current user
-export const getGardens = async () => {
+// Create many gardens in one request.
+// Returns a per-record report so only failed records need resubmitting.
+export const bulkImportGardens = async (gardens) => {
   try {
-    const response = await api.get('/gardens');
+    const response = await api.post('/gardens/bulk', gardens, { timeout: 30000 });
     return response.data;
   } catch (error) {
     throw error;
   }
 };
 
+// Get all gardens for the current user.
+// `fields` limits the attributes returned: a preset ('card', 'detail')
+// or a comma-separated list of attribute names.
+// sort: 'updatedAt' | 'createdAt' | 'name', order: 'asc' | 'desc', status: e.g. 'active'
+const listParams = ({ fields, sort, order, status }) => {
+  const params = {};
+  if (fields) params.fields = fields;
+  if (sort) params.sort = sort;
+  if (order) params.order = order;
+  if (status) params.status = status;
+  return params;
+};
+
+export const getGardens = async ({ fields, sort, order, status } = {}) => {
+  try {
+    const response = await api.get('/gardens', { params: listParams({ fields, sort, order, status }) });
+    return response.data;
+  } catch (error) {
+    throw error;
+  }
+};
+
+// Get one page of gardens for infinite scroll.
+// Pass the previous response's nextCursor to load the following page;
+// nextCursor is null once the last page has been returned.
+// Keep sort/order/status the same for every page of one listing.
+export const getGardensPage = async ({ limit = 20, cursor = null, fields, sort, order, status } = {}) => {
+  try {
+    const params = { limit, ...listParams({ fields, sort, order, status }) };
+    if (cursor) {
+      params.cursor = cursor;
+    }
+    const response = await api.get('/gardens', { params });
+    return {
+      gardens: response.data.gardens || [],
+      nextCursor: response.data.nextCursor || null
+    };
+  } catch (error) {
+    throw error;
+  }
+};
+
+// Local replica of the user's gardens kept current with GET /gardens/changes.
+// The first sync() downloads every garden; later calls fetch only what was
+// written or deleted since, so a refresh costs as much as the change.
+// sync() resolves to the gardens, newest first; syncChanges(changes) does the
+// same for a subscribeToGardenChanges() message.
+export const createGardenReplica = ({ fields } = {}) => {
+  const gardens = new Map();
+  let syncToken = null;
+
+  const fetchChanges = async () => {
+    let hasMore = true;
+    while (hasMore) {
+      const params = fields ? { fields } : {};
+      if (syncToken) params.since = syncToken;
+      const response = await api.get('/gardens/changes', { params });
+      const data = response.data;
+      for (const garden of data.changes) {
+        gardens.set(garden.gardenId, garden);
+      }
+      // A tombstone only removes the copy it deleted, not a garden re-created since
+      for (const tombstone of data.deleted) {
+        const local = gardens.get(tombstone.gardenId);
+        if (local && (local.updatedAt || '') <= tombstone.updatedAt) {
+          gardens.delete(tombstone.gardenId);
+        }
+      }
+      syncToken = data.syncToken;
+      hasMore = data.hasMore;
+    }
+  };
+
+  const sync = async () => {
+    try {
+      await fetchChanges();
+    } catch (error) {
+      // 410: the token outlived the server's tombstones, start over
+      if (!syncToken || error.status !== 410) throw error;
+      gardens.clear();
+      syncToken = null;
+      await fetchChanges();
+    }
+    return [...gardens.values()].sort((a, b) => (b.updatedAt || '').localeCompare(a.updatedAt || ''));
+  };
+
+  // Sync after a push: the changes endpoint reads an index that can trail
+  // the push by a moment, so retry briefly until every pushed change is in
+  const syncChanges = async (changes) => {
+    let result = await sync();
+    for (let attempt = 0; attempt < 3; attempt += 1) {
+      const behind = changes.some((change) => {
+        const local = gardens.get(change.gardenId);
+        return change.op === 'delete'
+          ? local && (local.updatedAt || '') <= change.updatedAt
+          : !local || (local.updatedAt || '') < change.updatedAt;
+      });
+      if (!behind) break;
+      await new Promise((resolve) => setTimeout(resolve, 500 * (attempt + 1)));
+      result = await sync();
+    }
+    return result;
+  };
+
+  return { sync, syncChanges };
+};
+
+// Listen for changes to the user's gardens made anywhere (other tabs, devices).
+// onChange receives [{ gardenId, op: 'upsert' | 'delete', updatedAt, version }];
+// fetch the gardens themselves with a replica's sync(). Reconnects with
+// backoff; call the returned function to stop. A no-op while PUSH_URL is empty.
+export const subscribeToGardenChanges = (onChange, { onReconnect } = {}) => {
+  if (!PUSH_URL) return () => {};
+  let socket = null;
+  let stopped = false;
+  let retryDelay = 1000;
+  let retryTimer = null;
+
+  const connect = () => {
+    const token = localStorage.getItem('token');
+    socket = new WebSocket(`${PUSH_URL}?token=${encodeURIComponent(token || '')}`);
+    socket.onopen = () => {
+      // Anything pushed while disconnected was missed: let the caller resync
+      if (retryDelay > 1000 && onReconnect) onReconnect();
+      retryDelay = 1000;
+    };
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'gardens.changed') onChange(message.changes);
+    };
+    socket.onclose = () => {
+      if (stopped) return;
+      retryTimer = setTimeout(connect, retryDelay);
+      retryDelay = Math.min(retryDelay * 2, 30000);
+    };
+  };
+
+  connect();
+  return () => {
+    stopped = true;
+    clearTimeout(retryTimer);
+    if (socket) socket.close();
+  };
+};
+
 // Get a specific garden by ID
 export const getGarden = async (gardenId) => {
   try {
@@ -83,10 +265,83 @@ export const getGarden = async (gardenId) => {
   }
 };
 
+// Get many gardens by ID in one request.
+// Results come back in the same order as gardenIds; missing gardens have found: false.
+export const batchGetGardens = async (gardenIds, { fields } = {}) => {
+  try {
+    const response = await api.post('/gardens/batch-get', fields ? { gardenIds, fields } : { gardenIds });
+    return response.data;
+  } catch (error) {
+    throw error;
+  }
+};
+
 // Update a garden
-export const updateGarden = async (gardenId, gardenData) => {
+// Pass the ETag from a previous read to reject the update (412) if the
+// garden changed since; by default the cached GET /gardens/{id} ETag is used.
+// The response's ETag and garden replace that cache entry, so saving again
+// sends the version just written rather than the one first read
+export const updateGarden = async (gardenId, gardenData, { etag } = {}) => {
+  const url = `/gardens/${gardenId}`;
+  const token = localStorage.getItem('token');
+  const key = etagCacheKey({ url, headers: { Authorization: token ? `Bearer ${token}` : '' } });
   try {
-    const response = await api.put(`/gardens/${gardenId}`, gardenData);
+    const ifMatch = etag || etagCache.get(key)?.etag;
+    const response = await api.put(url, gardenData, ifMatch ? { headers: { 'If-Match': ifMatch } } : {});
+    // Covers "Garden unchanged" too: it carries the stored garden and its ETag
+    const newEtag = response.headers?.etag;
+    if (newEtag && response.data?.garden) {
+      etagCache.set(key, { etag: newEtag, data: { garden: response.data.garden } });
+    } else {
+      etagCache.delete(key);
+    }
+    return response.data;
+  } catch (error) {
+    if (error.status === 412) {
+      // Someone else changed it: the cached version is stale
+      etagCache.delete(key);
+    }
+    throw error;
+  }
+};
+
+// Ranked keyword search over name, location and description.
+// The last word may be partial ("tom" finds "tomato").
+export const searchGardens = async (q, { limit, fields } = {}) => {
+  try {
+    const params = { q };
+    if (limit) params.limit = limit;
+    if (fields) params.fields = fields;
+    const response = await api.get('/gardens/search', { params });
+    return response.data;
+  } catch (error) {
+    throw error;
+  }
+};
+
+// Gardens within radiusKm of a point, nearest first (each has distanceKm)
+export const getNearbyGardens = async (lat, lon, { radiusKm = 10, limit, fields } = {}) => {
+  try {
+    const params = { lat, lon, radius_km: radiusKm };
+    if (limit) params.limit = limit;
+    if (fields) params.fields = fields;
+    const response = await api.get('/gardens/nearby', { params });
+    return response.data;
+  } catch (error) {
+    throw error;
+  }
+};
+
+// Resolve a free-text location with the backend's offline gazetteer
+export const geocodeLocation = async (q) => {
+  const response = await api.get('/geocode', { params: { q } });
+  return response.data;
+};
+
+// Garden count, total plants and last update, without listing every garden
+export const getGardenSummary = async () => {
+  try {
+    const response = await api.get('/gardens/summary');
     return response.data;
   } catch (error) {
     throw error;
@@ -101,4 +356,97 @@ export const deleteGarden = async (gardenId) => {
   } catch (error) {
     throw error;
   }
-};
\ No newline at end of file
+};
+
+// Delete many gardens (and their images) in one call.
+// Pass { gardenIds: [...] } or { all: true }. If the server runs out of time it
+// answers with complete: false and a `resume` body, which is posted back until done.
+export const bulkDeleteGardens = async (request) => {
+  try {
+    let body = request;
+    const totals = { deleted: 0, objectsDeleted: 0, notFound: [], failed: [] };
+    while (body) {
+      const response = await api.post('/gardens/bulk-delete', body, { timeout: 60000 });
+      const data = response.data;
+      totals.deleted += data.deleted;
+      totals.objectsDeleted += data.objectsDeleted;
+      totals.notFound.push(...data.notFound);
+      totals.failed.push(...data.failed);
+      body = data.complete ? null : data.resume;
+    }
+    return totals;
+  } catch (error) {
+    throw error;
+  }
+};
+// ----------------- IMAGE UPLOADS -----------------
+
+// Parts uploaded at once, and attempts per part before giving up
+const UPLOAD_CONCURRENCY = 3;
+const UPLOAD_PART_ATTEMPTS = 3;
+
+const sha256Hex = async (file) => {
+  const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+  return Array.from(new Uint8Array(digest)).map((byte) => byte.toString(16).padStart(2, '0')).join('');
+};
+
+const uploadPart = async (file, partSize, { partNumber, url }) => {
+  const blob = file.slice((partNumber - 1) * partSize, partNumber * partSize);
+  for (let attempt = 1; ; attempt += 1) {
+    try {
+      const response = await fetch(url, { method: 'PUT', body: blob });
+      if (response.ok) return;
+      if (attempt >= UPLOAD_PART_ATTEMPTS) throw new Error(`Part ${partNumber} failed (${response.status})`);
+    } catch (error) {
+      if (attempt >= UPLOAD_PART_ATTEMPTS) throw error;
+    }
+  }
+};
+
+const uploadParts = async (file, partSize, parts) => {
+  const queue = [...parts];
+  const worker = async () => {
+    while (queue.length) {
+      await uploadPart(file, partSize, queue.shift());
+    }
+  };
+  await Promise.all(Array.from({ length: Math.min(UPLOAD_CONCURRENCY, queue.length) }, worker));
+};
+
+// Upload an image as content-addressed, resumable multipart parts.
+// Returns { imageHash, imageUrl, imageVariants, imagePlaceholder }; pass
+// imageHash to createGarden/updateGarden. An image the server already has
+// (same SHA-256) is not uploaded again. If parts fail, the session is
+// resumed once with fresh URLs for just the missing parts.
+export const uploadGardenImage = async (file) => {
+  try {
+    const sha256 = await sha256Hex(file);
+    const started = await api.post('/uploads', { sha256, size: file.size, contentType: file.type || 'image/jpeg' });
+    if (started.data.exists) return started.data;
+
+    const { uploadId, partSize } = started.data;
+    const session = `/uploads/${encodeURIComponent(uploadId)}`;
+    try {
+      await uploadParts(file, partSize, started.data.parts);
+    } catch (error) {
+      const status = await api.get(session);
+      await uploadParts(file, partSize, status.data.parts);
+    }
+    const completed = await api.post(`${session}/complete`, null, { timeout: 60000 });
+    return completed.data;
+  } catch (error) {
+    throw error;
+  }
+};
+
+// Presigned POSTs for several photos in one round trip, in the order given.
+// Each entry: { filename, contentType, requestId? }; a requestId makes a
+// retried request return the same upload target instead of a new one.
+export const getUploadUrls = async (files) => {
+  try {
+    const response = await api.post('/gardens/upload-urls', { files });
+    return response.data.uploads;
+  } catch (error) {
+    throw error;
+  }
+};
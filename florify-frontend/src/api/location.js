@@ -1,4 +1,5 @@
 // src/api/location.js
+import { geocodeLocation } from './gardens';
 // Location API service for future geocoding and location features
 
 // This is a placeholder for future location functionality
@@ -7,18 +8,17 @@
 // - OpenStreetMap Nominatim
 // - Mapbox Geocoding API
 
+// Geocoding is served by the backend's offline gazetteer (GET /geocode);
+// resolves to null when the address doesn't mention a known place
 export const geocodeAddress = async (address) => {
-  // Placeholder implementation
-  // In production, you would call a geocoding service
-  console.log('Geocoding address:', address);
-  
-  // Mock response for now
-  return {
-    latitude: 40.7128,
-    longitude: -74.0060,
-    formattedAddress: address,
-    placeId: 'mock-place-id'
-  };
+  try {
+    return await geocodeLocation(address);
+  } catch (error) {
+    if (error.message === 'Location not found') {
+      return null;
+    }
+    throw error;
+  }
 };
 
 export const reverseGeocode = async (latitude, longitude) => {
@@ -3,6 +3,7 @@ import Button from './Button';
 import InputField from './InputField';
 import TypewriterText from './TypewriterText';
 import config from '../config';
+import { uploadGardenImage } from '../api/gardens';
 import '../styles/garden-wizard.css';
 
 const CreateGardenWizard = ({ onClose, onGardenCreated, userEmail }) => {
@@ -146,57 +147,6 @@ const CreateGardenWizard = ({ onClose, onGardenCreated, userEmail }) => {
     }
   };
 
-  const uploadImageToS3 = async (file, gardenId) => {
-    try {
-      // Get presigned upload URL from backend
-      const uploadUrlResponse = await fetch(
-        `${config.API_BASE_URL}/gardens/upload-url?filename=${encodeURIComponent(file.name)}&contentType=${encodeURIComponent(file.type)}`,
-        {
-          method: 'GET',
-          headers: {
-            'Authorization': `Bearer ${localStorage.getItem('token')}`,
-          }
-        }
-      );
-
-      if (!uploadUrlResponse.ok) {
-        const errorData = await uploadUrlResponse.json();
-        throw new Error(errorData.message || 'Failed to get upload URL');
-      }
-
-      const { uploadData, publicUrl, gardenId: returnedGardenId } = await uploadUrlResponse.json();
-      
-      // Use the gardenId from the response
-      const finalGardenId = returnedGardenId || gardenId;
-
-      // Create FormData for S3 upload
-      const formData = new FormData();
-      
-      // Add all the fields from presigned POST
-      Object.keys(uploadData.fields).forEach(key => {
-        formData.append(key, uploadData.fields[key]);
-      });
-      
-      // Add the file last
-      formData.append('file', file);
-
-      // Upload to S3
-      const uploadResponse = await fetch(uploadData.url, {
-        method: 'POST',
-        body: formData
-      });
-
-      if (!uploadResponse.ok) {
-        throw new Error('Failed to upload image to S3');
-      }
-
-      return { publicUrl, gardenId: finalGardenId };
-    } catch (error) {
-      console.error('Error uploading image:', error);
-      throw error;
-    }
-  };
-
   const handleSubmit = async () => {
     if (!formData.name.trim() || !formData.coordinates) {
       setError('Please fill in all required fields');
@@ -207,15 +157,12 @@ const CreateGardenWizard = ({ onClose, onGardenCreated, userEmail }) => {
     setError('');
 
     try {
-      let imageUrl = '';
-      let gardenId = null;
+      let image = null;
 
-      // Upload image if one was selected
+      // Upload image if one was selected (skipped when the server already has it)
       if (formData.image) {
         try {
-          const uploadResult = await uploadImageToS3(formData.image, gardenId);
-          imageUrl = uploadResult.publicUrl;
-          gardenId = uploadResult.gardenId;
+          image = await uploadGardenImage(formData.image);
         } catch (uploadError) {
           setError(`Image upload failed: ${uploadError.message}`);
           setLoading(false);
@@ -223,15 +170,14 @@ const CreateGardenWizard = ({ onClose, onGardenCreated, userEmail }) => {
         }
       }
 
-      // Create garden data
+      // Create garden data; the garden references the uploaded image by hash
       const gardenData = {
         name: formData.name,
         description: formData.description,
         location: formData.location,
         coordinates: formData.coordinates,
         userEmail: userEmail,
-        imageUrl: imageUrl,
-        gardenId: gardenId  // Include gardenId if we have one from upload
+        ...(image ? { imageHash: image.imageHash } : {})
       };
 
       // Submit garden to backend
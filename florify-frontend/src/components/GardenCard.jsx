@@ -1,6 +1,9 @@
 import React from 'react';
 import '../styles/garden-card.css';
 
+// Cards are at most ~360px wide, so browsers pick the 320w variant on 1x screens
+const CARD_IMAGE_SIZES = '(max-width: 480px) 100vw, 360px';
+
 const GardenCard = ({ garden, onClick }) => {
   const formatDate = (dateString) => {
     return new Date(dateString).toLocaleDateString('en-US', {
@@ -10,10 +13,34 @@ const GardenCard = ({ garden, onClick }) => {
     });
   };
 
+  // Set by the backend image processor once an upload has been resized
+  const variants = garden.imageVariants || [];
+  const srcSet = (format) => variants
+    .filter((variant) => variant[format])
+    .map((variant) => `${variant[format]} ${variant.width}w`)
+    .join(', ');
+  const placeholderStyle = garden.imagePlaceholder
+    ? { backgroundImage: `url(${garden.imagePlaceholder})`, backgroundSize: 'cover' }
+    : undefined;
+
   return (
     <div className="garden-card" onClick={onClick}>
       <div className="garden-image-container">
-        {garden.imageUrl ? (
+        {variants.length > 0 ? (
+          // Processed upload: small WebP/JPEG variants over a blurred placeholder
+          <picture>
+            <source type="image/webp" srcSet={srcSet('webp')} sizes={CARD_IMAGE_SIZES} />
+            <img
+              src={variants[0].jpg}
+              srcSet={srcSet('jpg')}
+              sizes={CARD_IMAGE_SIZES}
+              alt={garden.name}
+              className="garden-image"
+              loading="lazy"
+              style={placeholderStyle}
+            />
+          </picture>
+        ) : garden.imageUrl ? (
           <img 
             src={garden.imageUrl} 
             alt={garden.name}
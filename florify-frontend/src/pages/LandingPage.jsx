@@ -4,7 +4,7 @@ import Button from '../components/Button';
 import TypewriterText from '../components/TypewriterText';
 import SimpleCreateGardenWizard from '../components/SimpleCreateGardenWizard';
 import GardenCard from '../components/GardenCard';
-import { getGardens } from '../api/gardens';
+import { createGardenReplica, subscribeToGardenChanges } from '../api/gardens';
 import '../styles/landing.css';
 
 function LandingPage({ onLogout, userEmail }) {
@@ -15,6 +15,8 @@ function LandingPage({ onLogout, userEmail }) {
   const [error, setError] = useState('');
   const [isScrolled, setIsScrolled] = useState(false);
   const [currentSeason, setCurrentSeason] = useState(0);
+  // The grid only renders GardenCard, so replicate just the card attributes
+  const [replica] = useState(() => createGardenReplica({ fields: 'card' }));
 
   // Handle scroll effects
   useEffect(() => {
@@ -25,9 +27,28 @@ function LandingPage({ onLogout, userEmail }) {
     return () => window.removeEventListener('scroll', handleScroll);
   }, []);
 
-  // Fetch user's gardens on component mount
+  // Fetch user's gardens on mount, and refresh them (changes only) when the tab is shown again
   useEffect(() => {
     fetchGardens();
+    const handleVisibility = () => {
+      if (document.visibilityState === 'visible') fetchGardens({ background: true });
+    };
+    document.addEventListener('visibilitychange', handleVisibility);
+    return () => document.removeEventListener('visibilitychange', handleVisibility);
+  }, []);
+
+  // Apply changes pushed from other tabs and devices as they happen
+  useEffect(() => {
+    return subscribeToGardenChanges(
+      async (changes) => {
+        try {
+          setGardens(await replica.syncChanges(changes));
+        } catch (err) {
+          setError(err.message);
+        }
+      },
+      { onReconnect: () => fetchGardens({ background: true }) }
+    );
   }, []);
 
   // Seasonal animation effect
@@ -48,11 +69,10 @@ function LandingPage({ onLogout, userEmail }) {
 
   const seasonalIcons = ['🌸', '☀️', '🍂', '❄️'];
 
-  const fetchGardens = async () => {
+  const fetchGardens = async ({ background = false } = {}) => {
     try {
-      setLoading(true);
-      const response = await getGardens();
-      setGardens(response.gardens || []);
+      if (!background) setLoading(true);
+      setGardens(await replica.sync());
     } catch (err) {
       setError(err.message);
     } finally {